@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark del extractor de resultados de Whoogle.
+Compara serp_parser (un solo recorrido) con la implementación anterior
+basada en BeautifulSoup sobre las páginas guardadas en fixtures/whoogle,
+y verifica que ambos producen los mismos registros.
+
+Uso:
+    python3 bench_serp_parser.py [iteraciones]
+"""
+
+import glob
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from serp_parser import parse_serp, etree
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "whoogle")
+ITERATIONS = 50
+
+
+def legacy_parse(html):
+    """Extracción anterior con BeautifulSoup (varios find por contenedor)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+
+    for container in soup.find_all('div', class_='ZINbbc'):
+        if container.find('details') or container.find('summary'):
+            continue
+        if container.find('span', class_='cAuxJf'):
+            continue
+
+        title_elem = container.find('h3', class_='zBAuLc')
+        if not title_elem:
+            continue
+        title_div = title_elem.find('div', class_='ilUpNd UFvD1 aSRlid')
+        title = title_div.get_text(strip=True) if title_div else title_elem.get_text(strip=True)
+
+        external_url = None
+        for link in container.find_all('a', href=True):
+            href = link['href']
+            if href.startswith('http') and not href.startswith('http://localhost'):
+                external_url = href
+                break
+        if not external_url:
+            continue
+
+        snippet = ""
+        snippet_elem = container.find('div', class_='ilUpNd H66NU aSRlid')
+        if snippet_elem:
+            snippet_text = snippet_elem.get_text(strip=True)
+            if '·' in snippet_text:
+                snippet_text = snippet_text.split('·', 1)[-1].strip()
+            snippet = snippet_text[:200]
+
+        url_elem = container.find('div', class_='ilUpNd BamJPe aSRlid XR4uSe')
+        display_url = url_elem.get_text(strip=True) if url_elem else ""
+
+        results.append({
+            'title': title,
+            'url': external_url,
+            'domain': urlparse(external_url).netloc,
+            'snippet': snippet,
+            'display_url': display_url
+        })
+
+    return results
+
+
+def timed(fn, pages, iterations):
+    """Segundos por página de una función de extracción"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for html in pages:
+            fn(html)
+    return (time.perf_counter() - started) / (iterations * len(pages))
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html")))
+    if not paths:
+        print(f"❌ No hay fixtures en {FIXTURES_DIR}")
+        return 1
+
+    pages = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append(f.read())
+
+    print(f"📄 {len(pages)} páginas, {iterations} iteraciones")
+
+    backends = ['html.parser'] + (['lxml'] if etree is not None else [])
+
+    # Verificar equivalencia antes de medir
+    for path, html in zip(paths, pages):
+        expected = legacy_parse(html)
+        for backend in backends:
+            if parse_serp(html, backend=backend) != expected:
+                print(f"❌ {os.path.basename(path)}: resultados distintos con {backend}")
+                return 1
+    print("✅ Mismos registros que la implementación anterior")
+
+    baseline = timed(legacy_parse, pages, iterations)
+    print(f"\n{'Extractor':<28}{'ms/página':>12}{'aceleración':>14}")
+    print(f"{'BeautifulSoup (anterior)':<28}{baseline * 1000:>12.3f}{'1.0x':>14}")
+    for backend in backends:
+        elapsed = timed(lambda html: parse_serp(html, backend=backend), pages, iterations)
+        print(f"{'serp_parser ' + backend:<28}{elapsed * 1000:>12.3f}{baseline / elapsed:>13.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
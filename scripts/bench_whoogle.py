@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark sin red de la extracción y de los barridos de Whoogle.
+
+Mide sobre el corpus de fixtures/whoogle:
+  1. Tiempo de extracción por página y resultados por segundo (por backend)
+  2. Latencia de extremo a extremo de un barrido con search_whoogle contra
+     whoogle_replay, con caché fría para varios niveles de concurrencia y
+     con caché caliente
+
+Uso:
+    python3 bench_whoogle.py [--latency 0.2] [--queries 20] [--iterations 50]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import query_plan
+import serp_cache
+import whoogle_client
+import whoogle_replay
+from bench_serp_parser import timed
+from query_executor import run_queries
+from serp_parser import etree, extract_serp
+
+REPO_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+
+ITERATIONS = 50
+LATENCY = 0.2            # Segundos simulados por petición a Whoogle
+QUERIES = 20
+WORKER_LEVELS = (1, 2, 4, 8)
+
+
+def _option(args, name, default, cast):
+    return cast(args[args.index(name) + 1]) if name in args else default
+
+
+def bench_parse(pages, iterations):
+    """Milisegundos por página y resultados por segundo de cada backend"""
+    backends = ['html.parser'] + (['lxml'] if etree is not None else [])
+    results_per_pass = sum(len(extract_serp(html)[0]) for html in pages)
+
+    print(f"\n{'Extracción':<16}{'ms/página':>12}{'resultados/s':>16}")
+    for backend in backends:
+        elapsed = timed(lambda html: extract_serp(html, backend=backend), pages, iterations)
+        per_result = elapsed * len(pages) / max(1, results_per_pass)
+        print(f"{backend:<16}{elapsed * 1000:>12.3f}{1 / per_result:>16,.0f}")
+
+
+def run_sweep(queries, workers):
+    """Segundos de un barrido completo y resultados obtenidos"""
+    from whoogle_search import search_whoogle
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        searches = run_queries(queries, search_whoogle, rate=None, max_workers=workers)
+    elapsed = time.perf_counter() - started
+    return elapsed, sum(len(results) for _, results in searches)
+
+
+def bench_sweep(queries, latency):
+    """Latencia de barrido según concurrencia, con caché fría y caliente"""
+    server, base_url = whoogle_replay.start_in_background(latency=latency)
+    cache_dir = tempfile.mkdtemp(prefix='serp_cache_bench_')
+    original = (whoogle_client.WHOOGLE_URL, serp_cache.CACHE_DIR)
+
+    whoogle_client.WHOOGLE_URL = base_url
+    serp_cache.CACHE_DIR = cache_dir
+    whoogle_client.set_rate_limit(rate=1e6, burst=1e6)
+
+    try:
+        print(f"\n{'Barrido':<22}{'segundos':>10}{'resultados':>12}{'consultas/s':>14}")
+        for workers in WORKER_LEVELS:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            elapsed, count = run_sweep(queries, workers)
+            print(f"{f'caché fría, {workers} hilos':<22}{elapsed:>10.2f}{count:>12}{len(queries) / elapsed:>14.1f}")
+
+        elapsed, count = run_sweep(queries, max(WORKER_LEVELS))
+        print(f"{'caché caliente':<22}{elapsed:>10.2f}{count:>12}{len(queries) / elapsed:>14.1f}")
+    finally:
+        whoogle_client.WHOOGLE_URL, serp_cache.CACHE_DIR = original
+        whoogle_client.set_rate_limit()
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main():
+    args = sys.argv[1:]
+    iterations = _option(args, '--iterations', ITERATIONS, int)
+    latency = _option(args, '--latency', LATENCY, float)
+    query_count = _option(args, '--queries', QUERIES, int)
+
+    corpus = whoogle_replay.Corpus()
+    pages = list(corpus.pages.values())
+    if not pages:
+        print(f"❌ Corpus vacío: {whoogle_replay.MANIFEST_FILE}")
+        return 1
+
+    config_path = query_plan.CONFIG_FILE if os.path.exists(query_plan.CONFIG_FILE) else REPO_CONFIG
+    queries = query_plan.plan_queries(whoogle_config=query_plan.load_config(config_path))[:query_count]
+
+    print(f"📼 {len(pages)} páginas grabadas, {iterations} iteraciones, "
+          f"{len(queries)} consultas, latencia simulada {latency}s")
+
+    bench_parse(pages, iterations)
+    if queries:
+        bench_sweep(queries, latency)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
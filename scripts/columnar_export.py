@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Exportación columnar (Parquet) del historial de monitoreo y de búsquedas.
+
+Escribe dos datasets particionados por día (partición Hive day=AAAA-MM-DD):
+
+  checks/  una fila por comprobación del monitor (log JSONL y archivo)
+  hits/    una fila por resultado de Whoogle y consulta que lo encontró
+
+Las consultas de tendencias (disponibilidad semanal por revendedor, primera
+aparición de cada dominio, rendimiento de cada consulta) se resuelven con
+pyarrow.compute sobre columnas, leyendo solo las columnas y particiones que
+necesitan, en lugar de recorrer diccionarios cargados de JSON.
+
+Uso:
+    python3 columnar_export.py export [--days N]   # N: reescribe solo los últimos N días
+    python3 columnar_export.py uptime [semanas]
+    python3 columnar_export.py first-seen
+    python3 columnar_export.py yield
+"""
+
+import glob
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Sin pyarrow no hay exportación columnar
+    pa = None
+
+from dedup import canonical_url
+from domain_health import result_domain as check_domain
+from investigation_store import ROOT_DIR, SEARCH_RESULT_PATTERNS, is_active, load_search_results
+from log_store import LOG_FILE, iter_entries
+from registrable_domain import registrable_domain, result_domain as hit_domain
+
+EXPORT_DIR = os.path.join(ROOT_DIR, "analisis", "columnar")
+CHECKS = 'checks'
+HITS = 'hits'
+
+CHECK_FIELDS = ('domain', 'status', 'status_code', 'final_url', 'ip_address', 'response_time', 'circuit', 'checked_at')
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow no está instalado (pip install pyarrow)")
+
+
+def _schemas():
+    text = pa.dictionary(pa.int32(), pa.string())   # Columnas muy repetidas: diccionario
+    return {
+        CHECKS: pa.schema([
+            ('checked_at', pa.timestamp('us')),
+            ('domain', text),
+            ('registrable', text),
+            ('status', text),
+            ('active', pa.bool_()),
+            ('status_code', pa.int16()),
+            ('response_time', pa.float32()),
+            ('final_url', pa.string()),
+            ('ip_address', pa.string()),
+            ('circuit', text),
+        ]),
+        HITS: pa.schema([
+            ('found_at', pa.timestamp('us')),
+            ('query', text),
+            ('url', pa.string()),
+            ('canonical_url', pa.string()),
+            ('domain', text),
+            ('title', pa.string()),
+            ('page', pa.int16()),
+            ('rank', pa.int16()),
+        ]),
+    }
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _append(days, day, row):
+    """Añade una fila a las columnas de su día"""
+    columns = days.setdefault(day, {})
+    for name, value in row.items():
+        columns.setdefault(name, []).append(value)
+
+
+def collect_checks(since=None, log_file=LOG_FILE):
+    """Columnas por día de las comprobaciones del monitor (día -> {columna: valores})"""
+    days = {}
+    for entry in iter_entries(log_file, include_archive=True, fields=CHECK_FIELDS):
+        if since and (entry.get('date') or '')[:10] < since:
+            continue
+        for result in entry.get('results', []):
+            domain = check_domain(result)
+            checked_at = _timestamp(result.get('checked_at') or entry.get('date'))
+            if not domain or checked_at is None:
+                continue
+            day = checked_at.date().isoformat()
+            if since and day < since:
+                continue
+            status = result.get('status')
+            _append(days, day, {
+                'checked_at': checked_at,
+                'domain': domain,
+                'registrable': registrable_domain(domain),
+                'status': status,
+                'active': is_active(status),
+                'status_code': result.get('status_code'),
+                'response_time': result.get('response_time'),
+                'final_url': result.get('final_url'),
+                'ip_address': result.get('ip_address'),
+                'circuit': result.get('circuit'),
+            })
+    return days
+
+
+def collect_hits(since=None, root=ROOT_DIR):
+    """
+    Columnas por día de los resultados de Whoogle.
+
+    Un resultado fusionado por dedup cuenta una vez por cada consulta que lo
+    encontró; el mismo (día, consulta, URL canónica) en varios archivos se
+    exporta una sola vez.
+    """
+    days = {}
+    seen = set()
+    paths = sorted(p for pattern in SEARCH_RESULT_PATTERNS for p in glob.glob(os.path.join(root, pattern)))
+    for path in paths:
+        results, generated_at, _ = load_search_results(path)
+        default_time = generated_at or datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+        for result in results:
+            url = result.get('url')
+            found_at = _timestamp(result.get('found_at') or default_time)
+            if not url or found_at is None:
+                continue
+            day = found_at.date().isoformat()
+            if since and day < since:
+                continue
+            canonical = result.get('canonical_url') or canonical_url(url)
+            for query in result.get('queries') or [result.get('query') or result.get('search_term')]:
+                if (day, query, canonical) in seen:
+                    continue
+                seen.add((day, query, canonical))
+                _append(days, day, {
+                    'found_at': found_at,
+                    'query': query,
+                    'url': url,
+                    'canonical_url': canonical,
+                    'domain': hit_domain(result),
+                    'title': result.get('title'),
+                    'page': result.get('page'),
+                    'rank': result.get('rank'),
+                })
+    return days
+
+
+def write_partitions(name, days, export_dir=EXPORT_DIR):
+    """Escribe un Parquet por día (reemplazo atómico de cada partición)"""
+    schema = _schemas()[name]
+    for day, columns in days.items():
+        table = pa.table({field.name: columns.get(field.name, []) for field in schema}, schema=schema)
+        partition = os.path.join(export_dir, name, f"day={day}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, "part-0.parquet")
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+    return len(days)
+
+
+def export(days=None, export_dir=EXPORT_DIR, log_file=LOG_FILE, root=ROOT_DIR):
+    """
+    Exporta comprobaciones y resultados a Parquet.
+
+    Args:
+        days: Reescribir solo las particiones de los últimos `days` días
+            (None = todo el historial)
+
+    Returns:
+        Dict dataset -> particiones escritas
+    """
+    _require_pyarrow()
+    since = (date.today() - timedelta(days=days - 1)).isoformat() if days else None
+    return {
+        CHECKS: write_partitions(CHECKS, collect_checks(since, log_file), export_dir),
+        HITS: write_partitions(HITS, collect_hits(since, root), export_dir),
+    }
+
+
+def dataset(name, export_dir=EXPORT_DIR):
+    """Dataset Parquet particionado (None si aún no se ha exportado)"""
+    _require_pyarrow()
+    path = os.path.join(export_dir, name)
+    if not os.path.isdir(path):
+        return None
+    partitioning = ds.partitioning(pa.schema([('day', pa.string())]), flavor='hive')
+    return ds.dataset(path, format='parquet', partitioning=partitioning)
+
+
+def _read(name, columns, since=None, export_dir=EXPORT_DIR):
+    """
+    Columnas pedidas; con `since` solo se abren las particiones desde ese día.
+
+    Las columnas diccionario se devuelven como cadenas: los kernels de
+    ordenación y agregación no las admiten todos.
+    """
+    data = dataset(name, export_dir)
+    if data is None:
+        table = pa.table({c: pa.array([], _schemas()[name].field(c).type) for c in columns})
+    else:
+        row_filter = ds.field('day') >= since if since else None
+        table = data.to_table(columns=list(columns), filter=row_filter)
+    return pa.table({
+        c: pc.cast(table[c], pa.string()) if pa.types.is_dictionary(table[c].type) else table[c]
+        for c in columns
+    })
+
+
+def uptime(weeks=None, export_dir=EXPORT_DIR):
+    """
+    Disponibilidad semanal por dominio registrable (revendedor).
+
+    Los SKIPPED del circuit breaker no cuentan como comprobación.
+
+    Returns:
+        Tabla (registrable, week, checks, active, uptime) ordenada por dominio y semana
+    """
+    since = (date.today() - timedelta(weeks=weeks)).isoformat() if weeks else None
+    table = _read(CHECKS, ['registrable', 'checked_at', 'active', 'status'], since, export_dir)
+    table = table.filter(pc.not_equal(table['status'], 'SKIPPED'))
+    week = pc.floor_temporal(table['checked_at'], unit='week', week_starts_monday=True)
+
+    grouped = (
+        pa.table({'registrable': table['registrable'], 'week': week, 'active': table['active']})
+        .group_by(['registrable', 'week'])
+        .aggregate([('active', 'count'), ('active', 'sum')])
+    )
+    checks, active = grouped['active_count'], grouped['active_sum']
+    ratio = pc.divide(pc.cast(active, pa.float64()), pc.cast(checks, pa.float64()))
+    result = pa.table({
+        'registrable': grouped['registrable'], 'week': grouped['week'],
+        'checks': checks, 'active': active, 'uptime': ratio,
+    })
+    return result.sort_by([('registrable', 'ascending'), ('week', 'ascending')])
+
+
+def first_seen(export_dir=EXPORT_DIR):
+    """
+    Primera aparición de cada dominio en las búsquedas.
+
+    Returns:
+        Tabla (domain, first_seen, first_query, queries) ordenada por fecha
+    """
+    table = _read(HITS, ['domain', 'found_at', 'query'], export_dir=export_dir)
+    table = table.sort_by([('found_at', 'ascending')])
+    grouped = table.group_by('domain', use_threads=False).aggregate([
+        ('found_at', 'min'), ('query', 'first'), ('query', 'count_distinct')
+    ])
+    result = pa.table({
+        'domain': grouped['domain'], 'first_seen': grouped['found_at_min'],
+        'first_query': grouped['query_first'], 'queries': grouped['query_count_distinct'],
+    })
+    return result.sort_by([('first_seen', 'ascending'), ('domain', 'ascending')])
+
+
+def query_yield(export_dir=EXPORT_DIR):
+    """
+    Rendimiento de cada consulta.
+
+    Returns:
+        Tabla (query, hits, domains, new_domains) donde new_domains son los
+        dominios que esa consulta encontró antes que ninguna otra
+    """
+    table = _read(HITS, ['query', 'domain'], export_dir=export_dir)
+    per_query = table.group_by('query').aggregate([('domain', 'count'), ('domain', 'count_distinct')])
+
+    firsts = first_seen(export_dir)
+    new = pa.table({'query': firsts['first_query'], 'domain': firsts['domain']}) \
+        .group_by('query').aggregate([('domain', 'count')]) \
+        .rename_columns(['query', 'new_domains'])
+
+    result = per_query.join(new, 'query', join_type='left outer')
+    result = pa.table({
+        'query': result['query'], 'hits': result['domain_count'],
+        'domains': result['domain_count_distinct'], 'new_domains': pc.fill_null(result['new_domains'], 0),
+    })
+    return result.sort_by([('new_domains', 'descending'), ('hits', 'descending')])
+
+
+def _print_table(table, limit=30):
+    rows = table.slice(0, limit).to_pylist()
+    for row in rows:
+        print("   " + "  ".join(
+            f"{value:.0%}" if isinstance(value, float) else
+            value.strftime('%Y-%m-%d') if isinstance(value, datetime) else str(value)
+            for value in row.values()
+        ))
+    if table.num_rows > limit:
+        print(f"   ... {table.num_rows - limit} filas más")
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ('export', 'uptime', 'first-seen', 'yield'):
+        print(__doc__)
+        return 1
+    if pa is None:
+        print("❌ pyarrow no está instalado (pip install pyarrow)")
+        return 1
+
+    command = args[0]
+    if command == 'export':
+        days = int(args[args.index('--days') + 1]) if '--days' in args else None
+        written = export(days)
+        print(f"📦 Exportado a {EXPORT_DIR}: {written[CHECKS]} días de comprobaciones, {written[HITS]} días de búsquedas")
+    elif command == 'uptime':
+        weeks = int(args[1]) if len(args) > 1 else None
+        print("📈 Disponibilidad semanal (dominio, semana, comprobaciones, activas, %)")
+        _print_table(uptime(weeks))
+    elif command == 'first-seen':
+        print("🆕 Primera aparición (dominio, fecha, consulta, nº consultas)")
+        _print_table(first_seen())
+    else:
+        print("🎯 Rendimiento por consulta (consulta, resultados, dominios, dominios nuevos)")
+        _print_table(query_yield())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
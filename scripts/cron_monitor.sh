@@ -14,9 +14,9 @@ cd /root/.openclaw/workspace/plant-pwr-investigation
 python3 "$SCRIPT_PATH" >> "$LOG_FILE" 2>&1
 
 # Verificar si hay cambios importantes
-LAST_LOG="$LOG_DIR/daily_log.json"
+LAST_LOG="$LOG_DIR/daily_log.jsonl"
 if [ -f "$LAST_LOG" ]; then
-    # Contar activos en última ejecución
+    # Contar activos en última ejecución (una línea JSON por ejecución)
     ACTIVE_COUNT=$(tail -1 "$LAST_LOG" | grep -o '"active":[0-9]*' | cut -d: -f2)
     echo "" >> "$LOG_FILE"
     echo "📊 Resumen cron: $ACTIVE_COUNT dominios activos" >> "$LOG_FILE"
@@ -27,5 +27,21 @@ if [ -f "$LAST_LOG" ]; then
     fi
 fi
 
+# Captura diaria de evidencia de los sitios críticos (las páginas sin cambios no ocupan espacio)
+python3 "$(dirname "$SCRIPT_PATH")/evidence_vault.py" capture >> "$LOG_FILE" 2>&1
+
+# Cambios de precio, producto y redirecciones respecto a la captura anterior
+python3 "$(dirname "$SCRIPT_PATH")/page_diff.py" >> "$LOG_FILE" 2>&1
+
+# Exportación columnar de los dos últimos días (solo si pyarrow está instalado)
+if python3 -c "import pyarrow" 2>/dev/null; then
+    python3 "$(dirname "$SCRIPT_PATH")/columnar_export.py" export --days 2 >> "$LOG_FILE" 2>&1
+fi
+
+# Compactación semanal del log (lunes): archiva ejecuciones antiguas
+if [ "$(date +%u)" = "1" ]; then
+    python3 "$(dirname "$SCRIPT_PATH")/log_store.py" >> "$LOG_FILE" 2>&1
+fi
+
 echo "" >> "$LOG_FILE"
 echo "✅ Monitoreo completado: $(date)" >> "$LOG_FILE"
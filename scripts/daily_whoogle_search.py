@@ -8,13 +8,18 @@ import os
 import sys
 import json
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from itertools import islice
+
+from dedup import ResultDeduplicator
+from investigation_store import record_search_run
+from query_executor import run_queries
+from keyword_matcher import get_matcher
+from query_plan import plan_queries
+from registrable_domain import result_domain
+from snippet_clusters import SnippetIndex, attach_page_text, cluster_results, result_text
+from whoogle_client import MAX_PAGES, MAX_RESULTS, WHOOGLE_URL, iter_results
 
 # Configuración
-WHOOGLE_URL = "http://localhost:8080"
-HEADERS = {'User-Agent': 'Mozilla/5.0'}
 LOG_DIR = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/logs"
 RESULTS_DIR = "/root/.openclaw/workspace/plant-pwr-investigation/evidencia"
 
@@ -33,119 +38,72 @@ def log_message(message):
     
     print(f"[{timestamp}] {message}")
 
-def search_whoogle(query, num_results=10):
-    """Realizar búsqueda en Whoogle"""
-    search_url = f"{WHOOGLE_URL}/search"
-    params = {'q': query, 'num': num_results}
-    
+def search_whoogle(query, max_pages=MAX_PAGES, max_results=MAX_RESULTS):
+    """Realizar búsqueda en Whoogle: hasta `max_pages` páginas y `max_results` resultados"""
+    stats = {}
+    results = []
     try:
-        response = requests.get(search_url, params=params, headers=HEADERS, timeout=30)
-        
-        if response.status_code != 200:
-            log_message(f"❌ Error en Whoogle: HTTP {response.status_code} para '{query}'")
-            return []
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        results = []
-        
-        # Buscar contenedores de resultados
-        result_containers = soup.find_all('div', class_='ZINbbc')
-        
-        for container in result_containers[:num_results * 2]:
-            # Filtrar secciones no deseadas
-            if container.find('details') or container.find('summary'):
-                continue
-                
-            if container.find('span', class_='cAuxJf'):
-                continue
-            
-            # Extraer título
-            title_elem = container.find('h3', class_='zBAuLc')
-            if not title_elem:
-                continue
-                
-            title_div = title_elem.find('div', class_='ilUpNd UFvD1 aSRlid')
-            if title_div:
-                title = title_div.get_text(strip=True)
-            else:
-                title = title_elem.get_text(strip=True)
-            
-            # Extraer URL
-            link_elems = container.find_all('a', href=True)
-            external_url = None
-            
-            for link in link_elems:
-                href = link['href']
-                if href.startswith('http') and not href.startswith('http://localhost'):
-                    external_url = href
-                    break
-            
-            if not external_url:
-                continue
-            
-            # Extraer snippet
-            snippet_elem = container.find('div', class_='ilUpNd H66NU aSRlid')
-            snippet = ""
-            if snippet_elem:
-                snippet_text = snippet_elem.get_text(strip=True)
-                if '·' in snippet_text:
-                    snippet_text = snippet_text.split('·', 1)[-1].strip()
-                snippet = snippet_text[:200]
-            
-            # Extraer dominio
-            domain = ""
-            try:
-                parsed = urlparse(external_url)
-                domain = parsed.netloc
-            except:
-                domain = "unknown"
-            
-            result = {
-                'title': title,
-                'url': external_url,
-                'domain': domain,
-                'snippet': snippet,
-                'found_at': datetime.now().isoformat()
-            }
-            
+        # Páginas desde la caché en disco si son recientes; si no, desde Whoogle
+        for result in islice(iter_results(query, max_pages=max_pages, timeout=30, stats=stats), max_results):
+            result['found_at'] = datetime.now().isoformat()
             results.append(result)
-        
-        return results
-        
     except Exception as e:
         log_message(f"❌ Error en búsqueda '{query}': {type(e).__name__}: {e}")
-        return []
+        return results
+    
+    if not stats['pages']:
+        log_message(f"❌ Error en Whoogle: HTTP {stats['status_code']} para '{query}'")
+    elif stats['profile'] is None:
+        log_message(f"⚠️  Ningún perfil de selectores coincidió para '{query}' (¿cambió el marcado de Whoogle?)")
+    else:
+        log_message(f"📑 '{query}': {stats['pages']} páginas ({stats['cached_pages']} desde caché), parada: {stats['stop']}")
+    
+    return results
 
 def run_daily_search():
     """Ejecutar búsquedas diarias"""
     log_message("🚀 INICIANDO BÚSQUEDA DIARIA AUTOMATIZADA")
     
-    # Términos de búsqueda
-    search_terms = [
-        "Plant PWR Colombia",
-        "Plant PWR gotas perros",
-        "aceite cannabis mascotas Colombia",
-        "zelvatic pets",
-        "plantpwr.co",
-        "site:instagram.com plant pwr",
-        "site:facebook.com plant pwr"
-    ]
-    
-    all_results = []
-    
-    for query in search_terms:
-        log_message(f"🔍 Buscando: '{query}'")
-        results = search_whoogle(query, num_results=5)
+    # Términos de búsqueda: los más prioritarios del plan de config.json
+    search_terms = plan_queries('daily_max_queries')
+    if not search_terms:
+        log_message("⚠️ config.json no tiene tools.whoogle.query_plan ni search_terms")
+        return
+    
+    # Una entrada por URL canónica con todas las consultas que la encontraron
+    deduplicator = ResultDeduplicator()
+    
+    # Búsquedas en paralelo; whoogle_client limita la tasa por página pedida
+    log_message(f"🔍 Lanzando {len(search_terms)} búsquedas en paralelo")
+    searches = run_queries(search_terms, search_whoogle, rate=None)
+    
+    for query, results in searches:
+        log_message(f"📄 Resultados de: '{query}'")
         
+        new_count = 0
         for result in results:
             result['query'] = query
-            all_results.append(result)
-        
-        log_message(f"   ✅ {len(results)} resultados encontrados")
+            if deduplicator.add(result, query) is not None:
+                new_count += 1
         
-        # Pausa entre búsquedas
-        import time
-        time.sleep(2)
+        log_message(f"   ✅ {len(results)} resultados encontrados ({new_count} nuevos)")
+    
+    all_results = deduplicator.results()
+    log_message(f"🧹 {len(all_results)} URLs únicas ({deduplicator.duplicates} repetidos fusionados)")
+    
+    # Agrupar textos comerciales copiados; el índice persiste entre ejecuciones.
+    # Las páginas capturadas en la bóveda se comparan por su texto completo
+    attach_page_text(all_results)
+    snippet_index = SnippetIndex.load()
+    clusters = cluster_results(all_results, snippet_index)
+    snippet_index.save()
+    known_copies = sum(1 for result in all_results if 'known_copy_of' in result)
+    log_message(f"🧬 {len(clusters)} grupos de texto copiado, {known_copies} copias de textos ya conocidos")
+    
+    # Consultas y resultados también en la base de la investigación
+    generated_at = datetime.now().isoformat()
+    stored = record_search_run(all_results, search_terms, generated_at)
+    log_message(f"🗄️  {stored} resultados nuevos en la base de la investigación")
     
     # Guardar resultados
     if all_results:
@@ -154,7 +112,7 @@ def run_daily_search():
         
         data = {
             'metadata': {
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': generated_at,
                 'total_results': len(all_results),
                 'search_terms': search_terms,
                 'whoogle_url': WHOOGLE_URL
@@ -168,20 +126,20 @@ def run_daily_search():
         log_message(f"💾 Resultados guardados en: {output_file}")
         
         # Generar resumen
-        generate_summary(all_results, date_str)
+        generate_summary(all_results, date_str, clusters)
     else:
         log_message("⚠️ No se encontraron resultados")
     
     log_message("✅ BÚSQUEDA DIARIA COMPLETADA")
 
-def generate_summary(results, date_str):
+def generate_summary(results, date_str, clusters=()):
     """Generar resumen de resultados"""
     summary_file = os.path.join(LOG_DIR, f"summary_{date_str}.txt")
     
-    # Contar por dominio
+    # Contar por dominio registrable (www.x.com, m.x.com y x.com son el mismo)
     domains = {}
     for result in results:
-        domain = result['domain']
+        domain = result_domain(result)
         if domain not in domains:
             domains[domain] = 0
         domains[domain] += 1
@@ -197,8 +155,37 @@ def generate_summary(results, date_str):
             f.write(f"  • {domain}: {count} resultados\n")
         
         f.write("\n🔍 NUEVOS HALLAZGOS POTENCIALES:\n")
-        # Aquí se podría agregar lógica para detectar nuevos dominios
-        f.write("  (Comparar con base de datos existente)\n")
+        # Mismo criterio que whoogle_search.analyze_results: se marca el
+        # dominio si las palabras clave están en el dominio; título y
+        # snippet solo cuentan como mención de la marca
+        matcher = get_matcher()
+        flagged = {}
+        brand_mentions = 0
+        for result in results:
+            domain = result_domain(result)
+            hits = matcher.scan_fields(domain=domain, title=result.get('title'), snippet=result.get('snippet'))
+            if 'domain' in hits:
+                flagged.setdefault(domain, set()).update(
+                    word for words in hits['domain'].values() for word in words)
+            if any('marca' in hits.get(field, {}) for field in ('title', 'snippet')):
+                brand_mentions += 1
+        
+        if flagged:
+            for domain, words in sorted(flagged.items()):
+                f.write(f"  • {domain}: {', '.join(sorted(words))}\n")
+        else:
+            f.write("  (Ningún dominio contiene las palabras clave)\n")
+        
+        if brand_mentions:
+            f.write(f"\n🏷️  {brand_mentions} resultados mencionan la marca en título o snippet\n")
+        
+        if clusters:
+            f.write("\n🧬 TEXTO COMERCIAL COPIADO:\n")
+            for members in clusters:
+                f.write(f"  • {len(members)} resultados: \"{result_text(members[0])[:80]}...\"\n")
+                for result in members:
+                    known = " (copia de texto ya conocido)" if 'known_copy_of' in result else ""
+                    f.write(f"      - {result.get('url')}{known}\n")
     
     log_message(f"📋 Resumen generado: {summary_file}")
 
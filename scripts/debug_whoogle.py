@@ -6,6 +6,9 @@ Debug script for Whoogle search parsing.
 import requests
 from bs4 import BeautifulSoup
 
+from keyword_matcher import get_matcher
+from serp_parser import get_profiles
+
 WHOOGLE_URL = "http://localhost:8080"
 HEADERS = {'User-Agent': 'Mozilla/5.0'}
 
@@ -26,10 +29,14 @@ def debug_search():
         
         # Parse HTML
         soup = BeautifulSoup(response.text, 'html.parser')
+        profiles = get_profiles()
+        
+        def matches_any(selector):
+            return lambda tag: any(p[selector](tag.name, tag.get('class', [])) for p in profiles)
         
-        # Find ALL divs with class ZINbbc
-        all_divs = soup.find_all('div', class_='ZINbbc')
-        print(f"📊 Found {len(all_divs)} divs with class ZINbbc")
+        # Find ALL result containers known to any selector profile
+        all_divs = soup.find_all(matches_any('container'))
+        print(f"📊 Found {len(all_divs)} result containers ({', '.join(p['name'] for p in profiles)})")
         
         # Check each div
         for i, div in enumerate(all_divs[:10]):  # First 10 only
@@ -67,11 +74,12 @@ def debug_search():
         print(f"{'='*60}")
         
         # Look for divs that contain both h3 and external links
+        link_matcher = get_matcher('link_keywords')
         potential_results = []
         for div in all_divs:
             h3 = div.find('h3')
             links = div.find_all('a', href=True)
-            external_links = [l for l in links if 'plantpwr' in l['href'] or 'instagram' in l['href'] or 'facebook' in l['href']]
+            external_links = [l for l in links if link_matcher.matches(l['href'])]
             
             if h3 and external_links:
                 potential_results.append(div)
@@ -90,11 +98,11 @@ def debug_search():
             links = div.find_all('a', href=True)
             for link in links:
                 href = link['href']
-                if any(domain in href for domain in ['plantpwr', 'instagram', 'facebook', 'mercadolibre', 'ispetshope']):
+                if link_matcher.matches(href):
                     print(f"   🔗 External URL: {href}")
             
             # Get snippet
-            snippet_div = div.find('div', class_='ilUpNd H66NU aSRlid')
+            snippet_div = div.find(matches_any('snippet'))
             if snippet_div:
                 print(f"   📋 Snippet: {snippet_div.get_text(strip=True)[:150]}...")
         
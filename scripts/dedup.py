@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Canonicalización de URLs y deduplicación de resultados entre consultas.
+
+La misma página aparece una vez por cada consulta que la encuentra, y con
+variantes que no cambian el contenido (https://www.instagram.com/plantpwroficial/?hl=en
+frente a instagram.com/plantpwroficial). Cada resultado se reduce a una URL
+canónica y, en un único recorrido con un dict como estado, los repetidos se
+fusionan en el primer registro acumulando las consultas que lo encontraron.
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Parámetros que no cambian el contenido: seguimiento e idioma
+TRACKING_PARAMS = frozenset([
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'igsh', 'srsltid',
+    'mc_cid', 'mc_eid', 'ref', 'ref_src', 'ref_url', 'si', 'feature',
+    'hl', 'lang', 'locale', '_ga', '_gl'
+])
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def canonical_host(host):
+    """Host en minúsculas, sin 'www.' ni punto final"""
+    host = (host or '').lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+def canonical_url(url):
+    """
+    URL canónica para comparar resultados.
+
+    Unifica http/https, quita 'www.', el puerto por defecto, el fragmento,
+    la barra final y los parámetros de seguimiento e idioma; el resto de
+    parámetros se ordena. Las URLs que no se pueden analizar se devuelven
+    tal cual.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+
+    if parts.scheme not in DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = canonical_host(parts.hostname)
+    if port is not None and str(port) != DEFAULT_PORTS[parts.scheme]:
+        host = f"{host}:{port}"
+
+    path = parts.path.rstrip('/')
+    params = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+
+    return urlunsplit(('https', host, path, urlencode(params), ''))
+
+
+class ResultDeduplicator:
+    """
+    Fusiona resultados repetidos a medida que llegan.
+
+    El estado es un dict URL canónica -> registro, así que el coste es O(1)
+    por resultado y la salida crece con las URLs únicas, no con
+    consultas × resultados.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.seen = 0
+
+    def add(self, result, query=None):
+        """
+        Registra un resultado.
+
+        Returns:
+            El registro nuevo si la URL no se había visto, o None si se
+            fusionó con uno anterior (que recibe la consulta en 'queries')
+        """
+        self.seen += 1
+        key = canonical_url(result.get('url', ''))
+        record = self.records.get(key)
+
+        if record is None:
+            record = dict(result)
+            record['canonical_url'] = key
+            record['domain'] = canonical_host(result.get('domain') or urlsplit(key).hostname)
+            record['queries'] = [query] if query else []
+            self.records[key] = record
+            return record
+
+        if query and query not in record['queries']:
+            record['queries'].append(query)
+        # Conservar el snippet más informativo entre las apariciones
+        if len(result.get('snippet') or '') > len(record.get('snippet') or ''):
+            record['snippet'] = result['snippet']
+        return None
+
+    def results(self):
+        """Registros únicos en orden de primera aparición"""
+        return list(self.records.values())
+
+    @property
+    def duplicates(self):
+        return self.seen - len(self.records)
+
+
+def dedupe(results, query_key='query'):
+    """
+    Generador que emite cada URL canónica una sola vez.
+
+    Los registros emitidos se siguen actualizando con las consultas de los
+    repetidos que llegan después.
+    """
+    deduplicator = ResultDeduplicator()
+    for result in results:
+        record = deduplicator.add(result, result.get(query_key))
+        if record is not None:
+            yield record
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Etapa de pre-resolución DNS para la lista de vigilancia de Plant PWR.
+Resuelve todos los hosts en paralelo antes de las verificaciones HTTP,
+con una caché en memoria que respeta el TTL de los registros.
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+try:
+    import dns.exception
+    import dns.resolver
+except ImportError:  # Sin dnspython se usa getaddrinfo con TTL fijo
+    dns = None
+
+DEFAULT_TTL = 300    # TTL cuando el resolvedor no informa uno (getaddrinfo)
+NEGATIVE_TTL = 300   # Cuánto se recuerda un NXDOMAIN
+LOOKUP_TIMEOUT = 5   # Segundos por consulta con dnspython
+MAX_WORKERS = 32     # Resoluciones simultáneas
+
+# host -> (expira_en, ips); ips == [] significa NXDOMAIN
+_cache = {}
+_lock = threading.Lock()
+
+
+def _is_ip(host):
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def _query(host):
+    """
+    Consulta el DNS para un host.
+
+    Returns:
+        Tupla (ips, ttl). ips == [] para NXDOMAIN y None para fallos
+        transitorios (timeout, servidor caído) que no deben cachearse.
+    """
+    if dns is not None:
+        ips = []
+        ttl = None
+        for rdtype in ('A', 'AAAA'):
+            try:
+                answer = dns.resolver.resolve(host, rdtype, lifetime=LOOKUP_TIMEOUT)
+            except dns.resolver.NXDOMAIN:
+                return [], NEGATIVE_TTL
+            except dns.resolver.NoAnswer:
+                continue
+            except dns.exception.DNSException:
+                return None, 0
+            ips.extend(record.to_text() for record in answer)
+            record_ttl = answer.rrset.ttl
+            ttl = record_ttl if ttl is None else min(ttl, record_ttl)
+        if not ips:
+            return [], NEGATIVE_TTL
+        return ips, ttl
+
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        if e.errno in (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)):
+            return [], NEGATIVE_TTL
+        return None, 0
+
+    ips = []
+    for info in infos:
+        ip = info[4][0]
+        if ip not in ips:
+            ips.append(ip)
+    return ips, DEFAULT_TTL
+
+
+def resolve(host):
+    """Resuelve un host usando la caché; devuelve lista de IPs, [] o None"""
+    host = (host or '').lower().rstrip('.')
+    if not host:
+        return None
+    if _is_ip(host):
+        return [host]
+
+    now = time.monotonic()
+    with _lock:
+        cached = _cache.get(host)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    ips, ttl = _query(host)
+    if ips is not None:
+        with _lock:
+            _cache[host] = (now + ttl, ips)
+    return ips
+
+
+def lookup(host):
+    """Consulta solo la caché (sin red); None si no hay entrada vigente"""
+    host = (host or '').lower().rstrip('.')
+    if _is_ip(host):
+        return [host]
+    with _lock:
+        cached = _cache.get(host)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+
+def resolve_all(hosts, max_workers=MAX_WORKERS):
+    """
+    Resuelve todos los hosts en paralelo y llena la caché.
+
+    Returns:
+        Dict host -> lista de IPs ([] para NXDOMAIN, None si falló)
+    """
+    unique_hosts = list(dict.fromkeys(h.lower().rstrip('.') for h in hosts if h))
+    if not unique_hosts:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_hosts))) as executor:
+        return dict(zip(unique_hosts, executor.map(resolve, unique_hosts)))
+
+
+def candidate_hosts(domain_info):
+    """Hosts que las verificaciones de un dominio pueden llegar a contactar"""
+    domain = (domain_info.get('domain') or '').lower()
+    hosts = [domain, f"www.{domain}"] if domain else []
+    url = domain_info.get('url')
+    if url:
+        url_host = urlparse(url).hostname
+        if url_host and url_host not in hosts:
+            hosts.insert(0, url_host)
+    return hosts
+
+
+def is_nxdomain(domain_info):
+    """True si ninguno de los hosts candidatos existe en el DNS"""
+    hosts = candidate_hosts(domain_info)
+    return bool(hosts) and all(lookup(host) == [] for host in hosts)
+
+
+def first_ip(url_or_host):
+    """Primera IP cacheada de una URL o host (para el campo ip_address)"""
+    if not url_or_host:
+        return None
+    host = urlparse(url_or_host).hostname if '//' in url_or_host else url_or_host
+    ips = lookup(host)
+    return ips[0] if ips else None
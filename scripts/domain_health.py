@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Salud por dominio derivada del historial de monitoreo de Plant PWR.
+Calcula timeouts adaptativos a partir de las latencias observadas y aplica
+un circuit breaker que pasa los dominios muertos de forma crónica a un
+sondeo más barato y menos frecuente, con backoff exponencial.
+
+El estado de los circuitos abiertos (fallos seguidos, apertura, backoff
+actual y último sondeo) se guarda aparte en circuit_breaker.json: la
+ventana del log solo cubre HISTORY_DAYS días y, contando los fallos en
+ella, el backoff volvía a encogerse al salir de la ventana los fallos
+antiguos.
+"""
+
+import json
+import math
+import os
+from datetime import datetime, timedelta
+
+from log_store import read_entries
+
+# Timeouts adaptativos (segundos): p95 de latencia × factor, acotado
+CONNECT_FACTOR = 2.0
+READ_FACTOR = 3.0
+MIN_CONNECT_TIMEOUT = 3
+MAX_CONNECT_TIMEOUT = 10
+MIN_READ_TIMEOUT = 5
+MAX_READ_TIMEOUT = 15
+MIN_SAMPLES = 3          # Latencias necesarias antes de adaptar
+
+# Circuit breaker
+FAILURE_THRESHOLD = 7    # Fallos consecutivos para abrir el circuito
+MAX_BACKOFF_DAYS = 32    # Intervalo máximo entre sondeos con el circuito abierto
+HALF_OPEN_TIMEOUT = (3, 5)
+HISTORY_DAYS = 90        # Ventana de historial que se analiza
+HISTORY_FIELDS = ('domain', 'status', 'checked_at', 'response_time')   # Lo que usa build_health
+BREAKER_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/circuit_breaker.json"
+
+CIRCUIT_CLOSED = 'CLOSED'
+CIRCUIT_HALF_OPEN = 'HALF_OPEN'
+CIRCUIT_OPEN = 'OPEN'
+
+
+def load_history(log_file, days=HISTORY_DAYS):
+    """Carga las ejecuciones de los últimos `days` días del log de monitoreo"""
+    return read_entries(log_file, since=datetime.now() - timedelta(days=days), fields=HISTORY_FIELDS)
+
+
+def result_domain(result):
+    """Nombre de dominio de un resultado (logs en formato 1 antiguos guardan el dict completo)"""
+    domain = result.get('domain')
+    if isinstance(domain, dict):
+        domain = domain.get('domain')
+    return domain
+
+
+def load_breakers(path=BREAKER_FILE):
+    """Estado guardado de los circuitos con fallos (dominio -> registro)"""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def save_breakers(breakers, path=BREAKER_FILE):
+    """Guarda el estado de los circuitos de forma atómica"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(breakers, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def build_health(history, breakers=None):
+    """
+    Resume el historial por dominio.
+
+    Args:
+        breakers: Estado guardado de los circuitos (ver load_breakers); se
+            adjunta como 'breaker' a cada dominio que tenga registro
+
+    Returns:
+        Dict dominio -> {'latencies', 'failures', 'last_probe'} donde
+        failures son los INACTIVE consecutivos más recientes (los SKIPPED
+        del circuit breaker no cuentan) y last_probe la fecha del último
+        sondeo real.
+    """
+    health = {}
+    for entry in history:
+        for result in entry.get('results', []):
+            domain = result_domain(result)
+            if not domain:
+                continue
+
+            status = result.get('status', '')
+            if status == 'SKIPPED':
+                continue
+
+            info = health.setdefault(domain, {'latencies': [], 'failures': 0, 'last_probe': None})
+            info['last_probe'] = result.get('checked_at') or entry.get('date')
+
+            if status.startswith('ACTIVE'):
+                info['failures'] = 0
+                if result.get('response_time') is not None:
+                    info['latencies'].append(result['response_time'])
+            else:
+                info['failures'] += 1
+
+    for domain, record in (breakers or {}).items():
+        health.setdefault(domain, {'latencies': [], 'failures': 0, 'last_probe': None})['breaker'] = record
+    return health
+
+
+def _window_breaker(info):
+    """
+    Registro de circuito deducido solo de la ventana del historial.
+
+    Sirve para los dominios que aún no tienen registro guardado (primera
+    ejecución con circuit_breaker.json); None si el circuito está cerrado.
+    """
+    if not info or info['failures'] < FAILURE_THRESHOLD or not info['last_probe']:
+        return None
+    exponent = info['failures'] - FAILURE_THRESHOLD
+    return {
+        'failures': info['failures'],
+        'opened_at': info['last_probe'],
+        'backoff_days': min(2 ** min(exponent, 10), MAX_BACKOFF_DAYS),
+        'last_probe': info['last_probe'],
+    }
+
+
+def update_breakers(breakers, results, health=None):
+    """
+    Actualiza el estado de los circuitos con los resultados de una ejecución.
+
+    Un sondeo correcto cierra el circuito y borra el registro. Cada fallo
+    suma uno; al llegar a FAILURE_THRESHOLD el circuito se abre con el
+    backoff inicial y cada sondeo medio abierto que vuelve a fallar lo
+    duplica hasta MAX_BACKOFF_DAYS, sin depender de la ventana del log.
+
+    Args:
+        health: Salud calculada antes de la ejecución, para iniciar el
+            registro de dominios que aún no lo tienen
+    """
+    health = health or {}
+    for result in results:
+        domain = result_domain(result)
+        status = result.get('status') or ''
+        if not domain:
+            continue
+
+        record = breakers.get(domain)
+        if record is None:
+            record = _window_breaker(health.get(domain))
+            if status == 'SKIPPED' and record:
+                breakers[domain] = record   # Abierto según la ventana: se conserva ya
+        if status == 'SKIPPED':
+            continue
+
+        if status.startswith('ACTIVE'):
+            breakers.pop(domain, None)
+            continue
+
+        if record is None:
+            record = {'failures': health.get(domain, {}).get('failures', 0)}
+        breakers[domain] = record
+        record['failures'] += 1
+        record['last_probe'] = result.get('checked_at') or datetime.now().isoformat()
+        if record['failures'] < FAILURE_THRESHOLD:
+            continue
+        if record.get('opened_at'):
+            record['backoff_days'] = min(record['backoff_days'] * 2, MAX_BACKOFF_DAYS)
+        else:
+            record['opened_at'] = record['last_probe']
+            record['backoff_days'] = 1
+    return breakers
+
+
+def _p95(values):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def adaptive_timeout(health, domain, default):
+    """
+    Timeout (connect, read) para requests según las latencias del dominio.
+
+    Sin suficientes muestras devuelve `default` tal cual.
+    """
+    latencies = health.get(domain, {}).get('latencies', [])
+    if len(latencies) < MIN_SAMPLES:
+        return default
+
+    p95 = _p95(latencies)
+    connect = _clamp(p95 * CONNECT_FACTOR, MIN_CONNECT_TIMEOUT, MAX_CONNECT_TIMEOUT)
+    read = _clamp(p95 * READ_FACTOR, MIN_READ_TIMEOUT, MAX_READ_TIMEOUT)
+    return (round(connect, 1), round(read, 1))
+
+
+def circuit_state(health, domain, now=None):
+    """
+    Estado del circuit breaker de un dominio.
+
+    Con FAILURE_THRESHOLD fallos seguidos el circuito se abre y el dominio
+    solo se vuelve a sondear tras 1, 2, 4... días (hasta MAX_BACKOFF_DAYS).
+    Cuando toca sondear, el circuito queda medio abierto: un único intento
+    barato que lo cierra si responde.
+
+    El backoff sale del registro guardado (ver update_breakers); sin
+    registro se deduce de la ventana del historial.
+
+    Returns:
+        Tupla (estado, fecha_proximo_sondeo o None)
+    """
+    info = health.get(domain)
+    record = (info or {}).get('breaker') or _window_breaker(info)
+    if not record or record['failures'] < FAILURE_THRESHOLD or not record.get('backoff_days'):
+        return CIRCUIT_CLOSED, None
+
+    now = now or datetime.now()
+    next_probe = datetime.fromisoformat(record['last_probe']) + timedelta(days=record['backoff_days'])
+
+    # Margen de una hora para que el cron diario no se salte su ventana
+    if now + timedelta(hours=1) >= next_probe:
+        return CIRCUIT_HALF_OPEN, None
+    return CIRCUIT_OPEN, next_probe
+
+
+def skipped_result(domain_info, next_probe):
+    """Resultado registrado para un dominio con el circuito abierto"""
+    return {
+        'domain': domain_info.get('domain'),
+        'status': 'SKIPPED',
+        'status_code': None,
+        'final_url': None,
+        'circuit': CIRCUIT_OPEN,
+        'next_probe': next_probe.isoformat(),
+        'checked_at': datetime.now().isoformat()
+    }
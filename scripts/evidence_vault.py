@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Bóveda de evidencia con direccionamiento por contenido para Plant PWR.
+
+Cada captura guarda el HTML de la página y sus recursos (imágenes, CSS,
+scripts) como objetos bajo el SHA-256 de su contenido, comprimidos con
+zstd (gzip si zstandard no está instalado). Una página que no cambió
+produce el mismo hash y no ocupa ni un byte más: el almacenamiento crece con
+los cambios reales, no con días × sitios.
+
+El manifiesto (manifest.jsonl, append-only) enlaza cada captura con
+(dominio, URL, fecha, hash). Cada línea incluye el SHA-256 de la anterior,
+de modo que cualquier edición o borrado del historial se detecta al
+verificar; los objetos se verifican recalculando su hash.
+
+Uso:
+    python3 evidence_vault.py capture [dominio ...]   # por defecto los críticos y de alta prioridad
+    python3 evidence_vault.py verify
+    python3 evidence_vault.py history <dominio>
+    python3 evidence_vault.py stats
+    python3 evidence_vault.py export <sha256> [destino]
+"""
+
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+import urllib3
+
+try:
+    import zstandard
+except ImportError:  # Sin zstandard se comprime con gzip (los hashes no cambian)
+    zstandard = None
+
+from http_client import get_session
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+VAULT_DIR = "/root/.openclaw/workspace/plant-pwr-investigation/evidencia/vault"
+DOMAINS_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/dominios/critical_domains.json"
+CAPTURE_SECTIONS = ('critical', 'high_priority')
+
+TIMEOUT = 20
+MAX_PAGE_BYTES = 5 * 1024 * 1024     # Páginas más grandes se guardan truncadas
+MAX_ASSET_BYTES = 2 * 1024 * 1024    # Recursos más grandes no se guardan
+MAX_ASSETS = 25                      # Recursos por página
+ZSTD_LEVEL = 10
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+}
+
+# Extensión de cada códec; al leer se prueban todas
+CODECS = ('.zst', '.gz')
+
+
+def _objects_dir(vault_dir):
+    return os.path.join(vault_dir, "objects")
+
+
+def _manifest_path(vault_dir):
+    return os.path.join(vault_dir, "manifest.jsonl")
+
+
+def object_path(sha256, vault_dir=VAULT_DIR, codec=None):
+    """Ruta del objeto (objects/ab/abcdef....zst); sin codec, la del que exista"""
+    base = os.path.join(_objects_dir(vault_dir), sha256[:2], sha256)
+    if codec:
+        return base + codec
+    for ext in CODECS:
+        if os.path.exists(base + ext):
+            return base + ext
+    return None
+
+
+def _compress(data):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), '.zst'
+    return gzip.compress(data, compresslevel=9, mtime=0), '.gz'
+
+
+def _decompress(payload, path):
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"{path} está comprimido con zstd y zstandard no está instalado")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return gzip.decompress(payload)
+
+
+def put_object(data, vault_dir=VAULT_DIR):
+    """
+    Guarda un contenido bajo su SHA-256.
+
+    Returns:
+        Tupla (sha256, bytes añadidos al disco); 0 si ya existía
+    """
+    sha256 = hashlib.sha256(data).hexdigest()
+    if object_path(sha256, vault_dir):
+        return sha256, 0
+
+    payload, codec = _compress(data)
+    path = object_path(sha256, vault_dir, codec)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return sha256, len(payload)
+
+
+def get_object(sha256, vault_dir=VAULT_DIR, verify=True):
+    """Contenido original de un objeto (ValueError si el hash no coincide)"""
+    path = object_path(sha256, vault_dir)
+    if path is None:
+        raise FileNotFoundError(f"Objeto {sha256} no está en la bóveda")
+    with open(path, 'rb') as f:
+        data = _decompress(f.read(), path)
+    if verify and hashlib.sha256(data).hexdigest() != sha256:
+        raise ValueError(f"Objeto {sha256} dañado: el contenido no coincide con su hash")
+    return data
+
+
+def _line_hash(line):
+    return hashlib.sha256(line.rstrip('\n').encode('utf-8')).hexdigest()
+
+
+def _last_line(f):
+    """Última línea completa de un archivo abierto en binario"""
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    chunk = b''
+    while position > 0:
+        size = min(4096, position)
+        position -= size
+        f.seek(position)
+        chunk = f.read(size) + chunk
+        lines = chunk.rstrip(b'\n').split(b'\n')
+        if len(lines) > 1 or position == 0:
+            return lines[-1].decode('utf-8') if lines[-1] else None
+    return None
+
+
+def append_record(record, vault_dir=VAULT_DIR):
+    """
+    Añade una captura al manifiesto encadenándola con la anterior.
+
+    El archivo se bloquea durante la escritura para que dos capturas
+    simultáneas no enlacen con la misma línea previa.
+    """
+    path = _manifest_path(vault_dir)
+    os.makedirs(vault_dir, exist_ok=True)
+    with open(path, 'a+b') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            last = _last_line(f)
+            record = dict(record, prev=_line_hash(last) if last else None)
+            line = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+            f.seek(0, os.SEEK_END)
+            f.write((line + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    return record
+
+
+def iter_manifest(vault_dir=VAULT_DIR):
+    """Capturas del manifiesto en orden (línea cruda, registro)"""
+    path = _manifest_path(vault_dir)
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield line, json.loads(line)
+
+
+class _AssetCollector(HTMLParser):
+    """URLs de imágenes, hojas de estilo, scripts e imagen og: de una página"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'img':
+            self.urls.append(attrs.get('src'))
+        elif tag == 'script':
+            self.urls.append(attrs.get('src'))
+        elif tag == 'link' and 'stylesheet' in (attrs.get('rel') or '').lower():
+            self.urls.append(attrs.get('href'))
+        elif tag == 'meta' and attrs.get('property') in ('og:image', 'og:image:url'):
+            self.urls.append(attrs.get('content'))
+
+
+def asset_urls(html, base_url, limit=MAX_ASSETS):
+    """URLs absolutas (http/https) de los recursos de la página, sin repetir"""
+    collector = _AssetCollector()
+    try:
+        collector.feed(html)
+    except Exception:
+        pass
+    urls = []
+    for url in collector.urls:
+        if not url or url.startswith('data:'):
+            continue
+        absolute = urljoin(base_url, url.strip())
+        if urlparse(absolute).scheme in ('http', 'https') and absolute not in urls:
+            urls.append(absolute)
+        if len(urls) >= limit:
+            break
+    return urls
+
+
+def fetch(url, max_bytes, session=None):
+    """
+    Descarga como máximo `max_bytes`.
+
+    Returns:
+        Tupla (response, bytes, truncado)
+    """
+    session = session or get_session()
+    response = session.get(url, headers=HEADERS, timeout=TIMEOUT, stream=True, verify=False, allow_redirects=True)
+    try:
+        body = response.raw.read(max_bytes + 1, decode_content=True) or b''
+    finally:
+        response.close()
+    return response, body[:max_bytes], len(body) > max_bytes
+
+
+def capture(domain, url=None, vault_dir=VAULT_DIR, assets=True, session=None):
+    """
+    Captura una página (y sus recursos) y la registra en el manifiesto.
+
+    Returns:
+        Registro del manifiesto; 'new_bytes' son los bytes que la captura
+        añadió al disco (0 si nada cambió desde la anterior)
+    """
+    url = url or f"https://{domain}"
+    captured_at = datetime.now().isoformat()
+    record = {'domain': domain, 'url': url, 'captured_at': captured_at}
+
+    try:
+        response, body, truncated = fetch(url, MAX_PAGE_BYTES, session)
+    except Exception as e:
+        record.update(error=f"{type(e).__name__}: {e}")
+        return append_record(record, vault_dir)
+
+    sha256, new_bytes = put_object(body, vault_dir)
+    record.update(
+        final_url=response.url, status_code=response.status_code,
+        content_type=response.headers.get('Content-Type'),
+        sha256=sha256, size=len(body), truncated=truncated
+    )
+
+    saved_assets = []
+    if assets and 'html' in (response.headers.get('Content-Type') or 'text/html'):
+        html = body.decode(response.encoding or 'utf-8', errors='replace')
+        for asset_url in asset_urls(html, response.url):
+            try:
+                asset_response, data, asset_truncated = fetch(asset_url, MAX_ASSET_BYTES, session)
+            except Exception:
+                continue
+            if asset_response.status_code >= 400 or asset_truncated:
+                continue
+            asset_sha, asset_new = put_object(data, vault_dir)
+            new_bytes += asset_new
+            saved_assets.append({'url': asset_url, 'sha256': asset_sha, 'size': len(data)})
+
+    record.update(assets=saved_assets, new_bytes=new_bytes)
+    return append_record(record, vault_dir)
+
+
+def verify(vault_dir=VAULT_DIR):
+    """
+    Comprueba la cadena del manifiesto y el hash de todos los objetos citados.
+
+    Returns:
+        Dict con capturas, objetos verificados y listas de problemas
+    """
+    report = {'captures': 0, 'objects': 0, 'broken_chain': [], 'missing': [], 'corrupt': []}
+    checked = set()
+    previous = None
+    for number, (line, record) in enumerate(iter_manifest(vault_dir), 1):
+        report['captures'] += 1
+        if record.get('prev') != (_line_hash(previous) if previous else None):
+            report['broken_chain'].append(number)
+        previous = line
+
+        hashes = [record.get('sha256')] + [a['sha256'] for a in record.get('assets', [])]
+        for sha256 in hashes:
+            if not sha256 or sha256 in checked:
+                continue
+            checked.add(sha256)
+            try:
+                get_object(sha256, vault_dir)
+            except FileNotFoundError:
+                report['missing'].append(sha256)
+            except (ValueError, OSError, RuntimeError):
+                report['corrupt'].append(sha256)
+    report['objects'] = len(checked)
+    return report
+
+
+def history(domain, vault_dir=VAULT_DIR):
+    """Capturas de un dominio, marcando cuándo cambió el contenido de la página"""
+    rows = []
+    last_sha = None
+    for _, record in iter_manifest(vault_dir):
+        if record.get('domain') != domain:
+            continue
+        sha256 = record.get('sha256')
+        rows.append(dict(record, changed=sha256 is not None and sha256 != last_sha))
+        last_sha = sha256 or last_sha
+    return rows
+
+
+def stats(vault_dir=VAULT_DIR):
+    """Bytes lógicos (lo que ocuparían las capturas sin deduplicar) frente a bytes en disco"""
+    captures = 0
+    logical = 0
+    for _, record in iter_manifest(vault_dir):
+        captures += 1
+        logical += record.get('size', 0) + sum(a['size'] for a in record.get('assets', []))
+
+    stored = 0
+    objects = 0
+    for folder, _, files in os.walk(_objects_dir(vault_dir)):
+        for name in files:
+            if name.endswith(CODECS):
+                objects += 1
+                stored += os.path.getsize(os.path.join(folder, name))
+    return {'captures': captures, 'objects': objects, 'logical_bytes': logical, 'stored_bytes': stored}
+
+
+def load_targets(domains_file=DOMAINS_FILE, sections=CAPTURE_SECTIONS):
+    """(dominio, url) de las secciones indicadas de critical_domains.json"""
+    if not os.path.exists(domains_file):
+        return []
+    with open(domains_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [(item['domain'], item.get('url')) for section in sections for item in data.get(section, [])]
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ('capture', 'verify', 'history', 'stats', 'export'):
+        print(__doc__)
+        return 1
+
+    command = args[0]
+    if command == 'capture':
+        targets = load_targets()
+        if args[1:]:
+            configured = dict(targets)
+            targets = [(domain, configured.get(domain)) for domain in args[1:]]
+        for domain, url in targets:
+            record = capture(domain, url)
+            if 'error' in record:
+                print(f"❌ {domain}: {record['error']}")
+            else:
+                print(f"📸 {domain}: {record['status_code']} {record['sha256'][:12]} "
+                      f"({len(record['assets'])} recursos, {record['new_bytes']:,} bytes nuevos)")
+        return 0
+
+    if command == 'verify':
+        report = verify()
+        print(f"🔐 {report['captures']} capturas, {report['objects']} objetos verificados")
+        for key, label in (('broken_chain', 'Cadena rota en líneas'), ('missing', 'Objetos ausentes'),
+                           ('corrupt', 'Objetos dañados')):
+            if report[key]:
+                print(f"   ❌ {label}: {', '.join(map(str, report[key][:10]))}")
+        problems = report['broken_chain'] or report['missing'] or report['corrupt']
+        if not problems:
+            print("   ✅ Manifiesto y objetos íntegros")
+        return 1 if problems else 0
+
+    if command == 'history':
+        if len(args) < 2:
+            print(__doc__)
+            return 1
+        for row in history(args[1]):
+            mark = '🆕' if row['changed'] else '  '
+            print(f"{mark} {row['captured_at'][:16]}  {row.get('status_code', '---')}  "
+                  f"{(row.get('sha256') or row.get('error', ''))[:40]}")
+        return 0
+
+    if command == 'stats':
+        data = stats()
+        ratio = data['logical_bytes'] / data['stored_bytes'] if data['stored_bytes'] else 0
+        print(f"🗄️  {data['captures']} capturas, {data['objects']} objetos")
+        print(f"   {data['logical_bytes']:,} bytes capturados → {data['stored_bytes']:,} en disco ({ratio:.1f}x)")
+        return 0
+
+    if len(args) < 2:
+        print(__doc__)
+        return 1
+    data = get_object(args[1])
+    destination = args[2] if len(args) > 2 else f"{args[1]}.bin"
+    with open(destination, 'wb') as f:
+        f.write(data)
+    print(f"💾 {args[1]} verificado y exportado a {destination} ({len(data):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Cliente HTTP compartido para los scripts de Plant PWR.
+Mantiene sesiones persistentes (keep-alive) con pools de conexiones por host
+y políticas de reintento con backoff, para no repetir el handshake TCP/TLS
+en cada petición.
+"""
+
+import socket
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import connection as urllib3_connection
+from urllib3.util.retry import Retry
+
+# Perfiles de sesión: tamaño de pools y política de reintentos
+# - pool_connections: número de hosts distintos con pool en caché
+# - pool_maxsize: conexiones reutilizables por host
+# - retries / backoff / status_forcelist: política de reintentos de urllib3
+PROFILES = {
+    # Whoogle local: un único host, reintentos ante límites de tasa y 5xx
+    'whoogle': {
+        'pool_connections': 2,
+        'pool_maxsize': 10,
+        'retries': 3,
+        'backoff': 1.0,
+        'status_forcelist': (429, 500, 502, 503, 504)
+    },
+    # Monitoreo de tiendas: muchos hosts; sin reintentos porque los
+    # monitores ya prueban varias variantes de URL por dominio
+    'monitor': {
+        'pool_connections': 100,
+        'pool_maxsize': 4,
+        'retries': 0,
+        'backoff': 0,
+        'status_forcelist': ()
+    },
+    'default': {
+        'pool_connections': 10,
+        'pool_maxsize': 10,
+        'retries': 2,
+        'backoff': 0.5,
+        'status_forcelist': (429, 502, 503, 504)
+    }
+}
+
+# Sondeo de disponibilidad: HEAD primero y GET por streaming con límite
+PROBE_MAX_BYTES = 64 * 1024
+HEAD_REJECTED_STATUS = (400, 403, 405, 501)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Resolvedor opcional host -> IPs consultado antes del DNS de urllib3
+_resolver = None
+_original_create_connection = urllib3_connection.create_connection
+
+
+def build_session(pool_connections, pool_maxsize, retries, backoff, status_forcelist):
+    """Crea una sesión con pools por host y la política de reintentos indicada"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(profile='default'):
+    """
+    Devuelve la sesión compartida de un perfil, creándola la primera vez.
+
+    Las sesiones se comparten entre hilos: el pool de urllib3 es seguro
+    para uso concurrente y así las verificaciones paralelas reutilizan
+    conexiones ya abiertas.
+    """
+    with _sessions_lock:
+        session = _sessions.get(profile)
+        if session is None:
+            session = build_session(**PROFILES[profile])
+            _sessions[profile] = session
+        return session
+
+
+def probe(session, url, max_bytes=PROBE_MAX_BYTES, need_content=True, **kwargs):
+    """
+    Sondea una URL transfiriendo lo mínimo posible.
+
+    Envía HEAD primero; hace un GET por streaming, leyendo como máximo
+    `max_bytes` del cuerpo, si el servidor rechaza HEAD o si responde 2xx
+    sin ETag ni Last-Modified (la mayoría de tiendas): sin validadores solo
+    el hash del cuerpo permite detectar cambios.
+
+    Limitación: el hash cubre solo los primeros `max_bytes` del cuerpo. Un
+    cambio más abajo en la página (precios o productos al final de un
+    catálogo largo) no se detecta, y un prefijo dinámico (tokens CSRF,
+    marcas de tiempo, scripts con nonce) da CHANGED en cada ejecución. En
+    esas tiendas conviene subir `max_bytes` o fijarse en page_diff.
+
+    Args:
+        session: Sesión de requests (ver get_session)
+        url: URL a sondear
+        max_bytes: Máximo de bytes del cuerpo a leer en el GET de respaldo
+        need_content: False si no se va a comparar contenido; entonces un
+            HEAD aceptado basta aunque no traiga validadores
+        **kwargs: Argumentos para requests (headers, timeout, verify...)
+
+    Returns:
+        Tupla (response, body) donde body son los bytes leídos (b'' con HEAD)
+    """
+    kwargs.setdefault('allow_redirects', True)
+
+    response = session.head(url, **kwargs)
+    if response.status_code not in HEAD_REJECTED_STATUS:
+        has_validators = 'ETag' in response.headers or 'Last-Modified' in response.headers
+        if not need_content or has_validators or not 200 <= response.status_code < 300:
+            return response, b''
+
+    response.close()
+    response = session.get(url, stream=True, **kwargs)
+    try:
+        body = response.raw.read(max_bytes, decode_content=True) or b''
+    finally:
+        response.close()
+    return response, body
+
+
+def _create_connection(address, *args, **kwargs):
+    """create_connection de urllib3 que usa las IPs del resolvedor instalado"""
+    host, port = address
+    ips = _resolver(host) if _resolver else None
+    if ips is None:
+        return _original_create_connection(address, *args, **kwargs)
+    if not ips:
+        raise socket.gaierror(socket.EAI_NONAME, f"NXDOMAIN: {host}")
+
+    # Solo cambia la dirección del socket: SNI y cabecera Host siguen siendo el host
+    last_error = None
+    for ip in ips:
+        try:
+            return _original_create_connection((ip, port), *args, **kwargs)
+        except OSError as e:
+            last_error = e
+    raise last_error
+
+
+def set_resolver(resolver):
+    """
+    Instala un resolvedor para todas las sesiones.
+
+    Args:
+        resolver: Función host -> lista de IPs, [] para NXDOMAIN o None
+            para dejar que urllib3 resuelva normalmente (ver dns_cache.lookup)
+    """
+    global _resolver
+    _resolver = resolver
+    urllib3_connection.create_connection = _create_connection if resolver else _original_create_connection
+
+
+def close_sessions():
+    """Cierra todas las sesiones abiertas"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
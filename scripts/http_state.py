@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Almacén local de validadores HTTP (ETag, Last-Modified, hash de contenido)
+para detectar cambios en las tiendas monitoreadas con GET condicional.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+STATE_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/http_state.json"
+
+# Estados de cambio registrados en cada resultado
+CHANGE_NEW = 'NEW'
+CHANGE_CHANGED = 'CHANGED'
+CHANGE_UNCHANGED = 'UNCHANGED'
+
+_lock = threading.Lock()
+
+
+def load_state(path=STATE_FILE):
+    """Carga los validadores guardados por URL"""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def save_state(state, path=STATE_FILE):
+    """Guarda los validadores de forma atómica"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with _lock:
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def merge_state(state, other):
+    """Fusiona validadores de otro proceso, quedándose con los más recientes"""
+    with _lock:
+        for url, entry in other.items():
+            current = state.get(url)
+            if current is None or entry.get('checked_at', '') > current.get('checked_at', ''):
+                state[url] = entry
+
+
+def conditional_headers(state, url):
+    """Cabeceras If-None-Match / If-Modified-Since para una URL conocida"""
+    entry = state.get(url) if state is not None else None
+    if not entry:
+        return {}
+
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def content_hash(body):
+    """
+    Hash SHA-256 del cuerpo descargado.
+
+    Con http_client.probe el cuerpo llega truncado a PROBE_MAX_BYTES (64 KiB):
+    el hash no ve cambios más allá de ese prefijo y cambia en cada ejecución
+    si el prefijo trae contenido dinámico (tokens, marcas de tiempo).
+    """
+    return hashlib.sha256(body).hexdigest()
+
+
+def record_validators(state, url, status_code, etag=None, last_modified=None, body_hash=None):
+    """
+    Actualiza los validadores de una URL y clasifica el cambio.
+
+    Un 304 cuenta como "sin cambios" sin necesidad de cuerpo. En otro caso
+    se compara el hash de contenido y, si no hay cuerpo, el ETag o el
+    Last-Modified recibidos.
+
+    Returns:
+        CHANGE_NEW, CHANGE_CHANGED, CHANGE_UNCHANGED o None si no hay con qué comparar
+    """
+    now = datetime.now().isoformat()
+
+    with _lock:
+        previous = state.get(url)
+
+        if status_code == 304:
+            if previous:
+                previous['checked_at'] = now
+            return CHANGE_UNCHANGED
+
+        entry = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': body_hash,
+            'status_code': status_code,
+            'checked_at': now,
+            'changed_at': now
+        }
+
+        if not previous:
+            change = CHANGE_NEW
+        elif body_hash and previous.get('content_hash'):
+            same = body_hash == previous['content_hash']
+            change = CHANGE_UNCHANGED if same else CHANGE_CHANGED
+        elif etag and previous.get('etag'):
+            same = etag == previous['etag']
+            change = CHANGE_UNCHANGED if same else CHANGE_CHANGED
+        elif last_modified and previous.get('last_modified'):
+            same = last_modified == previous['last_modified']
+            change = CHANGE_UNCHANGED if same else CHANGE_CHANGED
+        elif body_hash or etag or last_modified:
+            change = CHANGE_CHANGED
+        else:
+            # Sin cuerpo ni validadores no se puede comparar: conservar lo anterior
+            previous['checked_at'] = now
+            return None
+
+        if change == CHANGE_UNCHANGED:
+            entry['changed_at'] = previous.get('changed_at', now)
+            # Conservar el hash anterior si esta vez no se descargó cuerpo
+            entry['content_hash'] = body_hash or previous.get('content_hash')
+
+        state[url] = entry
+        return change
+
+
+def record_response(state, url, response, body=None):
+    """
+    Registra una respuesta de requests y devuelve el cambio.
+
+    `body` son los bytes leídos del cuerpo (p. ej. con http_client.probe);
+    si no se indica se usa response.content. Un cuerpo vacío (HEAD) solo
+    se compara por ETag / Last-Modified.
+    """
+    if body is None:
+        body = response.content
+
+    body_hash = None
+    if response.status_code != 304 and body:
+        body_hash = content_hash(body)
+
+    return record_validators(
+        state,
+        url,
+        response.status_code,
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+        body_hash=body_hash
+    )
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Almacén SQLite de la investigación Plant PWR.
+
+Reúne en una sola base (modo WAL) lo que vivía repartido en
+dominios/critical_domains.json, plantpwr_analysis_*.json,
+plantpwr_domains_*.txt, plantpwr_spreadsheet_*.csv,
+analisis/problem_sites_investigation_*.json, el log de monitoreo y los
+resultados de Whoogle. Las tablas tienen índices por dominio, prioridad,
+estado y fecha, de modo que consultas como "dominios CRITICAL activos en
+los últimos 7 días" no recorren archivos completos.
+
+Uso:
+    python3 investigation_store.py import                 # importa los archivos existentes
+    python3 investigation_store.py activos [dias] [prioridad]
+"""
+
+import csv
+import glob
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from dedup import canonical_url
+from domain_health import result_domain
+from log_store import LOG_FILE, iter_entries
+from registrable_domain import registrable_domain, url_domain
+from serp_cache import normalize_query
+
+ROOT_DIR = "/root/.openclaw/workspace/plant-pwr-investigation"
+DB_FILE = os.path.join(ROOT_DIR, "investigacion.db")
+
+ACTIVE_PREFIXES = ('ACTIVE', 'ACTIVO', 'ACCESIBLE')
+
+# Archivos de resultados de Whoogle (relativos a ROOT_DIR)
+SEARCH_RESULT_PATTERNS = ('evidencia/whoogle_*.json', 'analisis/whoogle_results_*.json')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS domains (
+    domain      TEXT PRIMARY KEY,
+    registrable TEXT,
+    priority    TEXT,
+    status      TEXT,
+    category    TEXT,
+    url         TEXT,
+    notes       TEXT,
+    source      TEXT,
+    first_seen  TEXT,
+    updated_at  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_domains_priority ON domains(priority);
+CREATE INDEX IF NOT EXISTS idx_domains_status ON domains(status);
+CREATE INDEX IF NOT EXISTS idx_domains_registrable ON domains(registrable);
+
+CREATE TABLE IF NOT EXISTS urls (
+    url           TEXT PRIMARY KEY,
+    canonical_url TEXT,
+    domain        TEXT,
+    first_seen    TEXT,
+    last_seen     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_urls_domain ON urls(domain);
+CREATE INDEX IF NOT EXISTS idx_urls_canonical ON urls(canonical_url);
+
+CREATE TABLE IF NOT EXISTS checks (
+    id            INTEGER PRIMARY KEY,
+    domain        TEXT NOT NULL,
+    url           TEXT,
+    status        TEXT,
+    active        INTEGER NOT NULL DEFAULT 0,
+    status_code   INTEGER,
+    final_url     TEXT,
+    ip_address    TEXT,
+    response_time REAL,
+    checked_at    TEXT NOT NULL,
+    source        TEXT,
+    UNIQUE (domain, checked_at, source)
+);
+CREATE INDEX IF NOT EXISTS idx_checks_domain_time ON checks(domain, checked_at);
+CREATE INDEX IF NOT EXISTS idx_checks_active_time ON checks(active, checked_at);
+CREATE INDEX IF NOT EXISTS idx_checks_status ON checks(status);
+
+CREATE TABLE IF NOT EXISTS queries (
+    query      TEXT PRIMARY KEY,
+    normalized TEXT,
+    first_run  TEXT,
+    last_run   TEXT,
+    runs       INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_queries_normalized ON queries(normalized);
+
+CREATE TABLE IF NOT EXISTS search_hits (
+    id       INTEGER PRIMARY KEY,
+    query    TEXT,
+    url      TEXT NOT NULL,
+    domain   TEXT,
+    title    TEXT,
+    snippet  TEXT,
+    page     INTEGER,
+    rank     INTEGER,
+    found_at TEXT,
+    UNIQUE (query, url, found_at)
+);
+CREATE INDEX IF NOT EXISTS idx_hits_domain ON search_hits(domain);
+CREATE INDEX IF NOT EXISTS idx_hits_found_at ON search_hits(found_at);
+"""
+
+
+def connect(path=DB_FILE):
+    """Abre (y crea si hace falta) la base en modo WAL"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def is_active(status):
+    return bool(status) and status.upper().startswith(ACTIVE_PREFIXES)
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+# Inserción por lotes: cada función es una sola transacción con executemany
+
+def upsert_domains(conn, rows, source=None):
+    """
+    Inserta o actualiza dominios.
+
+    Los campos ausentes (None) no sobrescriben lo ya guardado, así que se
+    pueden combinar fuentes parciales (el CSV trae categoría, el JSON notas).
+    """
+    now = _now()
+    params = [
+        (row['domain'], registrable_domain(row['domain']), row.get('priority'), row.get('status'),
+         row.get('category'), row.get('url'), row.get('notes'), row.get('source', source),
+         row.get('first_seen') or now, now)
+        for row in rows if row.get('domain')
+    ]
+    with conn:
+        conn.executemany("""
+            INSERT INTO domains (domain, registrable, priority, status, category, url, notes, source, first_seen, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(domain) DO UPDATE SET
+                priority   = COALESCE(excluded.priority, priority),
+                status     = COALESCE(excluded.status, status),
+                category   = COALESCE(excluded.category, category),
+                url        = COALESCE(excluded.url, url),
+                notes      = COALESCE(excluded.notes, notes),
+                source     = COALESCE(excluded.source, source),
+                first_seen = MIN(first_seen, excluded.first_seen),
+                updated_at = excluded.updated_at
+        """, params)
+    return len(params)
+
+
+def add_urls(conn, urls, seen_at=None):
+    """Registra URLs vistas (primera y última aparición)"""
+    seen_at = seen_at or _now()
+    params = [(url, canonical_url(url), url_domain(url), seen_at, seen_at) for url in urls if url]
+    with conn:
+        conn.executemany("""
+            INSERT INTO urls (url, canonical_url, domain, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                first_seen = MIN(first_seen, excluded.first_seen),
+                last_seen  = MAX(last_seen, excluded.last_seen)
+        """, params)
+    return len(params)
+
+
+def add_checks(conn, results, source='monitor', default_time=None):
+    """
+    Inserta resultados de comprobación (formato del log de monitoreo).
+
+    Los dominios comprobados que aún no están en `domains` se registran ahí,
+    así que active_domains ve lo que el monitor escribe sin importar antes
+    critical_domains.json.
+
+    Returns:
+        Número de filas nuevas (las repetidas se ignoran: importar dos
+        veces el mismo log no duplica)
+    """
+    params = []
+    for result in results:
+        domain = result_domain(result)
+        checked_at = result.get('checked_at') or default_time
+        if not domain or not checked_at:
+            continue
+        status = result.get('status')
+        params.append((
+            domain, result.get('tested_url') or result.get('url'), status, int(is_active(status)),
+            result.get('status_code'), result.get('final_url'), result.get('ip_address'),
+            result.get('response_time'), checked_at, source
+        ))
+
+    with conn:
+        # Solo se crea la fila: prioridad, notas y origen vienen de las otras fuentes
+        conn.executemany("""
+            INSERT INTO domains (domain, registrable, first_seen, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(domain) DO UPDATE SET first_seen = MIN(first_seen, excluded.first_seen)
+        """, [(p[0], registrable_domain(p[0]), p[8], p[8]) for p in params])
+        before = conn.total_changes
+        conn.executemany("""
+            INSERT OR IGNORE INTO checks
+                (domain, url, status, active, status_code, final_url, ip_address, response_time, checked_at, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, params)
+        return conn.total_changes - before
+
+
+def record_queries(conn, queries, run_at=None):
+    """Cuenta una ejecución de cada consulta"""
+    run_at = run_at or _now()
+    with conn:
+        conn.executemany("""
+            INSERT INTO queries (query, normalized, first_run, last_run, runs) VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT(query) DO UPDATE SET
+                runs     = runs + (excluded.last_run > last_run),
+                last_run = MAX(last_run, excluded.last_run)
+        """, [(query, normalize_query(query), run_at, run_at) for query in queries])
+
+
+def add_search_hits(conn, results, default_time=None):
+    """Inserta resultados de búsqueda; un resultado fusionado cuenta para cada consulta"""
+    params = []
+    for result in results:
+        url = result.get('url')
+        if not url:
+            continue
+        found_at = result.get('found_at') or default_time or _now()
+        queries = result.get('queries') or [result.get('query') or result.get('search_term')]
+        for query in queries:
+            params.append((query, url, url_domain(url), result.get('title'), result.get('snippet'),
+                           result.get('page'), result.get('rank'), found_at))
+
+    with conn:
+        before = conn.total_changes
+        conn.executemany("""
+            INSERT OR IGNORE INTO search_hits (query, url, domain, title, snippet, page, rank, found_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, params)
+        inserted = conn.total_changes - before
+    add_urls(conn, [p[1] for p in params], default_time)
+    return inserted
+
+
+# Consultas
+
+def active_domains(conn, days=7, priority=None):
+    """
+    Dominios con al menos una comprobación activa en los últimos `days` días.
+
+    Returns:
+        Filas (domain, priority, status, last_active, active_checks)
+    """
+    since = (datetime.now() - timedelta(days=days)).isoformat()
+    sql = """
+        SELECT d.domain, d.priority, d.status, MAX(c.checked_at) AS last_active, COUNT(*) AS active_checks
+        FROM checks c JOIN domains d ON d.domain = c.domain
+        WHERE c.active = 1 AND c.checked_at >= ?
+    """
+    params = [since]
+    if priority:
+        sql += " AND d.priority = ?"
+        params.append(priority)
+    sql += " GROUP BY d.domain ORDER BY last_active DESC"
+    return conn.execute(sql, params).fetchall()
+
+
+def domain_history(conn, domain, limit=30):
+    """Últimas comprobaciones de un dominio"""
+    return conn.execute(
+        "SELECT * FROM checks WHERE domain = ? ORDER BY checked_at DESC LIMIT ?", (domain, limit)
+    ).fetchall()
+
+
+# Importadores de los archivos existentes
+
+def import_critical_domains(conn, path):
+    """dominios/critical_domains.json: la sección es la categoría"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rows = []
+    for section, items in data.items():
+        if section == 'metadata' or not isinstance(items, list):
+            continue
+        for item in items:
+            rows.append(dict(item, category=section))
+    return upsert_domains(conn, rows, source=os.path.basename(path))
+
+
+def import_domain_analysis(conn, path):
+    """plantpwr_analysis_*.json: estado de cada dominio, categorías y tareas"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    categories = {}
+    for category, domains in data.get('categories', {}).items():
+        for domain in domains:
+            categories.setdefault(domain, category)
+    priorities = {item['domain']: item.get('priority') for item in data.get('todo_list', [])}
+
+    rows = []
+    checks = []
+    for domain, info in data.get('domains', {}).items():
+        rows.append({
+            'domain': domain, 'status': info.get('status'), 'category': categories.get(domain),
+            'priority': priorities.get(domain), 'url': info.get('final_url')
+        })
+        checks.append(dict(info, domain=domain))
+
+    upsert_domains(conn, rows, source=os.path.basename(path))
+    return add_checks(conn, checks, source='analysis')
+
+
+def import_domain_list(conn, path):
+    """plantpwr_domains_*.txt: líneas 'dominio - ESTADO'"""
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or ' - ' not in line:
+                continue
+            domain, status = line.rsplit(' - ', 1)
+            rows.append({'domain': domain.strip(), 'status': status.strip()})
+    return upsert_domains(conn, rows, source=os.path.basename(path))
+
+
+def import_spreadsheet(conn, path):
+    """plantpwr_spreadsheet_*.csv"""
+    rows = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            url = row.get('URL')
+            rows.append({
+                'domain': row.get('Dominio'), 'priority': row.get('Prioridad') or None,
+                'category': row.get('Categoría') or None, 'status': row.get('Estado') or None,
+                'url': url if url and url != 'None' else None, 'notes': row.get('Notas') or None
+            })
+    return upsert_domains(conn, rows, source=os.path.basename(path))
+
+
+def import_problem_sites(conn, path):
+    """analisis/problem_sites_investigation_*.json"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    checks = []
+    for item in data.get('results', []):
+        checks.append({
+            'domain': item.get('domain'), 'url': item.get('original_url'), 'status': item.get('status'),
+            'final_url': item.get('alternative_url'), 'ip_address': item.get('ip_address'),
+            'checked_at': item.get('investigated_at')
+        })
+    add_urls(conn, [item.get('original_url') for item in data.get('results', [])])
+    return add_checks(conn, checks, source='problem_sites')
+
+
+def import_monitor_log(conn, path=LOG_FILE, include_archive=True):
+    """Log de monitoreo (JSONL, archivo comprimido incluido)"""
+    inserted = 0
+    for entry in iter_entries(path, include_archive=include_archive):
+        inserted += add_checks(conn, entry.get('results', []), source='monitor', default_time=entry.get('date'))
+    return inserted
+
+
+def import_legacy_monitor_log(conn, path):
+    """monitoreo/daily_log.json antiguo (array JSON)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return sum(add_checks(conn, entry.get('results', []), source='monitor', default_time=entry.get('date'))
+               for entry in entries)
+
+
+def load_search_results(path):
+    """
+    Lee un archivo de resultados de Whoogle (lista o {'metadata', 'results'}).
+
+    Returns:
+        Tupla (resultados, generated_at o None, términos buscados)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return data, None, []
+    metadata = data.get('metadata', {})
+    return data.get('results', []), metadata.get('generated_at'), metadata.get('search_terms', [])
+
+
+def import_search_results(conn, path):
+    """
+    Resultados de Whoogle.
+
+    Los resultados sin found_at toman la fecha del archivo (generated_at o,
+    si no la trae, su fecha de modificación): con una fecha estable la
+    restricción única evita duplicar al importar dos veces el mismo archivo.
+    """
+    results, generated_at, terms = load_search_results(path)
+    default_time = generated_at or datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+    if terms:
+        record_queries(conn, terms, default_time)
+    return add_search_hits(conn, results, default_time=default_time)
+
+
+def import_all(conn, root=ROOT_DIR):
+    """Importa todos los archivos conocidos; es idempotente"""
+    def files(pattern):
+        return sorted(glob.glob(os.path.join(root, pattern)))
+
+    summary = {}
+    for label, pattern, importer in [
+        ('critical_domains', 'dominios/critical_domains.json', import_critical_domains),
+        ('analysis', 'dominios/plantpwr_analysis_*.json', import_domain_analysis),
+        ('domain_lists', 'dominios/plantpwr_domains_*.txt', import_domain_list),
+        ('spreadsheets', 'dominios/plantpwr_spreadsheet_*.csv', import_spreadsheet),
+        ('problem_sites', 'analisis/problem_sites_investigation_*.json', import_problem_sites),
+        ('legacy_log', 'monitoreo/daily_log.json', import_legacy_monitor_log),
+    ] + [('search_results', pattern, import_search_results) for pattern in SEARCH_RESULT_PATTERNS]:
+        for path in files(pattern):
+            summary[label] = summary.get(label, 0) + importer(conn, path)
+
+    log_path = os.path.join(root, 'monitoreo', 'daily_log.jsonl')
+    summary['monitor_log'] = import_monitor_log(conn, log_path, include_archive=True)
+    return summary
+
+
+# Registro desde los scripts (errores de la base no detienen el monitoreo)
+
+def record_monitor_run(log_entry, path=DB_FILE):
+    """Guarda las comprobaciones de una ejecución del monitor"""
+    try:
+        conn = connect(path)
+        try:
+            return add_checks(conn, log_entry.get('results', []), source='monitor',
+                              default_time=log_entry.get('date'))
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  No se pudo actualizar {path}: {e}")
+        return 0
+
+
+def record_search_run(results, queries, run_at=None, path=DB_FILE):
+    """Guarda las consultas y resultados de un barrido de Whoogle"""
+    try:
+        conn = connect(path)
+        try:
+            record_queries(conn, queries, run_at)
+            return add_search_hits(conn, results, default_time=run_at)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  No se pudo actualizar {path}: {e}")
+        return 0
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ('import', 'activos'):
+        print(__doc__)
+        return 1
+
+    conn = connect()
+    try:
+        if args[0] == 'import':
+            summary = import_all(conn)
+            print(f"🗄️  Importado en {DB_FILE}:")
+            for label, count in summary.items():
+                print(f"   • {label}: {count}")
+            return 0
+
+        days = int(args[1]) if len(args) > 1 else 7
+        priority = args[2] if len(args) > 2 else 'CRITICAL'
+        rows = active_domains(conn, days, priority)
+        print(f"🚨 Dominios {priority} activos en los últimos {days} días: {len(rows)}")
+        for row in rows:
+            print(f"   • {row['domain']:<30} último activo {row['last_active'][:16]}  ({row['active_checks']} comprobaciones)")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Búsqueda de muchas palabras clave a la vez (Aho-Corasick) para Plant PWR.
+
+Comprobar `any(k in texto for k in keywords)` cuesta O(palabras × texto) y
+crece con cada alias de marca, producto o patrón de revendedor que se añade.
+El autómata se construye una vez desde el diccionario de config.json
+(tools.whoogle.suspicious_keywords) y recorre dominio, título y snippet en
+una sola pasada, informando qué palabras y categorías coincidieron.
+Mayúsculas y tildes se ignoran ("Medellín" coincide con "medellin").
+
+Las palabras ASCII cortas (siglas como "thc", "cbd" o "pets") solo
+coinciden como palabra completa: dentro de otra palabra son casi siempre
+falsos positivos ("healthcare", "carpets"). Las largas siguen coincidiendo
+dentro de nombres de dominio pegados ("tiendaplantpwr.com").
+"""
+
+import bisect
+import json
+import os
+import unicodedata
+from collections import deque
+
+CONFIG_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/config.json"
+
+# Diccionarios usados si config.json no define la clave en tools.whoogle
+DEFAULT_KEYWORDS = {
+    'suspicious_keywords': {
+        'sospechoso': ['plantpwr', 'zelvatic', 'cannabis', 'mascota', 'veterinaria']
+    },
+    'link_keywords': ['plantpwr', 'instagram', 'facebook', 'mercadolibre', 'ispetshope']
+}
+
+# Longitud máxima de las palabras ASCII que exigen límites de palabra
+WHOLE_WORD_MAX_LENGTH = 4
+
+
+def fold(text):
+    """Minúsculas y sin tildes"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+class KeywordMatcher:
+    """
+    Autómata Aho-Corasick sobre un diccionario categoría -> palabras clave.
+
+    La construcción es O(total de caracteres de las palabras) y cada
+    búsqueda O(longitud del texto + coincidencias), sin importar cuántas
+    palabras haya.
+    """
+
+    def __init__(self, keywords):
+        if isinstance(keywords, (list, tuple, set)):
+            keywords = {'keyword': list(keywords)}
+
+        self.goto = [{}]       # Transiciones por estado
+        self.fail = [0]        # Enlace de fallo por estado
+        self.output = [[]]     # (palabra, categoría, longitud si es palabra completa o 0)
+        self.size = 0
+
+        for category, words in keywords.items():
+            for word in words:
+                self._add(fold(word), word, category)
+        self._build()
+
+    def _add(self, folded, word, category):
+        if not folded:
+            return
+        state = 0
+        for char in folded:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        whole = len(folded) if len(folded) <= WHOLE_WORD_MAX_LENGTH and folded.isascii() else 0
+        if not any(out[:2] == (word, category) for out in self.output[state]):
+            self.output[state].append((word, category, whole))
+            self.size += 1
+
+    def _build(self):
+        """Enlaces de fallo por anchura; cada estado hereda las salidas de su fallo"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def iter_matches(self, text):
+        """Genera (palabra, categoría, posición final) de cada coincidencia"""
+        goto, fail, output = self.goto, self.fail, self.output
+        folded = fold(text)
+        last = len(folded) - 1
+        state = 0
+        for position, char in enumerate(folded):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for word, category, whole in output[state]:
+                if whole:
+                    start = position - whole + 1
+                    if (start > 0 and folded[start - 1].isalnum()) or \
+                            (position < last and folded[position + 1].isalnum()):
+                        continue
+                yield word, category, position
+
+    def scan(self, *texts):
+        """
+        Busca en varios textos en una sola pasada.
+
+        Returns:
+            Dict categoría -> lista ordenada de palabras que coincidieron
+        """
+        # Separador que ninguna palabra contiene: no hay coincidencias entre textos
+        text = '\n'.join(t for t in texts if t)
+        hits = {}
+        for word, category, _ in self.iter_matches(text):
+            hits.setdefault(category, set()).add(word)
+        return {category: sorted(words) for category, words in hits.items()}
+
+    def scan_fields(self, **fields):
+        """
+        Como scan, pero separando las coincidencias por campo.
+
+        Ejemplo: scan_fields(domain=..., title=..., snippet=...) recorre los
+        tres textos una sola vez.
+
+        Returns:
+            Dict campo -> {categoría: palabras}; solo campos con coincidencias
+        """
+        names = []
+        ends = []
+        parts = []
+        offset = 0
+        for name, value in fields.items():
+            value = fold(value or '')
+            names.append(name)
+            parts.append(value)
+            offset += len(value) + 1
+            ends.append(offset - 1)   # Posición del separador que cierra el campo
+
+        hits = {}
+        for word, category, position in self.iter_matches('\n'.join(parts)):
+            name = names[bisect.bisect_left(ends, position)]
+            hits.setdefault(name, {}).setdefault(category, set()).add(word)
+        return {
+            name: {category: sorted(words) for category, words in categories.items()}
+            for name, categories in hits.items()
+        }
+
+    def matches(self, *texts):
+        """True si alguna palabra aparece en los textos"""
+        text = '\n'.join(t for t in texts if t)
+        return next(self.iter_matches(text), None) is not None
+
+
+def load_keywords(key='suspicious_keywords', path=CONFIG_FILE):
+    """Palabras de tools.whoogle.<key> en config.json (o las de DEFAULT_KEYWORDS)"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            keywords = json.load(f).get('tools', {}).get('whoogle', {}).get(key)
+        if keywords:
+            return keywords
+    return DEFAULT_KEYWORDS[key]
+
+
+_matchers = {}
+
+
+def get_matcher(key='suspicious_keywords'):
+    """Autómata de un diccionario de config.json, construido una vez por proceso"""
+    if key not in _matchers:
+        _matchers[key] = KeywordMatcher(load_keywords(key))
+    return _matchers[key]
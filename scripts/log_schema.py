@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Formato compacto (versión 2) de las ejecuciones del log de monitoreo.
+
+El formato 1 guardaba cada resultado con claves largas, la fecha ISO
+completa y, en los logs antiguos, el dict de configuración del dominio
+(url, estado, prioridad, notas) copiado en cada resultado de cada
+ejecución. En el formato 2:
+
+  • los resultados se guardan por columnas ('cols': una lista por campo,
+    con clave corta), así que cada ejecución es un solo objeto JSON y no
+    uno por resultado; parsear cuesta según el número de objetos, no de bytes
+  • el dominio es un id entero del registro <log>_domains.jsonl
+    (append-only, una línea {"id": n, "d": "dominio"} por dominio nuevo)
+  • estado, circuito, cambio, método y estrategia son códigos enteros
+  • las columnas sin ningún valor no se escriben
+  • checked_at guarda solo la hora si es del mismo día que la ejecución
+    (la fecha se toma de la ejecución al leer)
+  • los campos de configuración (notas, prioridad, url configurada) no se
+    repiten: viven en critical_domains.json. Lo que el monitor añade a las
+    notas en cada ejecución (" (SSL Issue)", " - NXDOMAIN", " - Todos los
+    intentos fallaron") se conserva como el código 'reason'
+
+Los lectores reciben siempre el formato 1 con 'domain' como cadena:
+log_store decodifica al leer, así que domain_health y el resto no
+distinguen entre versiones.
+"""
+
+import fcntl
+import json
+import os
+
+SCHEMA_VERSION = 2
+
+# Códigos de los valores enumerados (no cambiar los existentes: el log los guarda)
+STATUS_CODES = {'INACTIVE': 0, 'ACTIVE': 1, 'ACTIVE_SSL_ISSUE': 2, 'SKIPPED': 3}
+CIRCUIT_CODES = {'CLOSED': 0, 'HALF_OPEN': 1, 'OPEN': 2}
+CHANGE_CODES = {'NEW': 0, 'CHANGED': 1, 'UNCHANGED': 2}
+METHOD_CODES = {'HEAD': 0, 'GET': 1}
+STRATEGY_CODES = {'specific': 0, 'https': 1, 'http': 2, 'https_www': 3, 'http_www': 4}
+DNS_CODES = {'NXDOMAIN': 0}
+REASON_CODES = {'SSL_ISSUE': 0, 'NXDOMAIN': 1, 'ALL_FAILED': 2}
+
+# Diagnóstico que los monitores añadían al final de las notas -> reason
+NOTE_REASONS = {
+    ' (SSL Issue)': 'SSL_ISSUE',
+    ' - NXDOMAIN': 'NXDOMAIN',
+    ' - Todos los intentos fallaron': 'ALL_FAILED',
+}
+
+# Campo del formato 1 -> (clave corta, códigos o None)
+FIELDS = {
+    'status': ('s', STATUS_CODES),
+    'status_code': ('c', None),
+    'final_url': ('u', None),
+    'tested_url': ('tu', None),
+    'probe_method': ('m', METHOD_CODES),
+    'ip_address': ('ip', None),
+    'response_time': ('rt', None),
+    'circuit': ('ci', CIRCUIT_CODES),
+    'change': ('ch', CHANGE_CODES),
+    'strategy': ('st', STRATEGY_CODES),
+    'dns': ('dn', DNS_CODES),
+    'next_probe': ('np', None),
+    'reason': ('rs', REASON_CODES),
+}
+
+# Copias de critical_domains.json que no se guardan por resultado
+CONFIG_FIELDS = ('notes', 'priority', 'url', 'last_checked')
+
+# Decodificación: clave corta -> nombre, y tablas código -> valor
+_NAMES = {short: name for name, (short, _) in FIELDS.items()}
+_NAMES.update(d='domain', t='checked_at')
+_SHORT = {name: short for short, name in _NAMES.items()}
+_TABLES = {
+    short: {code: value for value, code in codes.items()}
+    for short, codes in FIELDS.values() if codes
+}
+
+
+def registry_path(log_path):
+    """Registro de dominios asociado a un log (daily_log.jsonl -> daily_log_domains.jsonl)"""
+    base = log_path[:-len('.jsonl')] if log_path.endswith('.jsonl') else log_path
+    return f"{base}_domains.jsonl"
+
+
+class DomainRegistry:
+    """
+    Dominios internados de un log: id entero <-> nombre.
+
+    El archivo es append-only; cada línea lleva su id, así que una línea
+    truncada por una caída se ignora sin desplazar los demás ids.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.ids = {}
+        self.names = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                self.ids[item['d']] = item['id']
+                self.names[item['id']] = item['d']
+
+    def name(self, domain_id):
+        return self.names.get(domain_id)
+
+    def intern(self, domains):
+        """
+        Ids de los dominios, registrando los nuevos.
+
+        Los nuevos se añaden con el archivo bloqueado (otro monitor puede
+        estar escribiendo) y con fsync antes de devolver: el log nunca
+        referencia un id que no esté en disco.
+        """
+        missing = [d for d in dict.fromkeys(domains) if d not in self.ids]
+        if missing:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a+', encoding='utf-8') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    self._load()
+                    lines = []
+                    next_id = max(self.names, default=-1) + 1
+                    for domain in missing:
+                        if domain in self.ids:
+                            continue
+                        self.ids[domain] = next_id
+                        self.names[next_id] = domain
+                        lines.append(json.dumps({'id': next_id, 'd': domain}, ensure_ascii=False))
+                        next_id += 1
+                    if lines:
+                        f.seek(0, os.SEEK_END)
+                        prefix = '\n' if f.tell() > 0 and not self._ends_with_newline() else ''
+                        f.write(prefix + '\n'.join(lines) + '\n')
+                        f.flush()
+                        os.fsync(f.fileno())
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return [self.ids[d] for d in domains]
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+
+def _domain_name(result):
+    domain = result.get('domain')
+    if isinstance(domain, dict):
+        domain = domain.get('domain')
+    return domain
+
+
+def note_reason(notes):
+    """Diagnóstico de una ejecución añadido a las notas del dominio (o None)"""
+    for suffix, reason in NOTE_REASONS.items():
+        if notes and notes.endswith(suffix):
+            return reason
+    return None
+
+
+def encode_entry(entry, registry):
+    """Ejecución en formato 1 (o ya en formato 2) -> formato 2"""
+    if entry.get('v') == SCHEMA_VERSION:
+        return entry
+
+    results = entry.get('results', [])
+    date = entry.get('date') or ''
+    count = len(results)
+    columns = {'d': registry.intern([_domain_name(r) or '' for r in results])}
+
+    for row, result in enumerate(results):
+        if 'reason' not in result and note_reason(result.get('notes')):
+            result = dict(result, reason=note_reason(result['notes']))
+        for name, value in result.items():
+            if value is None or name == 'domain' or name in CONFIG_FIELDS:
+                continue
+            if name == 'checked_at':
+                key = 't'
+                if len(value) > 11 and value[:11] == date[:11]:
+                    value = value[11:]
+            elif name in FIELDS:
+                key, codes = FIELDS[name]
+                if codes:
+                    value = codes.get(value, value)
+            else:
+                # Campos que este formato aún no conoce se guardan con su nombre
+                key = name
+            columns.setdefault(key, [None] * count)[row] = value
+
+    encoded = {'v': SCHEMA_VERSION}
+    encoded.update((k, v) for k, v in entry.items() if k != 'results')
+    encoded['n'] = count
+    encoded['cols'] = columns
+    return encoded
+
+
+def decode_entry(entry, registry, fields=None):
+    """
+    Ejecución en formato 2 -> formato 1 ('domain' como cadena); el formato 1 pasa tal cual.
+
+    Args:
+        fields: Campos a reconstruir (None = todos). Rehacer todas las filas
+            cuesta más que parsear el formato 1; los lectores que recorren
+            mucho historial piden solo las columnas que usan.
+    """
+    if entry.get('v') != SCHEMA_VERSION:
+        return entry
+
+    columns = entry.get('cols', {})
+    count = entry.get('n', 0)
+    day = (entry.get('date') or '')[:11]
+    if fields is None:
+        wanted = set(columns) | {'c', 'u'}
+    else:
+        wanted = {_SHORT.get(f, f) for f in fields}
+
+    keys = []
+    values = []
+    for key in [k for k in columns if k in wanted] + sorted(wanted.difference(columns)):
+        column = columns.get(key) or [None] * count
+        if key == 'd':
+            column = list(map(registry.names.get, column))
+        elif key == 't':
+            # Solo la hora: la fecha es la de la ejecución
+            column = [day + v if v is not None and v[2:3] == ':' else v for v in column]
+        elif key in _TABLES:
+            column = list(map(_TABLES[key].get, column, column))
+        keys.append(_NAMES.get(key, key))
+        values.append(column)
+
+    decoded = {k: v for k, v in entry.items() if k not in ('v', 'n', 'cols')}
+    decoded['results'] = [dict(zip(keys, row)) for row in zip(*values)] if keys else [{} for _ in range(count)]
+    return decoded
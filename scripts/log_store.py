@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Log de monitoreo append-only para Plant PWR.
+Cada ejecución se guarda como una línea JSON (JSONL): escribir cuesta O(1)
+sin importar el tamaño del historial, una caída a mitad de escritura solo
+puede dañar la última línea, y los lectores leen solo la ventana que piden.
+
+Las ejecuciones se escriben en el formato compacto de log_schema y se
+devuelven decodificadas: los lectores siempre ven 'domain' como cadena.
+
+Uso:
+    python3 log_store.py            # compacta y archiva (cron semanal)
+    python3 log_store.py migrate    # reescribe el historial al formato compacto
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from log_schema import DomainRegistry, SCHEMA_VERSION, decode_entry, encode_entry, registry_path
+
+LOG_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/daily_log.jsonl"
+LEGACY_LOG_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/daily_log.json"
+ARCHIVE_DIR = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/archivo"
+
+HOT_DAYS = 90          # Días que se quedan en el log activo al compactar
+READ_BLOCK = 64 * 1024  # Tamaño de bloque al leer desde el final
+
+
+def _dump(entry):
+    return json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+
+
+def _parse(line):
+    """Parsea una línea; None si está vacía o truncada por una caída"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def migrate_legacy(path=LOG_FILE, legacy_path=LEGACY_LOG_FILE):
+    """Convierte el daily_log.json antiguo (array JSON) a JSONL una sola vez"""
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return 0
+
+    try:
+        with open(legacy_path, 'r') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return 0
+
+    registry = DomainRegistry(registry_path(path))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(_dump(encode_entry(entry, registry)) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+def append_entry(entry, path=LOG_FILE):
+    """
+    Añade una ejecución al final del log.
+
+    Una sola escritura en modo append + fsync: el historial existente
+    nunca se reescribe. Si aún existe el log antiguo se migra primero.
+    Los dominios nuevos se registran (con fsync) antes de escribir la línea.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if path == LOG_FILE:
+        migrate_legacy(path)
+
+    entry = encode_entry(entry, DomainRegistry(registry_path(path)))
+    line = (_dump(entry) + '\n').encode('utf-8')
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        # Si la línea anterior quedó truncada, empezar en una línea nueva
+        if os.fstat(fd).st_size > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    line = b'\n' + line
+        os.write(fd, line)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def iter_reverse(path=LOG_FILE, fields=None):
+    """Itera las ejecuciones de la más reciente a la más antigua leyendo por bloques"""
+    if not os.path.exists(path):
+        return
+
+    registry = DomainRegistry(registry_path(path))
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+
+        while position > 0:
+            size = min(READ_BLOCK, position)
+            position -= size
+            f.seek(position)
+            chunk = f.read(size) + remainder
+            lines = chunk.split(b'\n')
+            # La primera línea puede estar incompleta: se completa en el siguiente bloque
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                entry = _parse(line.decode('utf-8', errors='replace'))
+                if entry is not None:
+                    yield decode_entry(entry, registry, fields)
+
+        entry = _parse(remainder.decode('utf-8', errors='replace'))
+        if entry is not None:
+            yield decode_entry(entry, registry, fields)
+
+
+def read_entries(path=LOG_FILE, last=None, since=None, fields=None):
+    """
+    Lee una ventana del historial sin cargar el archivo completo.
+
+    Args:
+        path: Ruta del log JSONL
+        last: Número máximo de ejecuciones más recientes
+        since: datetime; solo ejecuciones con fecha posterior o igual
+        fields: Campos de cada resultado que se necesitan (None = todos)
+
+    Returns:
+        Lista de ejecuciones en orden cronológico
+    """
+    if path == LOG_FILE:
+        migrate_legacy(path)
+
+    entries = []
+    for entry in iter_reverse(path, fields):
+        if last is not None and len(entries) >= last:
+            break
+        if since is not None and entry.get('date', '') < since.isoformat():
+            break
+        entries.append(entry)
+    entries.reverse()
+    return entries
+
+
+def _archive_files(archive_dir=ARCHIVE_DIR):
+    if not os.path.isdir(archive_dir):
+        return []
+    return [os.path.join(archive_dir, name) for name in sorted(os.listdir(archive_dir))
+            if name.endswith('.jsonl.gz')]
+
+
+def _iter_raw(path):
+    """Líneas válidas de un log (.jsonl o .jsonl.gz) sin decodificar"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            entry = _parse(line)
+            if entry is not None:
+                yield entry
+
+
+def iter_entries(path=LOG_FILE, include_archive=False, archive_dir=ARCHIVE_DIR, fields=None):
+    """Itera todo el historial en orden cronológico (archivo opcional incluido)"""
+    # El archivo comparte el registro de dominios del log activo
+    registry = DomainRegistry(registry_path(path))
+    files = _archive_files(archive_dir) if include_archive else []
+    if os.path.exists(path):
+        files.append(path)
+
+    for file_path in files:
+        for entry in _iter_raw(file_path):
+            yield decode_entry(entry, registry, fields)
+
+
+def compact(path=LOG_FILE, hot_days=HOT_DAYS, archive_dir=ARCHIVE_DIR):
+    """
+    Compacta el log activo.
+
+    Descarta líneas dañadas y mueve las ejecuciones con más de `hot_days`
+    días a archivos mensuales comprimidos (archivo/daily_log_AAAA-MM.jsonl.gz),
+    de modo que se conserva todo el historial sin que el log activo crezca.
+    El log activo se reescribe de forma atómica.
+
+    Returns:
+        Tupla (ejecuciones que siguen activas, ejecuciones archivadas)
+    """
+    if not os.path.exists(path):
+        return 0, 0
+
+    cutoff = (datetime.now() - timedelta(days=hot_days)).isoformat()
+    archived = {}
+    kept = 0
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        for entry in _iter_raw(path):
+            date = entry.get('date', '')
+            if date and date < cutoff:
+                archived.setdefault(date[:7], []).append(entry)
+            else:
+                out.write(_dump(entry) + '\n')
+                kept += 1
+        out.flush()
+        os.fsync(out.fileno())
+
+    # Archivar antes de sustituir el log activo: ante una caída se duplica, no se pierde
+    if archived:
+        os.makedirs(archive_dir, exist_ok=True)
+        for month, entries in archived.items():
+            archive_path = os.path.join(archive_dir, f"daily_log_{month}.jsonl.gz")
+            with gzip.open(archive_path, 'at', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(_dump(entry) + '\n')
+
+    os.replace(tmp_path, path)
+    return kept, sum(len(entries) for entries in archived.values())
+
+
+def _rewrite(file_path, registry):
+    """Reescribe un log (o un archivo mensual) en formato compacto; devuelve ejecuciones convertidas"""
+    entries = list(_iter_raw(file_path))
+    pending = sum(1 for entry in entries if entry.get('v') != SCHEMA_VERSION)
+    if not pending:
+        return 0
+
+    opener = gzip.open if file_path.endswith('.gz') else open
+    tmp_path = f"{file_path}.tmp"
+    with opener(tmp_path, 'wt', encoding='utf-8') as out:
+        for entry in entries:
+            out.write(_dump(encode_entry(entry, registry)) + '\n')
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+    return pending
+
+
+def migrate_schema(path=LOG_FILE, archive_dir=ARCHIVE_DIR):
+    """
+    Convierte todo el historial (log activo y archivo) al formato compacto.
+
+    Es idempotente: las ejecuciones ya compactas se copian sin cambios y
+    los archivos sin nada que convertir no se tocan. Cada archivo se
+    reescribe de forma atómica.
+
+    Returns:
+        Dict con ejecuciones convertidas y bytes antes y después
+    """
+    if path == LOG_FILE:
+        migrate_legacy(path)
+
+    files = _archive_files(archive_dir)
+    if os.path.exists(path):
+        files.append(path)
+
+    registry = DomainRegistry(registry_path(path))
+    before = sum(os.path.getsize(f) for f in files)
+    converted = sum(_rewrite(f, registry) for f in files)
+    after = sum(os.path.getsize(f) for f in files)
+    return {'files': len(files), 'converted': converted, 'bytes_before': before, 'bytes_after': after}
+
+
+def _parse_seconds(path=LOG_FILE, archive_dir=ARCHIVE_DIR):
+    """Segundos que cuesta parsear todo el historial y número de ejecuciones"""
+    files = _archive_files(archive_dir) + ([path] if os.path.exists(path) else [])
+    started = time.perf_counter()
+    count = sum(1 for f in files for _ in _iter_raw(f))
+    return time.perf_counter() - started, count
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['migrate']:
+        seconds_before, count = _parse_seconds()
+        stats = migrate_schema()
+        seconds_after, _ = _parse_seconds()
+        print(f"🗜️  {stats['converted']} de {count} ejecuciones convertidas al formato {SCHEMA_VERSION} "
+              f"({stats['files']} archivos)")
+        print(f"   Tamaño: {stats['bytes_before']:,} → {stats['bytes_after']:,} bytes")
+        print(f"   Parseo del historial: {seconds_before * 1000:.1f} → {seconds_after * 1000:.1f} ms")
+    else:
+        kept, archived = compact()
+        print(f"🗜️  Log compactado: {kept} ejecuciones activas, {archived} archivadas en {ARCHIVE_DIR}")
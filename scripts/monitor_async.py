@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Motor asíncrono de monitoreo para Plant PWR.
+Verifica todos los dominios en paralelo con un límite global de concurrencia
+y un límite por host, conservando el orden y el formato de los resultados.
+Para listas de miles de hosts puede repartir el trabajo en varios procesos.
+"""
+
+import asyncio
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# Configuración de concurrencia
+MAX_CONCURRENCY = 20   # Verificaciones simultáneas en total
+PER_HOST_LIMIT = 2     # Verificaciones simultáneas contra un mismo host
+
+
+def host_key(domain_info):
+    """Obtiene el host al que se aplica el límite por host"""
+    url = domain_info.get('url')
+    host = urlparse(url).hostname if url else None
+    host = (host or domain_info.get('domain') or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+async def _check_one(loop, executor, check_fn, domain_info, global_sem, host_sems, per_host_limit):
+    """Ejecuta una verificación respetando ambos semáforos"""
+    key = host_key(domain_info)
+    if key not in host_sems:
+        host_sems[key] = asyncio.Semaphore(per_host_limit)
+
+    # Primero el del host: una tarea que espera a un host ocupado no debe
+    # retener un hueco global que podrían usar otros hosts
+    async with host_sems[key]:
+        async with global_sem:
+            # check_fn es bloqueante (requests): se ejecuta en el pool de hilos
+            return await loop.run_in_executor(executor, check_fn, domain_info)
+
+
+async def check_all(domains, check_fn, max_concurrency=MAX_CONCURRENCY, per_host_limit=PER_HOST_LIMIT):
+    """
+    Verifica todos los dominios de forma concurrente.
+
+    Args:
+        domains: Lista de domain_info (como en critical_domains.json)
+        check_fn: Función que recibe un domain_info y devuelve el dict de resultado
+        max_concurrency: Límite global de verificaciones simultáneas
+        per_host_limit: Límite de verificaciones simultáneas por host
+
+    Returns:
+        Lista de resultados en el mismo orden que `domains`
+    """
+    loop = asyncio.get_running_loop()
+    global_sem = asyncio.Semaphore(max_concurrency)
+    host_sems = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        tasks = [
+            _check_one(loop, executor, check_fn, domain_info, global_sem, host_sems, per_host_limit)
+            for domain_info in domains
+        ]
+        return await asyncio.gather(*tasks)
+
+
+def run_checks(domains, check_fn, max_concurrency=MAX_CONCURRENCY, per_host_limit=PER_HOST_LIMIT):
+    """Punto de entrada síncrono para los scripts de monitoreo"""
+    if not domains:
+        return []
+    return asyncio.run(check_all(domains, check_fn, max_concurrency, per_host_limit))
+
+
+def partition(domains, shards):
+    """
+    Reparte los dominios en `shards` grupos estables por host.
+
+    Todos los dominios de un mismo host caen en el mismo grupo, así el
+    límite por host sigue siendo válido dentro de cada proceso.
+
+    Returns:
+        Lista de grupos con tuplas (índice_original, domain_info)
+    """
+    buckets = [[] for _ in range(shards)]
+    for index, domain_info in enumerate(domains):
+        shard = zlib.crc32(host_key(domain_info).encode('utf-8')) % shards
+        buckets[shard].append((index, domain_info))
+    return buckets
+
+
+def run_sharded(domains, shard_fn, shards):
+    """
+    Verifica los dominios repartidos en varios procesos.
+
+    Args:
+        domains: Lista de domain_info
+        shard_fn: Función de nivel de módulo (serializable) que recibe la
+            lista de dominios de un shard y devuelve (resultados, extra),
+            donde extra es estado parcial del shard para fusionar
+        shards: Número de procesos
+
+    Returns:
+        Tupla (resultados en el orden de `domains`, lista de extras por shard)
+    """
+    buckets = [bucket for bucket in partition(domains, max(1, shards)) if bucket]
+    if not buckets:
+        return [], []
+
+    results = [None] * len(domains)
+    extras = []
+
+    with ProcessPoolExecutor(max_workers=len(buckets)) as executor:
+        futures = [
+            executor.submit(shard_fn, [domain_info for _, domain_info in bucket])
+            for bucket in buckets
+        ]
+        for bucket, future in zip(buckets, futures):
+            shard_results, extra = future.result()
+            for (index, _), result in zip(bucket, shard_results):
+                results[index] = result
+            extras.append(extra)
+
+    return results, extras
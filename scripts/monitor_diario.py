@@ -6,13 +6,27 @@ Versión: 2.0 - Con múltiples intentos y headers realistas
 
 import json
 import os
-import requests
+import time
 from datetime import datetime
+from functools import partial
 import urllib3
 
+from domain_health import (
+    load_history, build_health, adaptive_timeout, circuit_state, skipped_result,
+    load_breakers, save_breakers, update_breakers,
+    CIRCUIT_OPEN, CIRCUIT_HALF_OPEN, HALF_OPEN_TIMEOUT
+)
+from dns_cache import resolve_all, lookup, candidate_hosts, is_nxdomain, first_ip
+from http_client import get_session, probe, set_resolver
+from http_state import load_state, save_state, conditional_headers, record_response, CHANGE_CHANGED
+from investigation_store import record_monitor_run
+from log_store import append_entry
+from url_racer import race_strategies
+
 # Configuración
 DOMAINS_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/dominios/critical_domains.json"
-LOG_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/daily_log.json"
+LOG_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/daily_log.jsonl"
+TIMEOUT = 10  # Timeout por defecto sin historial de latencias
 
 # Headers realistas para evitar bloqueos
 HEADERS = {
@@ -30,24 +44,55 @@ def load_domains():
             return json.load(f)
     return {"critical": [], "high_priority": []}
 
-def check_domain_smart(domain_info):
+def check_domain_smart(domain_info, state=None, health=None):
     """Verifica dominio con múltiples estrategias"""
     domain = domain_info.get('domain')
     url = domain_info.get('url', f"https://{domain}")
     
-    # Estrategias de prueba
-    test_strategies = [
-        lambda: try_url(url),  # URL específica primero
-        lambda: try_url(f"https://{domain}"),
-        lambda: try_url(f"http://{domain}"),
-        lambda: try_url(f"https://www.{domain}"),
-        lambda: try_url(f"http://www.{domain}")
+    # Circuit breaker: dominios muertos de forma crónica se sondean menos
+    circuit, next_probe = circuit_state(health or {}, domain)
+    if circuit == CIRCUIT_OPEN:
+        return skipped_result(domain_info, next_probe)
+    
+    if circuit == CIRCUIT_HALF_OPEN:
+        timeout = HALF_OPEN_TIMEOUT
+    else:
+        timeout = adaptive_timeout(health or {}, domain, TIMEOUT)
+    
+    # Estrategias de prueba (en carrera, la URL específica arranca primero);
+    # sin 'url' configurada la específica es https://dominio y no se repite
+    variants = [
+        ('specific', url),
+        ('https', f"https://{domain}"),
+        ('http', f"http://{domain}"),
+        ('https_www', f"https://www.{domain}"),
+        ('http_www', f"http://www.{domain}")
     ]
+    seen = set()
+    test_strategies = []
+    for name, variant in variants:
+        if variant not in seen:
+            seen.add(variant)
+            test_strategies.append((name, partial(try_url, variant, state, timeout)))
+    
+    # Medio abierto: un único intento barato
+    if circuit == CIRCUIT_HALF_OPEN:
+        test_strategies = test_strategies[:1]
     
-    for strategy in test_strategies:
-        result = strategy()
-        if result and result['status_code'] < 400:
-            return result
+    # Sin DNS no hay nada que probar: no gastar timeouts en NXDOMAIN
+    nxdomain = is_nxdomain(domain_info)
+    if not nxdomain:
+        winner, outcome = race_strategies(
+            test_strategies,
+            accept=lambda r: r[0]['status_code'] < 400
+        )
+        if outcome:
+            result, response, body = outcome
+            # Solo el ganador actualiza los validadores: las variantes
+            # perdedoras siguen en vuelo y no deben tocar el estado compartido
+            if state is not None:
+                result['change'] = record_response(state, result['tested_url'], response, body)
+            return {**result, 'domain': domain, 'strategy': winner, 'circuit': circuit}
     
     # Todos fallaron
     return {
@@ -55,26 +100,46 @@ def check_domain_smart(domain_info):
         'status': 'INACTIVE',
         'status_code': None,
         'final_url': None,
+        'strategy': None,
+        'dns': 'NXDOMAIN' if nxdomain else None,
+        'ip_address': None,
+        'circuit': circuit,
         'checked_at': datetime.now().isoformat()
     }
 
-def try_url(url):
-    """Intenta acceder a una URL"""
+def try_url(url, state=None, timeout=TIMEOUT):
+    """
+    Intenta acceder a una URL (sondeo condicional si hay validadores guardados).
+
+    No modifica `state`: devuelve (resultado, response, cuerpo) para que
+    quien gane la carrera registre los validadores con record_response.
+    """
     try:
-        response = requests.get(
+        started = time.monotonic()
+        # HEAD primero; GET por streaming limitado si se rechaza HEAD o no trae validadores
+        response, body = probe(
+            get_session('monitor'),
             url,
-            headers=HEADERS,
-            timeout=10,
+            headers={**HEADERS, **conditional_headers(state, url)},
+            need_content=state is not None,
+            timeout=timeout,
             allow_redirects=True,
             verify=False  # Temporal para SSL issues
         )
+        response_time = round(time.monotonic() - started, 3)
+        
         return {
             'domain': url.split('//')[-1].split('/')[0],
             'status': 'ACTIVE',
             'status_code': response.status_code,
             'final_url': response.url,
+            'tested_url': url,
+            'probe_method': response.request.method,
+            'change': None,
+            'ip_address': first_ip(response.url) or first_ip(url),
+            'response_time': response_time,
             'checked_at': datetime.now().isoformat()
-        }
+        }, response, body
     except:
         return None
 
@@ -91,52 +156,66 @@ def main():
     
     print(f"📊 Dominios a monitorear: {len(all_domains)}")
     
+    # Pre-resolución DNS de todos los hosts; las sesiones usan la caché
+    dns_results = resolve_all(h for d in all_domains for h in candidate_hosts(d))
+    set_resolver(lookup)
+    nxdomain_count = sum(1 for ips in dns_results.values() if ips == [])
+    print(f"🌐 DNS: {len(dns_results)} hosts resueltos, {nxdomain_count} NXDOMAIN")
+    
+    # Validadores HTTP de ejecuciones anteriores (ETag, Last-Modified, hash)
+    http_state = load_state()
+    
+    # Latencias y fallos consecutivos por dominio según el historial,
+    # con el estado guardado de los circuitos abiertos
+    breakers = load_breakers()
+    health = build_health(load_history(LOG_FILE), breakers)
+    
     # Verificar cada dominio
     results = []
     active_count = 0
+    skipped_count = 0
     
     for domain_info in all_domains:
         domain = domain_info.get('domain')
         print(f"\n🔍 {domain}: ", end='')
         
-        result = check_domain_smart(domain_info)
+        result = check_domain_smart(domain_info, http_state, health)
         results.append({**result, 'priority': domain_info.get('priority', 'UNKNOWN')})
         
         if result['status'] == 'ACTIVE':
-            print("✅ ACTIVO")
+            print("✅ ACTIVO" + (" 🔄 CAMBIÓ" if result.get('change') == CHANGE_CHANGED else ""))
             active_count += 1
+        elif result['status'] == 'SKIPPED':
+            print(f"⏸️  EN PAUSA (próximo sondeo: {result['next_probe'][:10]})")
+            skipped_count += 1
         else:
             print("❌ INACTIVO")
     
+    save_state(http_state)
+    save_breakers(update_breakers(breakers, results, health))
+    
+    # Los SKIPPED no se comprobaron: no cuentan como inactivos
+    inactive_count = len(all_domains) - active_count - skipped_count
+    
     # Guardar resultados
     log_entry = {
         'date': datetime.now().isoformat(),
         'total': len(all_domains),
         'active': active_count,
-        'inactive': len(all_domains) - active_count,
+        'inactive': inactive_count,
+        'skipped': skipped_count,
         'results': results
     }
     
-    # Manejar archivo de log
-    logs = []
-    if os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, 'r') as f:
-                logs = json.load(f)
-        except:
-            logs = []
-    
-    logs.append(log_entry)
-    if len(logs) > 30:
-        logs = logs[-30:]
-    
-    with open(LOG_FILE, 'w') as f:
-        json.dump(logs, f, indent=2, ensure_ascii=False)
+    # Añadir al log append-only (no se reescribe el historial)
+    append_entry(log_entry, LOG_FILE)
+    record_monitor_run(log_entry)
     
     # Mostrar resumen
     print(f"\n📈 RESUMEN:")
     print(f"   ✅ Activos: {active_count}/{len(all_domains)}")
-    print(f"   ❌ Inactivos: {len(all_domains) - active_count}/{len(all_domains)}")
+    print(f"   ❌ Inactivos: {inactive_count}/{len(all_domains)}")
+    print(f"   ⏸️  En pausa (circuit breaker): {skipped_count}/{len(all_domains)}")
     
     # Sitios críticos activos
     critical_active = [r for r in results if r['status'] == 'ACTIVE' and r.get('priority') == 'CRITICAL']
@@ -145,6 +224,13 @@ def main():
         for r in critical_active:
             print(f"   • {r['domain']}")
     
+    # Cambios detectados con GET condicional
+    changed = [r for r in results if r.get('change') == CHANGE_CHANGED]
+    if changed:
+        print(f"\n🔄 SITIOS CON CAMBIOS ({len(changed)}):")
+        for r in changed:
+            print(f"   • {r['domain']} - {r.get('final_url', 'N/A')}")
+    
     print(f"\n💾 Log guardado: {LOG_FILE}")
     print(f"🕐 {datetime.now().strftime('%Y-%m-%d %H:%M')}")
 
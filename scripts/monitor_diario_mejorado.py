@@ -1,17 +1,39 @@
 #!/usr/bin/env python3
 """
 Script de monitoreo mejorado para Plant PWR.
+
+Uso:
+    python3 monitor_diario_mejorado.py             # un proceso
+    python3 monitor_diario_mejorado.py --shards 4  # reparte entre 4 procesos
+    python3 monitor_diario_mejorado.py --shards 0  # un proceso por núcleo
 """
 
+import argparse
 import json
 import os
+import time
+from functools import partial
 import requests
 from datetime import datetime
 from urllib.parse import urlparse
 
+from domain_health import (
+    load_history, build_health, adaptive_timeout, circuit_state, skipped_result,
+    load_breakers, save_breakers, update_breakers,
+    CIRCUIT_OPEN, CIRCUIT_HALF_OPEN, HALF_OPEN_TIMEOUT
+)
+from dns_cache import resolve_all, lookup, candidate_hosts, is_nxdomain, first_ip
+from http_client import get_session, probe, set_resolver
+from http_state import load_state, save_state, merge_state, conditional_headers, record_response, CHANGE_CHANGED
+from investigation_store import record_monitor_run
+from log_store import append_entry
+from monitor_async import run_checks, run_sharded, MAX_CONCURRENCY, PER_HOST_LIMIT
+
 # Configuración mejorada
 DOMAINS_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/dominios/critical_domains.json"
-LOG_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/daily_log.json"
+LOG_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/daily_log.jsonl"
+TIMEOUT = 15            # Timeout por defecto sin historial de latencias
+SSL_RETRY_TIMEOUT = 10  # Timeout del reintento tras un error SSL
 
 # Headers mejorados para evitar bloqueos
 HEADERS = {
@@ -35,11 +57,22 @@ def load_critical_domains():
             return json.load(f)
     return {"critical": [], "high_priority": []}
 
-def check_domain_improved(domain_info):
+def check_domain_improved(domain_info, state=None, health=None):
     """Verifica el estado de un dominio con múltiples intentos"""
     domain = domain_info.get('domain')
     url = domain_info.get('url', f"https://{domain}")
     
+    # Circuit breaker: dominios muertos de forma crónica se sondean menos
+    circuit, next_probe = circuit_state(health or {}, domain)
+    if circuit == CIRCUIT_OPEN:
+        return skipped_result(domain_info, next_probe)
+    
+    if circuit == CIRCUIT_HALF_OPEN:
+        timeout = ssl_timeout = HALF_OPEN_TIMEOUT
+    else:
+        timeout = adaptive_timeout(health or {}, domain, TIMEOUT)
+        ssl_timeout = adaptive_timeout(health or {}, domain, SSL_RETRY_TIMEOUT)
+    
     # Intentar múltiples métodos
     test_urls = []
     
@@ -56,12 +89,24 @@ def check_domain_improved(domain_info):
     # Intentar con www
     test_urls.append(f"https://www.{domain}")
     
+    # Medio abierto: un único intento barato
+    if circuit == CIRCUIT_HALF_OPEN:
+        test_urls = test_urls[:1]
+    
+    # Sin DNS no hay nada que probar: no gastar timeouts en NXDOMAIN
+    if is_nxdomain(domain_info):
+        test_urls = []
+    
     for test_url in test_urls:
         try:
-            response = requests.get(
+            started = time.monotonic()
+            # HEAD primero; GET por streaming limitado si se rechaza HEAD o no trae validadores
+            response, body = probe(
+                get_session('monitor'),
                 test_url,
-                headers=HEADERS,
-                timeout=15,
+                headers={**HEADERS, **conditional_headers(state, test_url)},
+                need_content=state is not None,
+                timeout=timeout,
                 allow_redirects=True,
                 verify=False  # Desactivar verificación SSL temporalmente
             )
@@ -73,6 +118,11 @@ def check_domain_improved(domain_info):
                     'status_code': response.status_code,
                     'final_url': response.url,
                     'tested_url': test_url,
+                    'probe_method': response.request.method,
+                    'ip_address': first_ip(response.url) or first_ip(test_url),
+                    'response_time': round(time.monotonic() - started, 3),
+                    'circuit': circuit,
+                    'change': record_response(state, test_url, response, body) if state is not None else None,
                     'checked_at': datetime.now().isoformat(),
                     'notes': domain_info.get('notes', '')
                 }
@@ -80,10 +130,13 @@ def check_domain_improved(domain_info):
         except requests.exceptions.SSLError:
             # Intentar sin verificación SSL
             try:
-                response = requests.get(
+                started = time.monotonic()
+                response, body = probe(
+                    get_session('monitor'),
                     test_url,
-                    headers=HEADERS,
-                    timeout=10,
+                    headers={**HEADERS, **conditional_headers(state, test_url)},
+                    need_content=state is not None,
+                    timeout=ssl_timeout,
                     allow_redirects=True,
                     verify=False
                 )
@@ -94,7 +147,13 @@ def check_domain_improved(domain_info):
                         'status_code': response.status_code,
                         'final_url': response.url,
                         'tested_url': test_url,
+                        'probe_method': response.request.method,
+                        'ip_address': first_ip(response.url) or first_ip(test_url),
+                        'response_time': round(time.monotonic() - started, 3),
+                        'circuit': circuit,
+                        'change': record_response(state, test_url, response, body) if state is not None else None,
                         'checked_at': datetime.now().isoformat(),
+                        'reason': 'SSL_ISSUE',
                         'notes': f"{domain_info.get('notes', '')} (SSL Issue)"
                     }
             except:
@@ -114,11 +173,39 @@ def check_domain_improved(domain_info):
         'status_code': None,
         'final_url': None,
         'tested_url': None,
+        'ip_address': None,
+        'circuit': circuit,
         'checked_at': datetime.now().isoformat(),
-        'notes': domain_info.get('notes', '') + ' - Todos los intentos fallaron'
+        'reason': 'NXDOMAIN' if is_nxdomain(domain_info) else 'ALL_FAILED',
+        'notes': domain_info.get('notes', '') + (' - NXDOMAIN' if is_nxdomain(domain_info) else ' - Todos los intentos fallaron')
     }
 
+def monitor_domains(domains, http_state, health):
+    """Pre-resuelve el DNS y verifica los dominios en paralelo (un proceso)"""
+    dns_results = resolve_all(h for d in domains for h in candidate_hosts(d))
+    set_resolver(lookup)
+    nxdomain_count = sum(1 for ips in dns_results.values() if ips == [])
+    print(f"🌐 DNS: {len(dns_results)} hosts resueltos, {nxdomain_count} NXDOMAIN")
+    
+    return run_checks(domains, partial(check_domain_improved, state=http_state, health=health))
+
+def monitor_shard(domains, http_state, health):
+    """Trabajo de un proceso en modo shard: devuelve resultados y validadores"""
+    results = monitor_domains(domains, http_state, health)
+    return results, http_state
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Monitoreo mejorado de dominios Plant PWR")
+    parser.add_argument(
+        '--shards', type=int, default=1,
+        help="Procesos entre los que repartir los dominios (0 = uno por núcleo)"
+    )
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    shards = args.shards or os.cpu_count() or 1
+    
     print("🔍 MONITOREO MEJORADO - PLANT PWR")
     print("=" * 50)
     
@@ -138,16 +225,31 @@ def main():
     
     print(f"📊 Dominios a monitorear: {len(all_domains)}")
     
-    # Verificar cada dominio
-    results = []
+    print(f"⚡ Concurrencia: {MAX_CONCURRENCY} global, {PER_HOST_LIMIT} por host, {shards} proceso(s)")
+    
+    # Validadores HTTP de ejecuciones anteriores (ETag, Last-Modified, hash)
+    http_state = load_state()
+    
+    # Latencias y fallos consecutivos por dominio según el historial,
+    # con el estado guardado de los circuitos abiertos
+    breakers = load_breakers()
+    health = build_health(load_history(LOG_FILE), breakers)
+    
+    # Verificar todos los dominios en paralelo (opcionalmente en varios procesos)
+    if shards > 1:
+        shard_fn = partial(monitor_shard, http_state=http_state, health=health)
+        results, shard_states = run_sharded(all_domains, shard_fn, shards)
+        for shard_state in shard_states:
+            merge_state(http_state, shard_state)
+    else:
+        results = monitor_domains(all_domains, http_state, health)
+    save_state(http_state)
+    save_breakers(update_breakers(breakers, results, health))
     active_count = 0
+    skipped_count = 0
     
-    for domain_info in all_domains:
-        domain = domain_info.get('domain')
-        print(f"\n🔍 Verificando: {domain}")
-        
-        result = check_domain_improved(domain_info)
-        results.append(result)
+    for result in results:
+        print(f"\n🔍 Verificando: {result['domain']}")
         
         if result['status'].startswith('ACTIVE'):
             status_icon = "✅"
@@ -156,43 +258,37 @@ def main():
             print(f"   🔗 URL accesible: {result.get('final_url', 'N/A')}")
             if result.get('tested_url'):
                 print(f"   🎯 Probado con: {result['tested_url']}")
+            if result.get('change') == CHANGE_CHANGED:
+                print("   🔄 La página cambió desde la última verificación")
+        elif result['status'] == 'SKIPPED':
+            skipped_count += 1
+            print(f"   ⏸️  En pausa por circuit breaker (próximo sondeo: {result['next_probe'][:10]})")
         else:
             status_icon = "❌"
             print(f"   {status_icon} Estado: {result['status']}")
             print(f"   ⚠️  Notas: {result.get('notes', '')}")
     
+    # Los SKIPPED no se comprobaron: no cuentan como inactivos
+    inactive_count = len(all_domains) - active_count - skipped_count
+    
     # Guardar resultados
     log_entry = {
         'date': datetime.now().isoformat(),
         'total_domains': len(all_domains),
         'active': active_count,
-        'inactive': len(all_domains) - active_count,
+        'inactive': inactive_count,
+        'skipped': skipped_count,
         'results': results
     }
     
-    # Cargar log anterior si existe
-    log_data = []
-    if os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, 'r') as f:
-                log_data = json.load(f)
-        except:
-            log_data = []
-    
-    # Agregar nuevo log
-    log_data.append(log_entry)
-    
-    # Mantener solo últimos 30 días
-    if len(log_data) > 30:
-        log_data = log_data[-30:]
-    
-    # Guardar
-    with open(LOG_FILE, 'w') as f:
-        json.dump(log_data, f, indent=2, ensure_ascii=False)
+    # Añadir al log append-only (no se reescribe el historial)
+    append_entry(log_entry, LOG_FILE)
+    record_monitor_run(log_entry)
     
     print(f"\n📈 RESUMEN FINAL:")
     print(f"   ✅ Activos: {active_count}")
-    print(f"   ❌ Inactivos: {len(all_domains) - active_count}")
+    print(f"   ❌ Inactivos: {inactive_count}")
+    print(f"   ⏸️  En pausa (circuit breaker): {skipped_count}")
     print(f"   📅 Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     
     # Mostrar sitios activos críticos
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Detección incremental de cambios en las tiendas monitoreadas de Plant PWR.
+
+Compara cada captura nueva de la bóveda de evidencia (evidence_vault.py)
+con la anterior del mismo dominio y genera registros compactos en
+analisis/page_changes.jsonl:
+
+  price_changed     los precios de la página cambiaron (104.900 → 99.900)
+  product_removed   el producto ya no aparece, figura agotado o la página da error
+  redirected        la URL final cambió (otra ruta u otro dominio)
+
+Cada nodo del DOM lleva un hash estructural (Merkle: etiqueta, atributos
+clave, texto propio y hashes de sus hijos). Del snapshot anterior solo se
+guardan los hashes de sus nodos y los "nodos con datos" (texto propio con
+precios o menciones del producto). Un subárbol cuyo hash ya existía se da
+por igual sin mirarlo; solo se extrae texto de los nodos con hash nuevo,
+así que una página grande con una edición pequeña cuesta el parseo más
+un trabajo proporcional al cambio. Una captura con el mismo SHA-256 que la
+anterior ni se parsea.
+
+Uso:
+    python3 page_diff.py                          # procesa las capturas nuevas de la bóveda
+    python3 page_diff.py compare viejo.html nuevo.html
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter
+from html.parser import HTMLParser
+
+import evidence_vault
+from keyword_matcher import KeywordMatcher
+
+STATE_DIR = "/root/.openclaw/workspace/plant-pwr-investigation/analisis/page_state"
+CHANGES_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/analisis/page_changes.jsonl"
+
+PRODUCT_KEYWORDS = {
+    'producto': ['plant pwr', 'plantpwr', 'plant-pwr', 'plant power'],
+    'agotado': ['agotado', 'sin existencias', 'sin stock', 'out of stock', 'no disponible'],
+}
+
+# Atributos que forman parte de la identidad de un nodo; el resto (nonces,
+# tokens, estilos en línea) cambia a diario sin que cambie el contenido
+KEY_ATTRS = ('id', 'class', 'href', 'src', 'itemprop', 'content', 'data-product_id')
+SKIP_TEXT_TAGS = frozenset(['script', 'style', 'noscript', 'template', 'svg'])
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+                       'meta', 'param', 'source', 'track', 'wbr'])
+
+# Precios en pesos con separador de miles: 104.900, $169,900, 1.250.000
+PRICE_PATTERN = re.compile(r'(?<![\d.,])(\d{1,3}(?:[.,]\d{3})+)(?![.,]?\d)')
+PRICE_CONTEXT = ('price', 'precio', 'amount', 'valor')   # Clases que marcan un precio
+CURRENCY_MARKS = ('$', 'cop')
+MIN_PRICE = 1000
+
+_WHITESPACE = re.compile(r'\s+')
+_matcher = KeywordMatcher(PRODUCT_KEYWORDS)
+
+
+class Node:
+    __slots__ = ('tag', 'attrs', 'text', 'children', 'hash', 'priced')
+
+    def __init__(self, tag, attrs, priced):
+        self.tag = tag
+        self.attrs = attrs
+        self.text = []
+        self.children = []
+        self.hash = None
+        self.priced = priced   # Él o un ancestro tiene clase de precio
+
+    def own_text(self):
+        return _WHITESPACE.sub(' ', ''.join(self.text)).strip()
+
+
+class _TreeBuilder(HTMLParser):
+    """Árbol DOM mínimo con el hash estructural de cada nodo calculado al cerrarlo"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document', '', False)
+        self.stack = [self.root]
+        self.hashes = Counter()
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        key = '|'.join(f"{name}={attrs[name]}" for name in KEY_ATTRS if attrs.get(name))
+        classes = (attrs.get('class') or '').lower()
+        parent = self.stack[-1]
+        node = Node(tag, key, parent.priced or any(word in classes for word in PRICE_CONTEXT))
+        parent.children.append(node)
+        if tag in VOID_TAGS:
+            self._close(node)
+        else:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self._close(self.stack.pop())
+
+    def handle_endtag(self, tag):
+        # Cierres implícitos: se cierran los nodos abiertos hasta la etiqueta
+        if not any(node.tag == tag for node in self.stack[1:]):
+            return
+        while True:
+            node = self.stack.pop()
+            self._close(node)
+            if node.tag == tag:
+                break
+
+    def handle_data(self, data):
+        node = self.stack[-1]
+        if node.tag not in SKIP_TEXT_TAGS:
+            node.text.append(data)
+
+    def _close(self, node):
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(f"{node.tag}\0{node.attrs}\0{node.own_text()}\0".encode('utf-8', errors='replace'))
+        for child in node.children:
+            digest.update(child.hash.encode('ascii'))
+        node.hash = digest.hexdigest()
+        self.hashes[node.hash] += 1
+
+    def finish(self):
+        self.close()
+        while len(self.stack) > 1:
+            self._close(self.stack.pop())
+        self._close(self.root)
+        return self.root, self.hashes
+
+
+def build_tree(html):
+    """Árbol y contador de hashes de todos sus nodos"""
+    builder = _TreeBuilder()
+    try:
+        builder.feed(html)
+    except Exception:
+        pass
+    return builder.finish()
+
+
+def page_text(html):
+    """Texto visible de una página (sin scripts ni estilos), en orden del documento"""
+    root, _ = build_tree(html)
+    parts = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        text = node.own_text()
+        if text:
+            parts.append(text)
+        stack.extend(reversed(node.children))
+    return ' '.join(parts)
+
+
+def extract_facts(node):
+    """
+    Datos del texto propio de un nodo: precios, menciones del producto y de agotado.
+
+    Un número cuenta como precio si el nodo (o un ancestro) tiene clase de
+    precio o el texto lleva $ / COP.
+    """
+    text = node.own_text()
+    if not text:
+        return None
+
+    prices = []
+    lowered = text.lower()
+    if node.priced or any(mark in lowered for mark in CURRENCY_MARKS):
+        for match in PRICE_PATTERN.findall(text):
+            value = int(re.sub(r'[.,]', '', match))
+            if value >= MIN_PRICE:
+                prices.append(value)
+
+    hits = _matcher.scan(text)
+    facts = {}
+    if prices:
+        facts['prices'] = prices
+    if hits.get('producto'):
+        facts['product'] = 1
+    if hits.get('agotado'):
+        facts['out_of_stock'] = 1
+    return facts or None
+
+
+def index_page(html, previous=None):
+    """
+    Índice de una página para compararla con la siguiente.
+
+    Con `previous` (índice de la captura anterior) solo se recorre lo que
+    cambió: los nodos con datos cuyo hash sigue presente se copian del
+    índice anterior y solo se extrae texto de los nodos con hash nuevo.
+
+    Returns:
+        Tupla (índice, estadísticas {'nodes', 'visited'})
+    """
+    root, hashes = build_tree(html)
+    old_hashes = set(previous['hashes']) if previous else set()
+
+    facts = []
+    if previous:
+        for fact in previous['facts']:
+            if fact['h'] in hashes:
+                facts.append(fact)
+
+    visited = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.hash in old_hashes:
+            continue   # Subárbol sin cambios: sus datos ya están copiados
+        visited += 1
+        found = extract_facts(node)
+        if found:
+            facts.append(dict(found, h=node.hash))
+        stack.extend(node.children)
+
+    index = {'hashes': sorted(hashes), 'facts': facts}
+    return index, {'nodes': sum(hashes.values()), 'visited': visited}
+
+
+def summarize(index):
+    """Precios distintos, menciones del producto y de agotado de un índice"""
+    prices = sorted({price for fact in index['facts'] for price in fact.get('prices', [])})
+    product = sum(fact.get('product', 0) for fact in index['facts'])
+    out_of_stock = sum(fact.get('out_of_stock', 0) for fact in index['facts'])
+    return {'prices': prices, 'product': product, 'out_of_stock': out_of_stock}
+
+
+def _host(url):
+    return (url or '').split('//')[-1].split('/')[0].lower()
+
+
+def compare(previous, current):
+    """
+    Registros de cambio entre dos estados de página.
+
+    Cada estado: {'final_url', 'status_code', 'summary'} (summary de summarize).
+    """
+    changes = []
+    old, new = previous['summary'], current['summary']
+
+    if previous.get('final_url') and current.get('final_url') and previous['final_url'] != current['final_url']:
+        changes.append({
+            'type': 'redirected', 'old': previous['final_url'], 'new': current['final_url'],
+            'other_host': _host(previous['final_url']) != _host(current['final_url'])
+        })
+
+    status = current.get('status_code') or 0
+    if status >= 400 and (previous.get('status_code') or 0) < 400:
+        changes.append({'type': 'product_removed', 'reason': f"http_{status}"})
+    elif old['product'] and not new['product']:
+        changes.append({'type': 'product_removed', 'reason': 'sin_menciones'})
+    elif new['out_of_stock'] and not old['out_of_stock']:
+        changes.append({'type': 'product_removed', 'reason': 'agotado'})
+
+    if status < 400 and old['prices'] != new['prices'] and (old['prices'] or new['prices']):
+        # Solo la diferencia: un catálogo puede tener cientos de precios
+        changes.append({
+            'type': 'price_changed',
+            'removed': sorted(set(old['prices']) - set(new['prices'])),
+            'added': sorted(set(new['prices']) - set(old['prices'])),
+        })
+    return changes
+
+
+def _state_path(domain, state_dir):
+    return os.path.join(state_dir, f"{domain}.json")
+
+
+def load_state(domain, state_dir=STATE_DIR):
+    path = _state_path(domain, state_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(domain, state, state_dir=STATE_DIR):
+    os.makedirs(state_dir, exist_ok=True)
+    path = _state_path(domain, state_dir)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def process_capture(record, state, vault_dir=evidence_vault.VAULT_DIR):
+    """
+    Compara una captura del manifiesto con el estado anterior del dominio.
+
+    Returns:
+        Tupla (nuevo estado, registros de cambio, estadísticas)
+    """
+    sha256 = record.get('sha256')
+    base = {'final_url': record.get('final_url'), 'status_code': record.get('status_code'),
+            'sha256': sha256, 'captured_at': record['captured_at']}
+
+    if state and sha256 == state.get('sha256'):
+        # Mismo contenido: solo pueden cambiar URL final y estado HTTP
+        current = dict(state, **base)
+        stats = {'nodes': 0, 'visited': 0}
+    else:
+        html = evidence_vault.get_object(sha256, vault_dir).decode('utf-8', errors='replace')
+        index, stats = index_page(html, state.get('index') if state else None)
+        current = dict(base, index=index, summary=summarize(index))
+
+    changes = compare(state, current) if state else []
+    for change in changes:
+        change.update(
+            domain=record['domain'], url=record.get('url'), detected_at=record['captured_at'],
+            evidence=sha256, previous_evidence=state.get('sha256')
+        )
+    return current, changes, stats
+
+
+def append_changes(changes, path=CHANGES_FILE):
+    if not changes:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for change in changes:
+            f.write(json.dumps(change, ensure_ascii=False, separators=(',', ':')) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def run(vault_dir=evidence_vault.VAULT_DIR, state_dir=STATE_DIR, changes_file=CHANGES_FILE):
+    """
+    Procesa en orden las capturas de la bóveda posteriores al estado de cada dominio.
+
+    Returns:
+        Tupla (registros de cambio, estadísticas por dominio)
+    """
+    states = {}
+    all_changes = []
+    stats = {}
+    for _, record in evidence_vault.iter_manifest(vault_dir):
+        domain = record.get('domain')
+        if not domain or not record.get('sha256'):
+            continue   # Capturas fallidas: la próxima correcta se compara con la última buena
+        if domain not in states:
+            states[domain] = load_state(domain, state_dir)
+        state = states[domain]
+        if state and record['captured_at'] <= state['captured_at']:
+            continue
+
+        state, changes, capture_stats = process_capture(record, state, vault_dir)
+        states[domain] = state
+        all_changes.extend(changes)
+        totals = stats.setdefault(domain, {'captures': 0, 'nodes': 0, 'visited': 0})
+        totals['captures'] += 1
+        totals['nodes'] += capture_stats['nodes']
+        totals['visited'] += capture_stats['visited']
+
+    for domain in stats:
+        save_state(domain, states[domain], state_dir)
+    append_changes(all_changes, changes_file)
+    return all_changes, stats
+
+
+def describe(change):
+    """Línea legible de un registro de cambio"""
+    kind = change['type']
+    if kind == 'price_changed':
+        fmt = lambda prices: ', '.join(f"{p:,}".replace(',', '.') for p in prices) or '—'
+        return f"💲 Precio: {fmt(change['removed'])} → {fmt(change['added'])}"
+    if kind == 'redirected':
+        return f"↪️  Redirige: {change['old']} → {change['new']}"
+    return f"🚫 Producto retirado ({change['reason']})"
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == 'compare':
+        if len(args) != 3:
+            print(__doc__)
+            return 1
+        with open(args[1], 'r', encoding='utf-8', errors='replace') as f:
+            old_index, _ = index_page(f.read())
+        with open(args[2], 'r', encoding='utf-8', errors='replace') as f:
+            new_index, stats = index_page(f.read(), old_index)
+        changes = compare({'summary': summarize(old_index)}, {'summary': summarize(new_index)})
+        print(f"🔎 {stats['visited']} de {stats['nodes']} nodos revisados")
+        for change in changes:
+            print(f"   {describe(change)}")
+        if not changes:
+            print("   Sin cambios de precio ni de producto")
+        return 0
+    if args:
+        print(__doc__)
+        return 1
+
+    changes, stats = run()
+    for domain, totals in sorted(stats.items()):
+        print(f"🔎 {domain}: {totals['captures']} capturas, {totals['visited']} de {totals['nodes']} nodos revisados")
+    for change in changes:
+        print(f"   {change['domain']}: {describe(change)}")
+    print(f"📝 {len(changes)} cambios registrados en {CHANGES_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Ejecutor concurrente de búsquedas Whoogle para Plant PWR.
+Lanza las consultas en paralelo bajo un limitador token bucket, para ser
+respetuosos con la instancia de Whoogle sin acumular pausas fijas.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Límite de tasa contra Whoogle
+REQUESTS_PER_SECOND = 1.0   # Ritmo sostenido de peticiones
+BURST = 3                   # Peticiones que pueden salir de golpe
+MAX_WORKERS = 4             # Búsquedas en vuelo a la vez
+
+
+class TokenBucket:
+    """Limitador token bucket seguro entre hilos"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible y lo consume"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def run_queries(queries, search_fn, rate=REQUESTS_PER_SECOND, burst=BURST, max_workers=MAX_WORKERS):
+    """
+    Ejecuta búsquedas en paralelo respetando el límite de tasa.
+
+    Args:
+        queries: Lista de términos de búsqueda
+        search_fn: Función query -> lista de resultados (p. ej. search_whoogle)
+        rate: Peticiones por segundo sostenidas (None si search_fn ya limita
+              la tasa por petición, como whoogle_client al paginar)
+        burst: Tamaño de ráfaga del token bucket
+        max_workers: Búsquedas simultáneas
+
+    Returns:
+        Lista de tuplas (query, resultados) en el mismo orden que `queries`
+    """
+    if not queries:
+        return []
+
+    bucket = TokenBucket(rate, burst) if rate else None
+
+    def run(query):
+        if bucket is not None:
+            bucket.acquire()
+        return search_fn(query)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+        return list(zip(queries, executor.map(run, queries)))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Plan de búsquedas de Plant PWR generado desde config.json.
+
+Cruza alias de marca, productos, ciudades y plataformas
+(tools.whoogle.query_plan) en un conjunto de consultas sin duplicados y
+ordenado por prioridad. Las listas que antes estaban escritas a mano en cada
+script viven ahora en query_plan.full_terms / daily_terms y van fijas al
+principio del plan, de modo que el presupuesto nunca las deja fuera. Las consultas se comparan ya normalizadas (la misma clave que usa
+serp_cache), así que una consulta repetida entre niveles o entre scripts se
+ejecuta una sola vez y el resto de ejecuciones del día la leen de la caché.
+
+Uso:
+    python3 query_plan.py [max_consultas]   # muestra el plan
+"""
+
+import json
+import os
+import sys
+
+from serp_cache import normalize_query
+
+CONFIG_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/config.json"
+
+# Niveles de prioridad (menor = antes)
+PRIORITY_CURATED = 0     # tools.whoogle.search_terms, escritos a mano
+PRIORITY_BRAND = 1       # Marca o dominio solos
+PRIORITY_PLATFORM = 2    # site:plataforma marca
+PRIORITY_PRODUCT = 3     # marca + producto
+PRIORITY_CITY = 4        # marca + ciudad
+PRIORITY_GENERIC = 5     # producto genérico + ciudad (nuevos competidores)
+PRIORITY_MARKET = 6      # site:plataforma producto genérico
+PRIORITY_DEEP = 7        # marca + producto + ciudad
+
+# Lista fija (query_plan.<clave>) de cada presupuesto
+BUDGET_TERMS = {
+    'max_queries': 'full_terms',
+    'daily_max_queries': 'daily_terms',
+}
+
+
+def load_config(path=CONFIG_FILE):
+    """Sección tools.whoogle de config.json ({} si no existe)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('tools', {}).get('whoogle', {})
+
+
+def _expand(whoogle_config, pinned=()):
+    """Genera tuplas (prioridad, tipo, consulta) en orden de preferencia"""
+    plan = whoogle_config.get('query_plan', {})
+    brands = plan.get('brands', [])
+    domains = plan.get('domains', [])
+    products = plan.get('products', [])
+    generic = plan.get('generic_products', [])
+    cities = plan.get('cities', [])
+    platforms = plan.get('platforms', [])
+
+    # Las fijas del script antes que search_terms: el presupuesto las respeta
+    for term in pinned:
+        yield PRIORITY_CURATED, 'pinned', term
+
+    for term in whoogle_config.get('search_terms', []):
+        yield PRIORITY_CURATED, 'curated', term
+
+    for term in brands + domains:
+        yield PRIORITY_BRAND, 'brand', term
+
+    # La marca principal en todas las plataformas antes que los alias
+    for brand in brands:
+        for platform in platforms:
+            yield PRIORITY_PLATFORM, 'platform', f"site:{platform} {brand}"
+
+    for brand in brands:
+        for product in products:
+            yield PRIORITY_PRODUCT, 'product', f"{brand} {product}"
+
+    for brand in brands:
+        for city in cities:
+            yield PRIORITY_CITY, 'city', f"{brand} {city}"
+
+    for city in cities:
+        for product in generic:
+            yield PRIORITY_GENERIC, 'generic', f"{product} {city}"
+
+    for platform in platforms:
+        for product in generic:
+            yield PRIORITY_MARKET, 'market', f"site:{platform} {product}"
+
+    for brand in brands:
+        for product in products:
+            for city in cities:
+                yield PRIORITY_DEEP, 'deep', f"{brand} {product} {city}"
+
+
+def build_plan(whoogle_config=None, max_queries=None, pinned=()):
+    """
+    Plan de consultas deduplicado y priorizado.
+
+    Args:
+        whoogle_config: Sección tools.whoogle (por defecto la de config.json)
+        max_queries: Presupuesto de consultas (None = todas)
+        pinned: Consultas escritas a mano que van siempre primero
+
+    Returns:
+        Lista de dicts {'query', 'priority', 'kind'} ordenada por prioridad;
+        de cada grupo de consultas equivalentes se conserva la primera
+    """
+    if whoogle_config is None:
+        whoogle_config = load_config()
+
+    plan = []
+    seen = set()
+    for priority, kind, query in sorted(_expand(whoogle_config, pinned), key=lambda item: item[0]):
+        key = normalize_query(query)
+        if key in seen:
+            continue
+        seen.add(key)
+        plan.append({'query': query, 'priority': priority, 'kind': kind})
+        if max_queries is not None and len(plan) >= max_queries:
+            break
+    return plan
+
+
+def plan_queries(budget_key='max_queries', whoogle_config=None):
+    """
+    Términos del plan para un script, recortados a su presupuesto.
+
+    Args:
+        budget_key: Clave de query_plan con el presupuesto
+                    ('max_queries' para el barrido completo,
+                    'daily_max_queries' para la búsqueda diaria); su
+                    lista fija sale de BUDGET_TERMS
+    """
+    if whoogle_config is None:
+        whoogle_config = load_config()
+    plan = whoogle_config.get('query_plan', {})
+    pinned = plan.get(BUDGET_TERMS.get(budget_key), [])
+    return [item['query'] for item in build_plan(whoogle_config, plan.get(budget_key), pinned)]
+
+
+def main():
+    max_queries = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    plan = build_plan(max_queries=max_queries)
+    if not plan:
+        print(f"⚠️  Sin plan: revisa tools.whoogle en {CONFIG_FILE}")
+        return 1
+
+    print(f"🧭 {len(plan)} consultas")
+    for item in plan:
+        print(f"   [{item['priority']}] {item['kind']:<9} {item['query']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Dominio registrable (eTLD+1) de un host para Plant PWR.
+
+Agrupar por urlparse(url).netloc cuenta www.instagram.com e instagram.com
+por separado y no distingue seedexpress.com.co de un subdominio suyo. Aquí
+cada host se reduce a su dominio registrable con la Public Suffix List
+incluida en el repositorio (public_suffix_list.dat, sección ICANN y
+privada: tiendas.myshopify.com cuenta como dominio propio). La lista se
+compila una vez en un trie de etiquetas invertidas y cada host se memoiza.
+
+Uso:
+    python3 registrable_domain.py host [host ...]
+"""
+
+import ipaddress
+import os
+import sys
+import threading
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+PSL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public_suffix_list.dat")
+
+CACHE_SIZE = 65536   # Hosts memoizados
+
+_TERMINAL = '$'      # Marca de fin de regla en el trie
+_EXCEPTION = '!'     # Marca de regla de excepción (!www.ck)
+
+_trie = None
+_trie_lock = threading.Lock()
+
+
+def _label_forms(label):
+    """La etiqueta tal cual y, si no es ASCII, su forma punycode"""
+    forms = {label}
+    if not label.isascii() and label not in ('*',):
+        try:
+            forms.add(label.encode('idna').decode('ascii'))
+        except UnicodeError:
+            pass
+    return forms
+
+
+def _insert(trie, labels, exception):
+    """Inserta una regla (etiquetas de derecha a izquierda) en el trie"""
+    nodes = [trie]
+    for label in labels:
+        nodes = [node.setdefault(form, {}) for node in nodes for form in _label_forms(label)]
+    for node in nodes:
+        node[_EXCEPTION if exception else _TERMINAL] = True
+
+
+def load_trie(path=PSL_FILE):
+    """Compila la Public Suffix List en un trie anidado de dicts"""
+    trie = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            rule = line.strip().split(' ', 1)[0]
+            if not rule or rule.startswith('//'):
+                continue
+            exception = rule.startswith('!')
+            rule = rule.lstrip('!').lower()
+            _insert(trie, reversed(rule.split('.')), exception)
+    return trie
+
+
+def _get_trie():
+    global _trie
+    with _trie_lock:
+        if _trie is None:
+            _trie = load_trie()
+        return _trie
+
+
+def _suffix_length(labels):
+    """
+    Número de etiquetas del sufijo público de un host.
+
+    Aplica el algoritmo de la PSL: gana la regla de excepción si la hay
+    (su sufijo es la regla sin la etiqueta izquierda); si no, la regla más
+    larga, incluidos los comodines; sin regla, el TLD ("*" implícito).
+    """
+    node = _get_trie()
+    length = 1
+    for depth, label in enumerate(reversed(labels), 1):
+        child = node.get(label)
+        wildcard = node.get('*')
+
+        if child is not None and child.get(_EXCEPTION):
+            return depth - 1
+        if child is not None and child.get(_TERMINAL):
+            length = depth
+        elif wildcard is not None and wildcard.get(_TERMINAL):
+            length = depth
+
+        if child is None:
+            break
+        node = child
+    return length
+
+
+def _normalize_host(host):
+    host = (host or '').strip().lower().rstrip('.')
+    if host.startswith('[') and host.endswith(']'):
+        return host[1:-1]
+    if host.count(':') == 1:
+        host = host.split(':', 1)[0]
+    return host
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def public_suffix(host):
+    """Sufijo público de un host (com.co, myshopify.com, ...)"""
+    labels = _normalize_host(host).split('.')
+    return '.'.join(labels[-_suffix_length(labels):])
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def registrable_domain(host):
+    """
+    Dominio registrable (eTLD+1) de un host.
+
+    Las IPs, los hosts de una sola etiqueta y los que son ellos mismos un
+    sufijo público se devuelven normalizados tal cual.
+    """
+    host = _normalize_host(host)
+    if not host:
+        return host
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+
+    labels = host.split('.')
+    length = _suffix_length(labels)
+    if length >= len(labels):
+        return host
+    return '.'.join(labels[-(length + 1):])
+
+
+def url_domain(url):
+    """Dominio registrable de una URL ('' si no tiene host)"""
+    try:
+        return registrable_domain(urlsplit(url).hostname or '')
+    except ValueError:
+        return ''
+
+
+def result_domain(result):
+    """Dominio registrable de un resultado de búsqueda (URL o campo domain)"""
+    return url_domain(result.get('url') or '') or registrable_domain(result.get('domain') or '')
+
+
+if __name__ == "__main__":
+    for host in sys.argv[1:]:
+        print(f"{host:<45} {registrable_domain(host):<30} (sufijo: {public_suffix(host)})")
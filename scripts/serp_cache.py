@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Caché en disco de páginas de resultados de Whoogle para Plant PWR.
+
+Las búsquedas de whoogle_search.py, daily_whoogle_search.py y config.json se
+solapan ("Plant PWR Colombia", "cannabis veterinario Colombia"...), así que
+la misma página se pedía varias veces al día. Cada página se guarda
+comprimida bajo el hash de (consulta, num, locale, start), con TTL y un
+tope de tamaño con expulsión LRU. El HTML crudo permite volver a extraer los
+resultados sin red (por ejemplo tras actualizar selector_profiles.json).
+
+Uso:
+    python3 serp_cache.py            # re-extrae offline todas las páginas en caché
+    python3 serp_cache.py --evict    # aplica el tope de tamaño
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+CACHE_DIR = "/root/.openclaw/workspace/plant-pwr-investigation/monitoreo/serp_cache"
+
+DEFAULT_TTL = 6 * 3600               # Segundos que una página se considera fresca
+MAX_CACHE_BYTES = 200 * 1024 * 1024  # Tope del directorio; se expulsan las menos usadas
+
+# Tamaño del directorio llevado en memoria: put no recorre la caché en cada
+# escritura, solo cuando el total estimado pasa el tope o cada RESCAN_EVERY
+# escrituras (otros procesos también escriben en el mismo directorio)
+RESCAN_EVERY = 256
+EVICT_HEADROOM = 0.1   # Al pasar el tope se libera un 10% más para no expulsar en cada put
+
+_evict_lock = threading.Lock()
+_sizes = {}    # cache_dir -> bytes estimados
+_writes = {}   # cache_dir -> escrituras desde el último recorrido
+
+# Las funciones con cache_dir=None usan CACHE_DIR en el momento de la llamada,
+# así que un benchmark puede redirigir la caché asignando serp_cache.CACHE_DIR
+
+
+def normalize_query(query):
+    """Normaliza espacios y mayúsculas: Google no los distingue"""
+    return ' '.join(query.split()).lower()
+
+
+def cache_key(query, num, locale=None, start=0):
+    """Hash SHA-256 de la petición (consulta normalizada, num, locale y desplazamiento)"""
+    key = [normalize_query(query), int(num), locale or '']
+    if start:
+        key.append(int(start))   # La primera página conserva la clave anterior
+    raw = json.dumps(key, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _path(key, cache_dir):
+    return os.path.join(cache_dir, key[:2], f"{key}.html.gz")
+
+
+def _read(path):
+    """Lee (metadatos, html) de una página en caché; None si está dañada"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            meta = json.loads(f.readline())
+            return meta, f.read()
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def get(query, num, locale=None, ttl=DEFAULT_TTL, cache_dir=None, start=0):
+    """
+    HTML en caché de una búsqueda, o None si no existe o caducó.
+
+    Un acierto actualiza la fecha de modificación del archivo, que es la
+    que usa la expulsión LRU; la caducidad se mide con fetched_at.
+    """
+    path = _path(cache_key(query, num, locale, start), cache_dir or CACHE_DIR)
+    if not os.path.exists(path):
+        return None
+
+    page = _read(path)
+    if page is None:
+        return None
+    meta, html = page
+
+    if ttl is not None and time.time() - meta.get('fetched_at', 0) > ttl:
+        return None
+
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return html
+
+
+def put(query, num, html, locale=None, cache_dir=None, max_bytes=MAX_CACHE_BYTES, start=0):
+    """Guarda el HTML de una búsqueda (escritura atómica) y aplica el tope de tamaño"""
+    cache_dir = cache_dir or CACHE_DIR
+    key = cache_key(query, num, locale, start)
+    path = _path(key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    meta = {
+        'query': query,
+        'num': int(num),
+        'locale': locale,
+        'start': int(start),
+        'fetched_at': time.time()
+    }
+
+    # Nombre temporal único: varias búsquedas en paralelo pueden escribir a la vez
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        f.write(json.dumps(meta, ensure_ascii=False) + '\n')
+        f.write(html)
+    try:
+        replaced = os.path.getsize(path)
+    except OSError:
+        replaced = 0
+    written = os.path.getsize(tmp_path)
+    os.replace(tmp_path, path)
+
+    if max_bytes is not None:
+        _track_write(cache_dir, written - replaced, max_bytes)
+    return key
+
+
+def _track_write(cache_dir, delta, max_bytes):
+    """Suma una escritura al tamaño estimado y expulsa solo si pasa el tope"""
+    with _evict_lock:
+        size = _sizes.get(cache_dir)
+        writes = _writes.get(cache_dir, 0) + 1
+        _writes[cache_dir] = writes
+        if size is not None and writes < RESCAN_EVERY:
+            _sizes[cache_dir] = size + delta
+            if size + delta <= max_bytes:
+                return 0
+    # Primera escritura del proceso, recorrido periódico o tope superado
+    return evict(max_bytes, cache_dir, headroom=EVICT_HEADROOM)
+
+
+def _entries(cache_dir):
+    """(ruta, tamaño, mtime) de cada página en caché"""
+    if not os.path.isdir(cache_dir):
+        return
+    for bucket in os.scandir(cache_dir):
+        if not bucket.is_dir():
+            continue
+        for entry in os.scandir(bucket.path):
+            if entry.name.endswith('.html.gz'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield entry.path, stat.st_size, stat.st_mtime
+
+
+def evict(max_bytes=MAX_CACHE_BYTES, cache_dir=None, headroom=0):
+    """
+    Borra las páginas usadas hace más tiempo hasta quedar bajo `max_bytes`.
+
+    Con `headroom`, si hay que expulsar se baja hasta max_bytes × (1 - headroom).
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    with _evict_lock:
+        entries = list(_entries(cache_dir))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        target = max_bytes * (1 - headroom) if total > max_bytes else max_bytes
+
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        _sizes[cache_dir] = total
+        _writes[cache_dir] = 0
+        return removed
+
+
+def iter_pages(cache_dir=None):
+    """Itera (metadatos, html) de todas las páginas en caché, caducadas incluidas"""
+    for path, _, _ in _entries(cache_dir or CACHE_DIR):
+        page = _read(path)
+        if page is not None:
+            yield page
+
+
+def main():
+    if '--evict' in sys.argv[1:]:
+        removed = evict()
+        print(f"🗑️  {removed} páginas expulsadas de {CACHE_DIR}")
+        return 0
+
+    from serp_parser import extract_serp
+
+    pages = sorted(iter_pages(), key=lambda page: page[0].get('fetched_at', 0))
+    print(f"📦 {len(pages)} páginas en {CACHE_DIR}")
+
+    unmatched = 0
+    for meta, html in pages:
+        results, profile = extract_serp(html, max_containers=meta['num'] * 2)
+        if profile is None:
+            unmatched += 1
+        fetched = time.strftime('%Y-%m-%d %H:%M', time.localtime(meta.get('fetched_at', 0)))
+        page = meta.get('start', 0) // max(1, meta['num']) + 1
+        print(f"   {fetched}  {meta['query'][:50]:<50} p{page:<3} {len(results):>3} resultados  ({profile})")
+
+    if unmatched:
+        print(f"⚠️  {unmatched} páginas sin perfil de selectores que coincida")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
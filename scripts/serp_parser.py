@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Extracción de resultados de páginas de Whoogle para Plant PWR.
+
+Un único recorrido del HTML por eventos (start / end / data) sustituye las
+llamadas find/find_all de BeautifulSoup que antes se repetían unas ocho
+veces por contenedor. Usa el parser compilado de lxml si está instalado y,
+si no, el html.parser de la librería estándar con la misma lógica.
+
+Los selectores CSS de Whoogle viven en selector_profiles.json: cada perfil
+se compila una vez y se prueban en orden empezando por el último que
+funcionó, de modo que un cambio de marcado solo requiere añadir un perfil.
+"""
+
+import json
+import os
+import re
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+try:
+    from lxml import etree
+except ImportError:  # Sin lxml se usa html.parser (más lento, mismo resultado)
+    etree = None
+
+PROFILES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "selector_profiles.json")
+
+SNIPPET_MAX_LENGTH = 200
+
+BACKEND = 'lxml' if etree is not None else 'html.parser'
+
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+
+
+_SELECTOR_RE = re.compile(r"^([a-z0-9]*)((?:\.[\w-]+)*)(?:\[class=['\"]([^'\"]*)['\"]\])?$")
+
+
+def compile_selector(selector):
+    """
+    Compila un selector a una función (tag, clases) -> bool.
+
+    Sintaxis soportada:
+        "div.ZINbbc"                         etiqueta que contiene esas clases
+        "div[class='ilUpNd UFvD1 aSRlid']"   atributo class exacto
+        "details"                            solo la etiqueta
+    """
+    match = _SELECTOR_RE.match(selector.strip())
+    if not match:
+        raise ValueError(f"Selector no soportado: {selector!r}")
+
+    tag = match.group(1) or None
+    required = frozenset(c for c in match.group(2).split('.') if c)
+    exact = ' '.join(match.group(3).split()) if match.group(3) is not None else None
+
+    def matches(element_tag, classes):
+        if tag is not None and element_tag != tag:
+            return False
+        if exact is not None and ' '.join(classes) != exact:
+            return False
+        return required.issubset(classes)
+
+    return matches
+
+
+def compile_profile(profile):
+    """Precompila los selectores de un perfil"""
+    return {
+        'name': profile['name'],
+        'version': profile.get('version'),
+        'container': compile_selector(profile['container']),
+        'skip': [compile_selector(s) for s in profile.get('skip', [])],
+        'title_heading': compile_selector(profile['title_heading']),
+        'title': compile_selector(profile['title']),
+        'snippet': compile_selector(profile['snippet']),
+        'display_url': compile_selector(profile['display_url']),
+        'exclude_link_prefixes': tuple(profile.get('exclude_link_prefixes', []))
+    }
+
+
+def load_profiles(path=PROFILES_FILE):
+    """Carga y compila los perfiles de selectores en su orden de prioridad"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [compile_profile(profile) for profile in data.get('profiles', [])]
+
+
+_profiles = None
+_last_profile = None
+_profiles_lock = threading.Lock()
+
+
+def get_profiles():
+    """Perfiles compilados, cargados una sola vez por proceso"""
+    global _profiles
+    with _profiles_lock:
+        if _profiles is None:
+            _profiles = load_profiles()
+        return _profiles
+
+
+class _SerpTarget:
+    """
+    Receptor de eventos del parser que arma los resultados en un solo paso.
+
+    Implementa la interfaz "parser target" de lxml (start, end, data, close),
+    que también alimenta el adaptador de html.parser.
+    """
+
+    def __init__(self, profile, max_containers=None):
+        self.profile = profile
+        self.max_containers = max_containers
+        self.records = []
+        self.depth = 0
+        self.containers_seen = 0
+        self.title_hits = 0      # Resultados cuyo título coincidió con el selector del perfil
+        self.container = None
+        self.pending_text = []
+
+    def _flush_text(self):
+        # Igual que get_text(strip=True): cada texto recortado, unidos sin separador
+        if not self.pending_text:
+            return
+        text = ''.join(self.pending_text).strip()
+        self.pending_text = []
+        if text and self.container is not None:
+            for capture in self.container['captures'].values():
+                if capture['open']:
+                    capture['parts'].append(text)
+
+    def _capture(self, name):
+        captures = self.container['captures']
+        if name not in captures:
+            captures[name] = {'depth': self.depth, 'open': True, 'parts': []}
+
+    def start(self, tag, attrib):
+        self._flush_text()
+        self.depth += 1
+        classes = (attrib.get('class') or '').split()
+        profile = self.profile
+
+        if self.container is None:
+            if profile['container'](tag, classes):
+                self.containers_seen += 1
+                if self.max_containers is None or self.containers_seen <= self.max_containers:
+                    self.container = {'depth': self.depth, 'skip': False, 'url': None, 'captures': {}}
+            return
+
+        container = self.container
+
+        if any(skip(tag, classes) for skip in profile['skip']):
+            container['skip'] = True
+        elif profile['title_heading'](tag, classes):
+            self._capture('heading')
+        elif profile['title'](tag, classes):
+            heading = container['captures'].get('heading')
+            if heading and heading['open']:
+                self._capture('title')
+        elif profile['snippet'](tag, classes):
+            self._capture('snippet')
+        elif profile['display_url'](tag, classes):
+            self._capture('display_url')
+        elif tag == 'a' and container['url'] is None:
+            href = attrib.get('href') or ''
+            if href.startswith('http') and not href.startswith(profile['exclude_link_prefixes']):
+                container['url'] = href
+
+    def end(self, tag):
+        self._flush_text()
+        container = self.container
+        if container is not None:
+            for capture in container['captures'].values():
+                if capture['open'] and capture['depth'] == self.depth:
+                    capture['open'] = False
+            if container['depth'] == self.depth:
+                self._finish_container()
+        self.depth -= 1
+
+    def data(self, text):
+        if self.container is not None:
+            self.pending_text.append(text)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        self._flush_text()
+        return self.records
+
+    def _finish_container(self):
+        container = self.container
+        self.container = None
+        captures = container['captures']
+
+        if container['skip'] or not container['url']:
+            return
+
+        title_capture = captures.get('title') or captures.get('heading')
+        if not title_capture:
+            return
+        title = ''.join(title_capture['parts'])
+        if not title:
+            return
+        if 'title' in captures:
+            self.title_hits += 1
+
+        snippet = ''.join(captures['snippet']['parts']) if 'snippet' in captures else ''
+        # Quitar la fecha que precede al snippet ("hace 2 días · ...")
+        if '·' in snippet:
+            snippet = snippet.split('·', 1)[-1].strip()
+
+        url = container['url']
+        try:
+            domain = urlparse(url).netloc
+        except ValueError:
+            domain = 'unknown'
+
+        self.records.append({
+            'title': title,
+            'url': url,
+            'domain': domain,
+            'snippet': snippet[:SNIPPET_MAX_LENGTH],
+            'display_url': ''.join(captures['display_url']['parts']) if 'display_url' in captures else ''
+        })
+
+
+class _StdlibDriver(HTMLParser):
+    """Adapta html.parser a la interfaz target, con etiquetas siempre balanceadas"""
+
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+        self.stack = []
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict((name, value or '') for name, value in attrs))
+        if tag in VOID_ELEMENTS:
+            self.target.end(tag)
+        else:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, dict((name, value or '') for name, value in attrs))
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        # Como BeautifulSoup: cerrar hasta la última etiqueta abierta con ese nombre
+        if tag not in self.stack:
+            return
+        while self.stack:
+            open_tag = self.stack.pop()
+            self.target.end(open_tag)
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self.target.end(self.stack.pop())
+        return self.target.close()
+
+
+def _run(html, profile, max_containers, backend):
+    """Un recorrido del HTML con un perfil concreto; devuelve el target ya cerrado"""
+    target = _SerpTarget(profile, max_containers)
+
+    if backend == 'lxml' and etree is not None:
+        if html and html.strip():
+            etree.fromstring(html, etree.HTMLParser(target=target))
+        return target
+
+    driver = _StdlibDriver(target)
+    driver.feed(html)
+    driver.close()
+    return target
+
+
+def extract_serp(html, max_containers=None, backend=None, profiles=None):
+    """
+    Extrae los resultados probando los perfiles de selectores en orden.
+
+    Empieza por el último perfil que devolvió resultados; normalmente basta
+    un solo recorrido del HTML. Un perfil coincide cuando su selector de
+    título encuentra algo: si solo coincide el contenedor (título tomado del
+    h3, sin snippet) se prueba el siguiente y, si ninguno coincide del todo,
+    se devuelve el parcial con más resultados.
+
+    Args:
+        html: HTML de la página de resultados
+        max_containers: Máximo de contenedores de resultado a considerar
+        backend: 'lxml' o 'html.parser' (por defecto el más rápido disponible)
+        profiles: Perfiles compilados (por defecto los de selector_profiles.json)
+
+    Returns:
+        Tupla (resultados, nombre del perfil que coincidió o None)
+    """
+    global _last_profile
+    backend = backend or BACKEND
+    profiles = profiles if profiles is not None else get_profiles()
+
+    ordered = sorted(profiles, key=lambda p: p['name'] != _last_profile)
+    partial = None
+    for profile in ordered:
+        target = _run(html, profile, max_containers, backend)
+        if target.title_hits:
+            _last_profile = profile['name']
+            return target.records, profile['name']
+        if target.records and (partial is None or len(target.records) > len(partial.records)):
+            partial = target
+
+    if partial is not None:
+        return partial.records, partial.profile['name']
+    return [], None
+
+
+def parse_serp(html, max_containers=None, backend=None):
+    """
+    Extrae los resultados de una página de Whoogle en un solo recorrido.
+
+    Args:
+        html: HTML de la página de resultados
+        max_containers: Máximo de contenedores de resultado a considerar
+        backend: 'lxml' o 'html.parser' (por defecto el más rápido disponible)
+
+    Returns:
+        Lista de dicts con title, url, domain, snippet y display_url
+    """
+    records, _ = extract_serp(html, max_containers, backend)
+    return records
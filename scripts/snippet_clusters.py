@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Agrupación de textos casi idénticos (MinHash + LSH) para Plant PWR.
+
+Los revendedores copian el mismo texto comercial ("PlantPwr es un suplemento
+100% natural... reduce el dolor hasta en un 97%") en Instagram, Facebook y
+tiendas. Cada snippet o texto de página se resume en una firma MinHash de
+shingles de caracteres; las firmas se reparten en bandas LSH, de modo que
+solo se comparan los textos que comparten alguna banda y agrupar o
+consultar un texto nuevo no exige recorrer todo el corpus.
+
+El índice se guarda en disco (JSONL de solo añadir: una línea por documento
+y por unión de clústeres) para marcar al momento las copias nuevas de un
+texto ya conocido. Cada ejecución solo añade sus líneas nuevas y solo arma
+los clústeres de los documentos que tocó.
+
+Los resultados cuya página está capturada en la bóveda de evidencia
+(evidence_vault.py) se comparan por el texto de la página (attach_page_text);
+el resto, por el snippet.
+
+Uso:
+    python3 snippet_clusters.py [resultados.json ...]   # por defecto evidencia/whoogle_results.json
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import zlib
+
+import evidence_vault
+from dedup import canonical_url
+from keyword_matcher import fold
+from page_diff import page_text
+
+INDEX_FILE = "/root/.openclaw/workspace/plant-pwr-investigation/analisis/snippet_index.jsonl"
+DEFAULT_INPUT = "/root/.openclaw/workspace/plant-pwr-investigation/evidencia/whoogle_results.json"
+
+SHINGLE_SIZE = 5          # Caracteres por shingle (sin espacios: los snippets pierden espacios)
+NUM_PERM = 64             # Permutaciones MinHash
+BANDS = 16                # Bandas LSH (filas por banda = NUM_PERM / BANDS)
+SIMILARITY = 0.5          # Jaccard estimado mínimo para unir dos textos
+MIN_TEXT_LENGTH = 30      # Textos más cortos no se agrupan (demasiado genéricos)
+MAX_PAGE_TEXT = 5000      # Caracteres del texto de página que entran en la firma
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20260223)   # Semilla fija: las firmas deben ser estables entre ejecuciones
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def shingles(text):
+    """Conjunto de hashes de los shingles de caracteres del texto normalizado"""
+    text = _NON_WORD.sub('', fold(text or ''))
+    if len(text) < SHINGLE_SIZE:
+        return set()
+    return {zlib.crc32(text[i:i + SHINGLE_SIZE].encode('utf-8'))
+            for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+    """Firma MinHash (tupla de NUM_PERM enteros) o None si el texto es muy corto"""
+    if len(text or '') < MIN_TEXT_LENGTH:
+        return None
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig_a, sig_b):
+    """Jaccard estimado entre dos firmas"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def _bands(sig):
+    rows = NUM_PERM // BANDS
+    for band in range(BANDS):
+        yield f"{band}:" + ','.join(map(str, sig[band * rows:(band + 1) * rows]))
+
+
+class SnippetIndex:
+    """
+    Índice LSH de textos con agrupación incremental.
+
+    Cada documento pertenece a un clúster (union-find): al añadir un texto
+    se buscan candidatos en sus bandas, se confirman con el Jaccard
+    estimado y se une a sus clústeres. Cada raíz guarda la lista de sus
+    miembros, así que armar un clúster no exige recorrer el índice.
+    """
+
+    def __init__(self):
+        self.signatures = {}   # doc_id -> firma
+        self.buckets = {}      # banda -> [doc_id]
+        self.parent = {}       # union-find
+        self.members = {}      # raíz -> [doc_id]
+        self.meta = {}         # doc_id -> datos para mostrar (url, dominio, texto)
+        self._pending = []     # Líneas aún no guardadas
+        self._rewrite = True   # El archivo no existe o tiene el formato antiguo
+
+    def _find(self, doc_id):
+        root = doc_id
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[doc_id] != root:
+            self.parent[doc_id], doc_id = root, self.parent[doc_id]
+        return root
+
+    def _union(self, keep, merge):
+        """Une el clúster de `merge` al de `keep`, que conserva su raíz"""
+        root_keep, root_merge = self._find(keep), self._find(merge)
+        if root_keep != root_merge:
+            self.parent[root_merge] = root_keep
+            self.members[root_keep].extend(self.members.pop(root_merge))
+            self._pending.append({'union': [keep, merge]})
+
+    def query(self, text):
+        """Documentos ya indexados casi idénticos al texto: [(doc_id, similitud)]"""
+        sig = signature(text)
+        if sig is None:
+            return []
+        return self._candidates(sig)
+
+    def _candidates(self, sig, exclude=None):
+        seen = set()
+        matches = []
+        for band in _bands(sig):
+            for doc_id in self.buckets.get(band, ()):
+                if doc_id in seen or doc_id == exclude:
+                    continue
+                seen.add(doc_id)
+                score = similarity(sig, self.signatures[doc_id])
+                if score >= SIMILARITY:
+                    matches.append((doc_id, score))
+        return sorted(matches, key=lambda m: -m[1])
+
+    def add(self, doc_id, text, **meta):
+        """
+        Indexa un texto.
+
+        Returns:
+            Lista [(doc_id, similitud)] de documentos previos casi idénticos
+            (vacía si es un texto nuevo o demasiado corto)
+        """
+        sig = signature(text)
+        if sig is None:
+            return []
+
+        if doc_id in self.signatures:
+            return self._candidates(sig, exclude=doc_id)
+
+        matches = self._candidates(sig)
+        self._index(doc_id, sig, dict(meta, text=(text or '')[:200]))
+        self._pending.append({'id': doc_id, 'sig': list(sig), 'meta': self.meta[doc_id]})
+        # El texto nuevo entra en el clúster ya conocido (su raíz es el documento más antiguo)
+        for other, _ in matches:
+            self._union(other, doc_id)
+        return matches
+
+    def _index(self, doc_id, sig, meta):
+        self.signatures[doc_id] = sig
+        self.parent[doc_id] = doc_id
+        self.members[doc_id] = [doc_id]
+        self.meta[doc_id] = meta
+        for band in _bands(sig):
+            self.buckets.setdefault(band, []).append(doc_id)
+
+    def cluster_of(self, doc_id):
+        return self._find(doc_id) if doc_id in self.parent else None
+
+    def cluster_members(self, doc_id):
+        """Documentos del clúster de `doc_id` (lista vacía si no está indexado)"""
+        root = self.cluster_of(doc_id)
+        return list(self.members.get(root, ())) if root is not None else []
+
+    def clusters(self, min_size=2):
+        """Clústeres (listas de doc_id) de al menos `min_size` documentos, los mayores primero"""
+        return sorted((list(g) for g in self.members.values() if len(g) >= min_size), key=len, reverse=True)
+
+    def _lines(self):
+        """Todo el índice como líneas (documentos y uniones)"""
+        for doc_id, sig in self.signatures.items():
+            yield {'id': doc_id, 'sig': list(sig), 'meta': self.meta.get(doc_id, {})}
+        for doc_id in self.signatures:
+            if self.parent[doc_id] != doc_id:
+                yield {'union': [self._find(doc_id), doc_id]}
+
+    def save(self, path=INDEX_FILE):
+        """
+        Guarda lo añadido desde la última carga.
+
+        Solo se añaden líneas al final; el archivo se reescribe entero
+        (escritura atómica) solo si no existía o venía en el formato antiguo.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        dump = lambda line: json.dumps(line, ensure_ascii=False, separators=(',', ':')) + '\n'
+        if self._rewrite or not os.path.exists(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(dump({'params': _params()}))
+                for line in self._lines():
+                    f.write(dump(line))
+            os.replace(tmp_path, path)
+            self._rewrite = False
+        elif self._pending:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(''.join(dump(line) for line in self._pending))
+        self._pending = []
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        """Índice guardado, o uno vacío si no existe o cambió la parametrización"""
+        index = cls()
+        legacy = path[:-1] if path.endswith('.jsonl') else None
+        if not os.path.exists(path):
+            if legacy and os.path.exists(legacy):
+                index._load_legacy(legacy)
+            return index
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if json.loads(f.readline()).get('params') != _params():
+                    return index
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        continue   # Línea truncada por una caída
+                    if 'union' in item:
+                        keep, merge = item['union']
+                        if keep in index.parent and merge in index.parent:
+                            index._union(keep, merge)
+                    elif item.get('id') not in index.signatures:
+                        index._index(item['id'], tuple(item['sig']), item.get('meta', {}))
+        except (OSError, ValueError):
+            return cls()
+        index._pending = []
+        index._rewrite = False
+        return index
+
+    def _load_legacy(self, path):
+        """Índice en el formato anterior (un solo JSON con todos los documentos)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('params') != _params():
+            return
+        docs = data.get('docs', {})
+        for doc_id, doc in docs.items():
+            self._index(doc_id, tuple(doc['sig']), doc.get('meta', {}))
+        for doc_id, doc in docs.items():
+            if doc.get('cluster', doc_id) in self.parent:
+                self._union(doc['cluster'], doc_id)
+        self._pending = []
+
+
+def _params():
+    return {'shingle_size': SHINGLE_SIZE, 'num_perm': NUM_PERM, 'bands': BANDS}
+
+
+def attach_page_text(results, vault_dir=evidence_vault.VAULT_DIR):
+    """
+    Añade 'page_text' a los resultados cuya página está en la bóveda.
+
+    Se usa la captura más reciente cuya URL (pedida o final) coincide con la
+    URL canónica del resultado.
+
+    Returns:
+        Número de resultados con texto de página
+    """
+    latest = {}
+    for _, record in evidence_vault.iter_manifest(vault_dir):
+        if not record.get('sha256') or (record.get('status_code') or 0) >= 400:
+            continue
+        for url in (record.get('url'), record.get('final_url')):
+            if url:
+                latest[canonical_url(url)] = record['sha256']
+
+    attached = 0
+    texts = {}
+    for result in results:
+        url = result.get('url')
+        sha256 = latest.get(result.get('canonical_url') or canonical_url(url)) if url else None
+        if not sha256:
+            continue
+        if sha256 not in texts:
+            try:
+                html = evidence_vault.get_object(sha256, vault_dir).decode('utf-8', errors='replace')
+            except (OSError, ValueError, RuntimeError):
+                html = ''
+            texts[sha256] = page_text(html)[:MAX_PAGE_TEXT]
+        if texts[sha256]:
+            result['page_text'] = texts[sha256]
+            attached += 1
+    return attached
+
+
+def result_text(result):
+    """Texto a comparar de un resultado: texto de página si se descargó, si no el snippet"""
+    return result.get('page_text') or result.get('snippet') or ''
+
+
+def result_id(result):
+    """Identificador estable de un resultado (URL canónica si existe)"""
+    return result.get('canonical_url') or result.get('url') or ''
+
+
+def cluster_results(results, index=None):
+    """
+    Agrupa resultados por texto casi idéntico.
+
+    Añade a cada resultado 'copy_cluster' (id del clúster) y, si coincide con
+    un texto ya indexado en una ejecución anterior, 'known_copy_of'.
+
+    Returns:
+        Lista de clústeres (listas de resultados) con más de un miembro,
+        los mayores primero
+    """
+    index = index if index is not None else SnippetIndex()
+    known = set(index.signatures)
+    by_id = {}
+
+    for result in results:
+        doc_id = result_id(result)
+        if not doc_id:
+            continue
+        by_id[doc_id] = result
+        matches = index.add(doc_id, result_text(result), url=result.get('url'), domain=result.get('domain'))
+        previous = [other for other, _ in matches if other in known]
+        if previous:
+            result['known_copy_of'] = previous[0]
+
+    for doc_id, result in by_id.items():
+        if doc_id in index.parent:
+            result['copy_cluster'] = index.cluster_of(doc_id)
+
+    # Solo los clústeres de los documentos de esta tanda, no todo el índice
+    clusters = []
+    for root in {index.cluster_of(doc_id) for doc_id in by_id} - {None}:
+        members = [by_id[doc_id] for doc_id in index.members[root] if doc_id in by_id]
+        if len(members) > 1:
+            clusters.append(members)
+    return sorted(clusters, key=len, reverse=True)
+
+
+def main():
+    paths = sys.argv[1:] or [DEFAULT_INPUT]
+    results = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        results.extend(data if isinstance(data, list) else data.get('results', []))
+
+    with_pages = attach_page_text(results)
+    clusters = cluster_results(results)
+    grouped = sum(len(c) for c in clusters)
+    print(f"🧬 {len(results)} resultados → {len(clusters)} grupos de texto copiado ({grouped} resultados)")
+    print(f"   {with_pages} comparados por el texto de la página capturada")
+
+    for number, members in enumerate(clusters, 1):
+        print(f"\n📎 Grupo {number} ({len(members)} resultados)")
+        print(f"   \"{result_text(members[0])[:100]}...\"")
+        for result in members:
+            print(f"   • {result.get('domain')}: {result.get('url')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,9 @@ Final test of Whoogle search for Plant PWR.
 """
 
 import requests
-from bs4 import BeautifulSoup
 import json
-from urllib.parse import urlparse
+from dedup import canonical_url
+from serp_parser import extract_serp
 
 WHOOGLE_URL = "http://localhost:8080"
 HEADERS = {'User-Agent': 'Mozilla/5.0'}
@@ -34,79 +34,22 @@ def search_plant_pwr():
                 print(f"❌ Error: HTTP {response.status_code}")
                 continue
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Extract results in a single pass over the HTML
+            records, profile = extract_serp(response.text)
+            if profile is None:
+                print("⚠️  No selector profile matched (Whoogle markup changed?)")
+            else:
+                print(f"   🧩 Selector profile: {profile}")
             
-            # Find all divs with class ZINbbc
-            result_containers = soup.find_all('div', class_='ZINbbc')
-            
-            for container in result_containers:
-                # Skip non-result sections
-                if container.find('details') or container.find('summary'):
-                    continue
-                    
-                if container.find('span', class_='cAuxJf'):
-                    continue
-                
-                # Extract title
-                title_elem = container.find('h3', class_='zBAuLc')
-                if not title_elem:
-                    continue
-                    
-                title_div = title_elem.find('div', class_='ilUpNd UFvD1 aSRlid')
-                if title_div:
-                    title = title_div.get_text(strip=True)
-                else:
-                    title = title_elem.get_text(strip=True)
-                
-                # Extract URL
-                link_elems = container.find_all('a', href=True)
-                external_url = None
-                
-                for link in link_elems:
-                    href = link['href']
-                    if href.startswith('http') and not href.startswith('http://localhost'):
-                        external_url = href
-                        break
-                
-                if not external_url:
-                    continue
-                
-                # Extract snippet
-                snippet_elem = container.find('div', class_='ilUpNd H66NU aSRlid')
-                snippet = ""
-                if snippet_elem:
-                    snippet_text = snippet_elem.get_text(strip=True)
-                    if '·' in snippet_text:
-                        snippet_text = snippet_text.split('·', 1)[-1].strip()
-                    snippet = snippet_text[:200]
-                
-                # Extract display URL
-                url_elem = container.find('div', class_='ilUpNd BamJPe aSRlid XR4uSe')
-                display_url = ""
-                if url_elem:
-                    display_url = url_elem.get_text(strip=True)
-                
-                # Extract domain
-                domain = ""
-                try:
-                    parsed = urlparse(external_url)
-                    domain = parsed.netloc
-                except:
-                    domain = "unknown"
-                
-                result = {
-                    'query': query,
-                    'title': title,
-                    'url': external_url,
-                    'domain': domain,
-                    'display_url': display_url,
-                    'snippet': snippet
-                }
+            for extracted in records:
+                external_url = extracted['url']
+                title = extracted['title']
+                result = {'query': query, **extracted}
                 
                 # Check if this is a duplicate
                 is_duplicate = False
                 for existing in all_results:
-                    if existing['url'] == external_url:
+                    if canonical_url(existing['url']) == canonical_url(external_url):
                         is_duplicate = True
                         break
                 
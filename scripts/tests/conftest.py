@@ -0,0 +1,6 @@
+"""Los scripts se importan como módulos planos desde scripts/"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
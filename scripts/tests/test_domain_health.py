@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+import domain_health as dh
+
+
+def _simulate_dead_domain(days, breakers):
+    """Cron diario contra un dominio caído; devuelve los días en que se sondeó"""
+    start = datetime(2026, 1, 1, 6, 0)
+    log = []
+    probed = []
+    for day in range(1, days + 1):
+        now = start + timedelta(days=day)
+        window = [e for e in log if e['date'] >= (now - timedelta(days=dh.HISTORY_DAYS)).isoformat()]
+        health = dh.build_health(window, breakers)
+        circuit, next_probe = dh.circuit_state(health, 'tienda.co', now=now)
+        if circuit == dh.CIRCUIT_OPEN:
+            result = {'domain': 'tienda.co', 'status': 'SKIPPED', 'checked_at': now.isoformat()}
+        else:
+            result = {'domain': 'tienda.co', 'status': 'INACTIVE', 'checked_at': now.isoformat()}
+            probed.append(day)
+        dh.update_breakers(breakers, [result], health)
+        log.append({'date': now.isoformat(), 'results': [result]})
+    return probed
+
+
+def test_backoff_keeps_growing_past_the_history_window():
+    probed = _simulate_dead_domain(300, {})
+    gaps = [b - a for a, b in zip(probed, probed[1:])]
+    # Seis sondeos diarios, luego 1, 2, 4... días y nunca vuelve a bajar del tope
+    assert probed[:7] == [1, 2, 3, 4, 5, 6, 7]
+    assert gaps[6:12] == [1, 2, 4, 8, 16, 32]
+    assert set(gaps[11:]) == {dh.MAX_BACKOFF_DAYS}
+
+
+def test_recovery_closes_the_circuit():
+    breakers = {}
+    _simulate_dead_domain(30, breakers)
+    assert breakers['tienda.co']['backoff_days'] > 1
+
+    ok = {'domain': 'tienda.co', 'status': 'ACTIVE', 'checked_at': datetime(2026, 2, 1).isoformat()}
+    dh.update_breakers(breakers, [ok])
+    assert 'tienda.co' not in breakers
+    assert dh.circuit_state(dh.build_health([], breakers), 'tienda.co')[0] == dh.CIRCUIT_CLOSED
@@ -0,0 +1,63 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_client
+import http_state
+
+
+class _Storefront(BaseHTTPRequestHandler):
+    """Tienda que acepta HEAD pero no envía ETag ni Last-Modified"""
+    body = b''
+
+    def _headers(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers()
+
+    def do_GET(self):
+        self._headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def storefront():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Storefront)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/producto/gotas-plant-pwr/"
+    server.shutdown()
+    server.server_close()
+
+
+def _check(session, state, url):
+    response, body = http_client.probe(session, url, timeout=5)
+    return response.request.method, http_state.record_response(state, url, response, body)
+
+
+def test_page_without_validators_is_still_compared(storefront):
+    session = http_client.build_session(**http_client.PROFILES['monitor'])
+    state = {}
+
+    _Storefront.body = b'<span class="price">$104.900</span>'
+    assert _check(session, state, storefront) == ('GET', http_state.CHANGE_NEW)
+    assert _check(session, state, storefront) == ('GET', http_state.CHANGE_UNCHANGED)
+
+    _Storefront.body = b'<span class="price">$99.900</span>'
+    assert _check(session, state, storefront) == ('GET', http_state.CHANGE_CHANGED)
+
+
+def test_head_is_enough_without_content_comparison(storefront):
+    session = http_client.build_session(**http_client.PROFILES['monitor'])
+    _Storefront.body = b'<span class="price">$104.900</span>'
+
+    response, body = http_client.probe(session, storefront, need_content=False, timeout=5)
+    assert (response.request.method, body) == ('HEAD', b'')
@@ -0,0 +1,39 @@
+import json
+
+import investigation_store as store
+
+
+def _count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_reimporting_search_results_does_not_duplicate(tmp_path):
+    # Lista sin metadata ni found_at: la fecha sale de la modificación del archivo
+    results = [
+        {'query': 'Plant PWR Colombia', 'url': 'https://ispetshope.com/producto/gotas-plant-pwr/', 'title': 'Gotas'},
+        {'query': 'Plant PWR Colombia', 'url': 'https://merchashop.com.co/plant-pwr', 'title': 'Plant PWR'},
+        {'query': 'plantpwr precio', 'url': 'https://ispetshope.com/producto/gotas-plant-pwr/', 'title': 'Gotas'},
+    ]
+    path = tmp_path / "whoogle_results.json"
+    path.write_text(json.dumps(results), encoding='utf-8')
+    conn = store.connect(str(tmp_path / "investigacion.db"))
+
+    assert store.import_search_results(conn, str(path)) == 3
+    assert store.import_search_results(conn, str(path)) == 0
+    assert _count(conn, 'search_hits') == 3
+
+
+def test_monitor_run_is_visible_in_active_domains(tmp_path):
+    db = str(tmp_path / "investigacion.db")
+    entry = {
+        'date': store._now(),
+        'results': [
+            {'domain': 'ispetshope.com', 'status': 'ACTIVE', 'status_code': 200, 'checked_at': store._now()},
+            {'domain': 'merchashop.com.co', 'status': 'INACTIVE', 'checked_at': store._now()},
+        ],
+    }
+
+    assert store.record_monitor_run(entry, db) == 2
+    conn = store.connect(db)
+    assert [row[0] for row in store.active_domains(conn, days=1)] == ['ispetshope.com']
+    assert _count(conn, 'domains') == 2
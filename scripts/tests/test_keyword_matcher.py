@@ -0,0 +1,21 @@
+from keyword_matcher import KeywordMatcher
+
+KEYWORDS = {
+    'marca': ['plantpwr', 'plant pwr'],
+    'producto': ['cannabis', 'cbd', 'thc'],
+    'mascotas': ['mascota', 'pets'],
+}
+
+
+def test_short_keywords_need_word_boundaries():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.scan('healthcare.com', 'carpets.co') == {}
+    assert matcher.scan('tienda-thc.co', 'Aceite CBD para PETS') == {'mascotas': ['pets'], 'producto': ['cbd', 'thc']}
+
+
+def test_long_keywords_match_inside_words():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.scan('tiendaplantpwr.com', 'mascotasfelices.co') == {'marca': ['plantpwr'], 'mascotas': ['mascota']}
+    assert matcher.scan_fields(domain='cbd-bruno.com', title='Plant PWR® gotas') == {
+        'domain': {'producto': ['cbd']}, 'title': {'marca': ['plant pwr']}
+    }
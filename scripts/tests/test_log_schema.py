@@ -0,0 +1,19 @@
+from log_schema import DomainRegistry, decode_entry, encode_entry
+
+
+def test_note_diagnostics_survive_the_compact_format(tmp_path):
+    registry = DomainRegistry(str(tmp_path / "daily_log_domains.jsonl"))
+    entry = {
+        'date': '2026-10-18T06:00:00',
+        'results': [
+            {'domain': 'ispetshope.com', 'status': 'ACTIVE_SSL_ISSUE', 'notes': 'Precios: 94.900-189.900 COP (SSL Issue)'},
+            {'domain': 'merchashop.com.co', 'status': 'INACTIVE', 'notes': 'Marketplace potencial - Todos los intentos fallaron'},
+            {'domain': 'plantpwr.co', 'status': 'INACTIVE', 'notes': 'Nuevo hallazgo - NXDOMAIN'},
+            {'domain': 'tienda.co', 'status': 'ACTIVE', 'notes': 'Marketplace potencial'},
+        ],
+    }
+
+    encoded = encode_entry(entry, registry)
+    assert 'notes' not in str(encoded['cols'])
+    decoded = decode_entry(encoded, registry)
+    assert [r.get('reason') for r in decoded['results']] == ['SSL_ISSUE', 'ALL_FAILED', 'NXDOMAIN', None]
@@ -0,0 +1,24 @@
+import threading
+import time
+
+from monitor_async import run_checks
+
+
+def test_busy_host_does_not_hold_global_slots():
+    # Cinco verificaciones del mismo host primero y una de otro host al final
+    domains = [{'domain': 'ispetshope.com'} for _ in range(5)] + [{'domain': 'merchashop.com.co'}]
+    started = {}
+    lock = threading.Lock()
+    begin = time.monotonic()
+
+    def check(domain_info):
+        with lock:
+            started.setdefault(domain_info['domain'], time.monotonic() - begin)
+        time.sleep(0.1)
+        return {'domain': domain_info['domain'], 'status': 'ACTIVE'}
+
+    results = run_checks(domains, check, max_concurrency=2, per_host_limit=1)
+
+    assert [r['domain'] for r in results] == [d['domain'] for d in domains]
+    # Con el semáforo global tomado primero, el otro host esperaría a casi toda la cola
+    assert started['merchashop.com.co'] < 0.05
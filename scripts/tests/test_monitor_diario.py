@@ -0,0 +1,29 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import monitor_diario
+
+
+def test_only_the_winner_records_validators(monkeypatch):
+    tried = []
+    lock = threading.Lock()
+
+    def fake_try_url(url, state=None, timeout=None):
+        with lock:
+            tried.append(url)
+        # La variante específica tarda y termina después de que gane http://
+        time.sleep(0.6 if url == 'https://tienda.co' else 0)
+        response = SimpleNamespace(status_code=200, headers={'ETag': f'"{url}"'})
+        result = {'status': 'ACTIVE', 'status_code': 200, 'tested_url': url, 'change': None}
+        return result, response, b''
+
+    monkeypatch.setattr(monitor_diario, 'try_url', fake_try_url)
+    state = {}
+    result = monitor_diario.check_domain_smart({'domain': 'tienda.co'}, state)
+    time.sleep(0.8)   # La perdedora termina en segundo plano
+
+    assert result['strategy'] == 'http'
+    assert list(state) == ['http://tienda.co']
+    # Sin 'url' configurada, la específica y la https son la misma: una sola petición
+    assert tried.count('https://tienda.co') == 1
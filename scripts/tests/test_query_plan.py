@@ -0,0 +1,29 @@
+import json
+import os
+
+import query_plan
+
+REPO_CONFIG = os.path.join(os.path.dirname(__file__), '..', '..', 'config.json')
+
+
+def _config():
+    with open(REPO_CONFIG, 'r', encoding='utf-8') as f:
+        return json.load(f)['tools']['whoogle']
+
+
+def test_budget_keeps_hand_written_terms():
+    config = _config()
+    for budget_key, terms_key in query_plan.BUDGET_TERMS.items():
+        queries = query_plan.plan_queries(budget_key, config)
+        assert len(queries) <= config['query_plan'][budget_key]
+        planned = {query_plan.normalize_query(q) for q in queries}
+        for term in config['query_plan'][terms_key]:
+            assert query_plan.normalize_query(term) in planned
+
+
+def test_pinned_terms_deduplicated():
+    config = {'search_terms': ['Plant PWR Colombia'],
+              'query_plan': {'brands': ['Plant PWR'], 'cities': ['Colombia']}}
+    plan = query_plan.build_plan(config, pinned=['plant pwr colombia'])
+    assert [item['query'] for item in plan] == ['plant pwr colombia', 'Plant PWR']
+    assert plan[0]['kind'] == 'pinned'
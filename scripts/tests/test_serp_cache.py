@@ -0,0 +1,21 @@
+import serp_cache
+
+
+def _total(cache_dir):
+    return sum(size for _, size, _ in serp_cache._entries(cache_dir))
+
+
+def test_put_keeps_cache_under_cap_without_rescanning(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path)
+    html = '<html>' + 'resultado ' * 200 + '</html>'
+    scans = []
+    entries = serp_cache._entries
+    monkeypatch.setattr(serp_cache, '_entries', lambda d: scans.append(d) or entries(d))
+
+    for i in range(200):
+        serp_cache.put(f'plant pwr {i}', 10, html, cache_dir=cache_dir, max_bytes=20_000)
+
+    assert _total(cache_dir) <= 20_000
+    assert serp_cache.get('plant pwr 199', 10, cache_dir=cache_dir) == html
+    assert serp_cache.get('plant pwr 0', 10, cache_dir=cache_dir) is None
+    assert len(scans) < 40
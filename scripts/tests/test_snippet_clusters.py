@@ -0,0 +1,52 @@
+import evidence_vault
+import snippet_clusters as sc
+
+COPY = ("PlantPwr es un suplemento 100% natural, seguro y usado por cientos de dueños en Colombia "
+        "que lograron devolverle la movilidad a sus perros; reduce el dolor hasta en un 97%.")
+
+
+def _capture(vault, url, html):
+    sha256, _ = evidence_vault.put_object(html.encode('utf-8'), vault)
+    evidence_vault.append_record({'domain': url.split('/')[2], 'url': url, 'final_url': url,
+                                  'status_code': 200, 'captured_at': '2026-10-18T06:00:00',
+                                  'sha256': sha256}, vault)
+
+
+def test_captured_pages_are_compared_by_page_text(tmp_path):
+    vault = str(tmp_path / "vault")
+    _capture(vault, 'https://ispetshope.com/producto/gotas/', f"<html><script>var t=1;</script><p>{COPY}</p></html>")
+    _capture(vault, 'https://merchashop.com.co/plant-pwr', f"<html><div><b>Oferta</b> {COPY}</div></html>")
+    results = [
+        {'url': 'https://www.ispetshope.com/producto/gotas/', 'snippet': 'Gotas para perros, envío gratis a todo el país'},
+        {'url': 'https://merchashop.com.co/plant-pwr', 'snippet': 'Compra hoy con descuento especial en Medellín y Bogotá'},
+        {'url': 'https://otra.co/', 'snippet': 'Texto sin captura que no se parece a ningún otro resultado'},
+    ]
+
+    assert sc.attach_page_text(results, vault) == 2
+    assert 'var t' not in results[0]['page_text']
+    clusters = sc.cluster_results(results)
+    assert [[r['url'] for r in c] for c in clusters] == [[results[0]['url'], results[1]['url']]]
+
+
+def test_index_appends_only_new_lines_and_reloads_clusters(tmp_path):
+    path = str(tmp_path / "snippet_index.jsonl")
+    first = [{'url': f'https://tienda{i}.co/', 'snippet': COPY + f' Tienda {i}.'} for i in range(3)]
+    index = sc.SnippetIndex.load(path)
+    assert len(sc.cluster_results(first, index)) == 1
+    index.save(path)
+    with open(path, encoding='utf-8') as f:
+        saved = f.readlines()
+
+    index = sc.SnippetIndex.load(path)
+    later = [{'url': 'https://copia.co/', 'snippet': COPY + ' Copia.'},
+             {'url': 'https://otra.co/', 'snippet': 'Texto sin relación con el texto comercial copiado de la marca'}]
+    clusters = sc.cluster_results(later, index)
+    index.save(path)
+    with open(path, encoding='utf-8') as f:
+        lines = f.readlines()
+
+    assert clusters == []   # Un solo miembro de esta tanda por clúster
+    assert later[0]['known_copy_of'] in {r['url'] for r in first}
+    assert lines[:len(saved)] == saved
+    reloaded = sc.SnippetIndex.load(path)
+    assert len(reloaded.cluster_members('https://copia.co/')) == 4
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from url_racer import race_strategies
+
+
+def _slow(value, delay, calls, name):
+    def run():
+        calls.append((name, time.monotonic()))
+        time.sleep(delay)
+        return value
+    return run
+
+
+def test_staggered_start_and_first_acceptable_wins():
+    calls = []
+    begin = time.monotonic()
+    winner, result = race_strategies([
+        ('specific', _slow({'ok': True, 'n': 1}, 0.3, calls, 'specific')),
+        ('https', _slow({'ok': True, 'n': 2}, 0.01, calls, 'https')),
+    ], accept=lambda r: r['ok'], stagger=0.1)
+
+    assert (winner, result['n']) == ('https', 2)
+    starts = dict((name, at - begin) for name, at in calls)
+    assert starts['https'] >= 0.09   # La segunda espera el escalonado
+
+
+def test_failed_variant_starts_the_next_one_early():
+    calls = []
+    begin = time.monotonic()
+    winner, _ = race_strategies([
+        ('specific', _slow(None, 0, calls, 'specific')),
+        ('https', _slow({'ok': False}, 0, calls, 'https')),
+        ('http', _slow({'ok': True}, 0, calls, 'http')),
+    ], accept=lambda r: r['ok'], stagger=1.0)
+
+    assert winner == 'http'
+    assert time.monotonic() - begin < 0.5
+
+
+def test_pending_variants_do_not_start_after_a_winner():
+    calls = []
+    release = threading.Event()
+    winner, _ = race_strategies([
+        ('specific', _slow({'ok': True}, 0, calls, 'specific')),
+        ('https', _slow({'ok': True}, 0, calls, 'https')),
+        ('http', _slow({'ok': True}, 0, calls, 'http')),
+    ], accept=lambda r: r['ok'], stagger=0.2)
+    release.wait(0.5)   # Tiempo de sobra para que arrancaran si no se cancelaran
+
+    assert winner == 'specific'
+    assert [name for name, _ in calls] == ['specific']
+
+
+def test_all_failing_returns_none():
+    assert race_strategies([('specific', lambda: None), ('https', lambda: 1 / 0)],
+                           accept=lambda r: True, stagger=0.01) == (None, None)
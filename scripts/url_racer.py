@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Carrera de variantes de URL estilo "happy eyeballs" para Plant PWR.
+Lanza las estrategias con pequeños retrasos escalonados, se queda con la
+primera respuesta aceptable y descarta las demás.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Retraso entre el arranque de una variante y la siguiente (segundos)
+STAGGER_DELAY = 0.25
+
+
+def race_strategies(strategies, accept, stagger=STAGGER_DELAY):
+    """
+    Ejecuta estrategias en carrera y devuelve la primera aceptable.
+
+    Cada estrategia arranca `stagger` segundos después de la anterior, o
+    inmediatamente si la anterior ya falló. Al encontrar un ganador, las
+    estrategias pendientes no llegan a arrancar; las que ya están en vuelo
+    se abandonan (requests no permite cancelar una petición en curso) y
+    siguen ejecutándose en segundo plano, así que las estrategias no deben
+    tener efectos secundarios: quien llama aplica los del ganador.
+
+    Args:
+        strategies: Lista de tuplas (nombre, función sin argumentos)
+        accept: Función que decide si un resultado es aceptable
+        stagger: Retraso escalonado entre estrategias
+
+    Returns:
+        Tupla (nombre_ganador, resultado) o (None, None) si todas fallan
+    """
+    if not strategies:
+        return None, None
+
+    cancel = threading.Event()
+    started = [threading.Event() for _ in strategies]
+    failed = [threading.Event() for _ in strategies]
+
+    def run(index, fn):
+        if index > 0:
+            started[index - 1].wait()
+            # Adelantar el arranque si la variante anterior ya falló
+            failed[index - 1].wait(stagger)
+        started[index].set()
+
+        if cancel.is_set():
+            failed[index].set()
+            return None
+
+        try:
+            result = fn()
+        except Exception:
+            result = None
+
+        if result is None or not accept(result):
+            failed[index].set()
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=len(strategies))
+    futures = {
+        executor.submit(run, index, fn): name
+        for index, (name, fn) in enumerate(strategies)
+    }
+
+    try:
+        for future in as_completed(futures):
+            result = future.result()
+            if result is not None and accept(result):
+                return futures[future], result
+        return None, None
+    finally:
+        cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Acceso compartido a Whoogle para los scripts de búsqueda de Plant PWR.
+Consulta primero la caché en disco (serp_cache) y solo pide a Whoogle las
+páginas que faltan o caducaron. iter_results recorre las páginas de una
+búsqueda de forma perezosa para llegar a los revendedores que aparecen
+más allá de la primera página.
+"""
+
+import serp_cache
+from dedup import canonical_host, canonical_url
+from http_client import get_session
+from query_executor import BURST, REQUESTS_PER_SECOND, TokenBucket
+from serp_parser import extract_serp
+
+WHOOGLE_URL = "http://localhost:8080"
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+DEFAULT_LOCALE = None   # Idioma de interfaz (parámetro hl); None = el de Whoogle
+
+# Paginación
+PAGE_SIZE = 10      # Resultados pedidos por página (parámetro num)
+MAX_PAGES = 3       # Presupuesto de profundidad por consulta
+STALE_PAGES = 1     # Páginas seguidas sin dominios nuevos antes de parar
+MAX_RESULTS = PAGE_SIZE * MAX_PAGES  # Presupuesto de resultados por consulta
+
+# Límite de tasa por petición real a Whoogle (los aciertos de caché no cuentan)
+_rate_limiter = TokenBucket(REQUESTS_PER_SECOND, BURST)
+
+STOP_EXHAUSTED = 'sin_resultados'
+STOP_STALE = 'sin_dominios_nuevos'
+STOP_BUDGET = 'presupuesto'
+STOP_ERROR = 'error_http'
+
+
+def set_rate_limit(rate=REQUESTS_PER_SECOND, burst=BURST):
+    """Cambia el límite de tasa contra Whoogle (p. ej. sin límite contra whoogle_replay)"""
+    global _rate_limiter
+    _rate_limiter = TokenBucket(rate, burst)
+
+
+def fetch_serp_html(query, num_results=10, locale=DEFAULT_LOCALE, timeout=15,
+                    ttl=serp_cache.DEFAULT_TTL, use_cache=True, start=0):
+    """
+    HTML de la página de resultados de una búsqueda.
+
+    Args:
+        query: Término de búsqueda
+        num_results: Resultados pedidos a Whoogle (parámetro num)
+        locale: Idioma de interfaz o None
+        timeout: Timeout de la petición a Whoogle
+        ttl: Antigüedad máxima aceptada de la caché, en segundos
+        use_cache: False para forzar la petición a Whoogle
+        start: Desplazamiento del primer resultado (paginación)
+
+    Returns:
+        Tupla (status_code, html, desde_cache). Solo las respuestas 200
+        se guardan en caché.
+    """
+    if use_cache:
+        html = serp_cache.get(query, num_results, locale, ttl=ttl, start=start)
+        if html is not None:
+            return 200, html, True
+
+    params = {'q': query, 'num': num_results}
+    if start:
+        params['start'] = start
+    if locale:
+        params['hl'] = locale
+
+    _rate_limiter.acquire()
+    response = get_session('whoogle').get(f"{WHOOGLE_URL}/search", params=params,
+                                          headers=HEADERS, timeout=timeout)
+    if response.status_code == 200:
+        serp_cache.put(query, num_results, response.text, locale, start=start)
+    return response.status_code, response.text, False
+
+
+def iter_results(query, max_pages=MAX_PAGES, page_size=PAGE_SIZE, stale_pages=STALE_PAGES,
+                 locale=DEFAULT_LOCALE, timeout=15, stats=None):
+    """
+    Genera los resultados de una búsqueda página a página.
+
+    Cada página se pide solo cuando el consumidor agota la anterior, así que
+    cortar el generador (islice, break) ahorra las peticiones restantes. Se
+    para al agotar `max_pages`, cuando una página llega vacía o con error, o
+    tras `stale_pages` páginas seguidas que no aportan dominios nuevos.
+
+    Args:
+        query: Término de búsqueda
+        max_pages: Presupuesto de profundidad (páginas como máximo)
+        page_size: Resultados por página
+        stale_pages: Páginas sin dominios nuevos toleradas antes de parar
+        locale: Idioma de interfaz o None
+        timeout: Timeout por petición
+        stats: Dict opcional que se rellena con pages, cached_pages,
+               status_code, profile y stop (motivo de parada)
+
+    Yields:
+        Dicts de serp_parser con 'page' y 'rank' (posición global) añadidos;
+        las URLs repetidas entre páginas (según canonical_url) se omiten
+    """
+    stats = stats if stats is not None else {}
+    stats.update({'pages': 0, 'cached_pages': 0, 'status_code': None, 'profile': None, 'stop': STOP_BUDGET})
+
+    seen_urls = set()
+    seen_domains = set()
+    stale = 0
+    rank = 0
+
+    for page in range(1, max_pages + 1):
+        status_code, html, cached = fetch_serp_html(query, page_size, locale, timeout,
+                                                    start=(page - 1) * page_size)
+        stats['status_code'] = status_code
+        if status_code != 200:
+            stats['stop'] = STOP_ERROR
+            return
+
+        stats['pages'] += 1
+        stats['cached_pages'] += int(cached)
+
+        results, profile = extract_serp(html, max_containers=page_size * 2)
+        stats['profile'] = stats['profile'] or profile
+        if not results:
+            stats['stop'] = STOP_EXHAUSTED
+            return
+
+        new_domains = 0
+        for result in results:
+            url = canonical_url(result['url'])
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            domain = canonical_host(result['domain'])
+            if domain not in seen_domains:
+                seen_domains.add(domain)
+                new_domains += 1
+
+            rank += 1
+            result['page'] = page
+            result['rank'] = rank
+            yield result
+
+        stale = 0 if new_domains else stale + 1
+        if stale >= stale_pages:
+            stats['stop'] = STOP_STALE
+            return
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Corpus de páginas de Whoogle grabadas y servidor local que las reproduce.
+
+Las páginas viven en fixtures/whoogle con un manifest.json que asocia cada
+archivo a su petición (consulta, num, start). El servidor responde
+/search igual que Whoogle a partir de ese corpus, con latencia simulada
+opcional, para medir y ajustar los barridos sin red.
+
+Uso:
+    python3 whoogle_replay.py record              # copia las páginas de serp_cache al corpus
+    python3 whoogle_replay.py serve [puerto]      # sirve el corpus (por defecto 8081)
+        --latency 0.3   segundos de espera por petición
+        --strict        404 para consultas que no están en el corpus
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import serp_cache
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "whoogle")
+MANIFEST_FILE = os.path.join(FIXTURES_DIR, "manifest.json")
+DEFAULT_PORT = 8081
+
+# Página sin resultados: lo que devuelve Whoogle al pasar de la última página
+EMPTY_PAGE = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Whoogle Search</title></head>
+<body><div id="main"><p>No se han encontrado resultados.</p></div></body></html>
+"""
+
+
+def fixture_name(query, start=0):
+    """Nombre de archivo legible para una consulta (plant_pwr_colombia_p2.html)"""
+    slug = re.sub(r'[^a-z0-9]+', '_', serp_cache.normalize_query(query)).strip('_')[:60] or 'consulta'
+    page = f"_p{start // 10 + 1}" if start else ''
+    return f"{slug}{page}.html"
+
+
+def load_manifest(path=MANIFEST_FILE):
+    """Manifest archivo -> {'query', 'num', 'start', 'locale'} ({} si no existe)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('pages', {})
+
+
+def save_manifest(pages, path=MANIFEST_FILE):
+    data = {
+        'metadata': {
+            'description': "Páginas de Whoogle grabadas para whoogle_replay.py y los benchmarks",
+            'updated': time.strftime('%Y-%m-%d')
+        },
+        'pages': dict(sorted(pages.items()))
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def save_fixture(query, html, num=10, start=0, locale=None, fixtures_dir=FIXTURES_DIR):
+    """Añade (o sustituye) una página al corpus y la registra en el manifest"""
+    os.makedirs(fixtures_dir, exist_ok=True)
+    manifest_path = os.path.join(fixtures_dir, "manifest.json")
+    pages = load_manifest(manifest_path)
+
+    name = fixture_name(query, start)
+    with open(os.path.join(fixtures_dir, name), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    pages[name] = {'query': query, 'num': num, 'start': start, 'locale': locale}
+    save_manifest(pages, manifest_path)
+    return name
+
+
+def record_from_cache(fixtures_dir=FIXTURES_DIR):
+    """Copia al corpus todas las páginas de la caché SERP"""
+    count = 0
+    for meta, html in serp_cache.iter_pages():
+        save_fixture(meta['query'], html, meta['num'], meta.get('start', 0), meta.get('locale'), fixtures_dir)
+        count += 1
+    return count
+
+
+class Corpus:
+    """Páginas del corpus indexadas por (consulta normalizada, start)"""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.pages = {}
+        for name, meta in load_manifest(os.path.join(fixtures_dir, "manifest.json")).items():
+            path = os.path.join(fixtures_dir, name)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    key = (serp_cache.normalize_query(meta['query']), meta.get('start', 0))
+                    self.pages[key] = f.read()
+        self.first_pages = [html for (_, start), html in sorted(self.pages.items()) if start == 0]
+
+    def lookup(self, query, start=0, strict=False):
+        """
+        HTML para una petición.
+
+        Sin página grabada: en modo estricto None; si no, una primera página
+        del corpus elegida de forma determinista por la consulta (así un
+        barrido con consultas nuevas sigue teniendo HTML realista) y la
+        página vacía para las siguientes.
+        """
+        html = self.pages.get((serp_cache.normalize_query(query), start))
+        if html is not None or strict:
+            return html
+        if start or not self.first_pages:
+            return EMPTY_PAGE
+        digest = hashlib.sha256(serp_cache.normalize_query(query).encode('utf-8')).digest()
+        return self.first_pages[digest[0] % len(self.first_pages)]
+
+
+def make_server(port=DEFAULT_PORT, latency=0.0, strict=False, fixtures_dir=FIXTURES_DIR):
+    """Servidor HTTP (un hilo por petición) que imita /search de Whoogle"""
+    corpus = Corpus(fixtures_dir)
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            params = parse_qs(parts.query)
+
+            if parts.path == '/search':
+                if latency:
+                    time.sleep(latency)
+                query = params.get('q', [''])[0]
+                start = int(params.get('start', ['0'])[0] or 0)
+                html = corpus.lookup(query, start, strict)
+                if html is None:
+                    self._send(404, "Consulta no grabada")
+                    return
+                self._send(200, html)
+            elif parts.path == '/':
+                self._send(200, EMPTY_PAGE)
+            else:
+                self._send(404, "No encontrado")
+
+        def _send(self, status, body):
+            payload = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), ReplayHandler)
+    server.daemon_threads = True
+    server.corpus = corpus
+    return server
+
+
+def start_in_background(port=0, latency=0.0, strict=False, fixtures_dir=FIXTURES_DIR):
+    """Arranca el servidor en un hilo; devuelve (servidor, url_base). port=0 elige uno libre"""
+    server = make_server(port, latency, strict, fixtures_dir)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ('record', 'serve'):
+        print(__doc__)
+        return 1
+
+    if args[0] == 'record':
+        count = record_from_cache()
+        print(f"📼 {count} páginas copiadas de {serp_cache.CACHE_DIR} a {FIXTURES_DIR}")
+        return 0
+
+    latency = float(args[args.index('--latency') + 1]) if '--latency' in args else 0.0
+    strict = '--strict' in args
+    positional = [a for i, a in enumerate(args[1:], 1) if not a.startswith('--') and args[i - 1] != '--latency']
+    port = int(positional[0]) if positional else DEFAULT_PORT
+
+    server = make_server(port, latency, strict)
+    print(f"📼 Whoogle de reproducción en http://127.0.0.1:{port} "
+          f"({len(server.corpus.pages)} páginas, latencia {latency}s{', estricto' if strict else ''})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
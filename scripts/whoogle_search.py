@@ -3,178 +3,86 @@
 Script para realizar búsquedas automatizadas en Whoogle.
 """
 
-import requests
 import json
 from datetime import datetime
-from bs4 import BeautifulSoup
+from itertools import islice
 import re
 
-WHOOGLE_URL = "http://localhost:8080"
-HEADERS = {'User-Agent': 'Mozilla/5.0'}
+from dedup import ResultDeduplicator
+from http_client import get_session
+from keyword_matcher import get_matcher
+from query_executor import run_queries
+from query_plan import plan_queries
+from registrable_domain import result_domain
+from whoogle_client import MAX_PAGES, MAX_RESULTS, WHOOGLE_URL, iter_results
 
-def search_whoogle(query, num_results=10):
+def search_whoogle(query, max_pages=MAX_PAGES, max_results=MAX_RESULTS):
     """
-    Realiza una búsqueda en Whoogle y extrae resultados.
+    Realiza una búsqueda en Whoogle y extrae resultados de varias páginas.
     
     Args:
         query: Término de búsqueda
-        num_results: Número máximo de resultados a extraer
+        max_pages: Páginas como máximo (para antes si no aparecen dominios nuevos)
+        max_results: Número máximo de resultados a extraer; al llegar a él no
+                     se piden más páginas (None = sin límite)
     
     Returns:
-        Lista de resultados con título, URL y snippet
+        Lista de resultados con título, URL, snippet, página y posición
     """
     print(f"🔍 Buscando: '{query}'")
     
-    # Construir URL de búsqueda
-    search_url = f"{WHOOGLE_URL}/search"
-    params = {
-        'q': query,
-        'num': num_results
-    }
-    
+    stats = {}
     try:
-        response = requests.get(search_url, params=params, headers=HEADERS, timeout=15)
-        
-        if response.status_code != 200:
-            print(f"❌ Error en Whoogle: HTTP {response.status_code}")
-            return []
-        
-        # Parsear HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extraer resultados (Whoogle usa estructura específica)
-        results = []
-        
-        # Buscar contenedores de resultados - Whoogle usa divs con clase ZINbbc
-        result_containers = soup.find_all('div', class_='ZINbbc')
-        
-        for container in result_containers[:num_results * 2]:  # Get more to filter
-            # Skip if it's "People also search for" or other non-result sections
-            if container.find('details') or container.find('summary'):
-                continue
-                
-            # Skip if it's an image section
-            if container.find('span', class_='cAuxJf'):
-                continue
-            
-            result = {}
-            
-            # Extraer título - Buscar en h3 con clase específica
-            title_elem = container.find('h3', class_='zBAuLc')
-            if title_elem:
-                # Dentro del h3, buscar el div con el texto
-                title_div = title_elem.find('div', class_='ilUpNd UFvD1 aSRlid')
-                if title_div:
-                    result['title'] = title_div.get_text(strip=True)
-                else:
-                    result['title'] = title_elem.get_text(strip=True)
-            
-            # Extraer URL - Buscar enlaces externos
-            link_elems = container.find_all('a', href=True)
-            external_url = None
-            
-            for link in link_elems:
-                href = link['href']
-                # Check if it looks like an external URL (contains common domains)
-                if any(domain in href for domain in ['plantpwr', 'instagram', 'facebook', 'mercadolibre', 'ispetshope', 'http://', 'https://']):
-                    if href.startswith('http') and not href.startswith('http://localhost'):
-                        external_url = href
-                        break
-            
-            if external_url:
-                result['url'] = external_url
-                
-                # También extraer dominio para análisis
-                from urllib.parse import urlparse
-                try:
-                    parsed = urlparse(external_url)
-                    result['domain'] = parsed.netloc
-                except:
-                    result['domain'] = 'unknown'
-            
-            # Extraer snippet/descripción - Buscar divs con clase específica
-            snippet_elem = container.find('div', class_='ilUpNd H66NU aSRlid')
-            if snippet_elem:
-                snippet_text = snippet_elem.get_text(strip=True)
-                # Filter out date information
-                if '·' in snippet_text:
-                    snippet_text = snippet_text.split('·', 1)[-1].strip()
-                result['snippet'] = snippet_text[:200]
-            
-            # Extraer URL mostrada (no el enlace real)
-            url_elem = container.find('div', class_='ilUpNd BamJPe aSRlid XR4uSe')
-            if url_elem:
-                result['display_url'] = url_elem.get_text(strip=True)
-            
-            # Only add if we have both title and URL
-            if result.get('title') and result.get('url'):
-                results.append(result)
-                
-                # Stop if we have enough results
-                if len(results) >= num_results:
-                    break
-        
-        print(f"✅ {len(results)} resultados encontrados")
-        return results
-        
+        # Páginas desde la caché en disco si son recientes; si no, desde Whoogle
+        results = list(islice(iter_results(query, max_pages=max_pages, timeout=15, stats=stats), max_results))
     except Exception as e:
         print(f"❌ Error en búsqueda: {type(e).__name__}: {e}")
         return []
+    
+    if not stats['pages']:
+        print(f"❌ Error en Whoogle: HTTP {stats['status_code']}")
+        return []
+    if stats['profile'] is None:
+        print("⚠️  Ningún perfil de selectores coincidió (¿cambió el marcado de Whoogle?)")
+    
+    print(f"✅ {len(results)} resultados en {stats['pages']} páginas "
+          f"({stats['cached_pages']} desde caché, perfil: {stats['profile']}, parada: {stats['stop']})")
+    return results
 
 def search_plant_pwr_variations():
     """Busca variaciones de términos relacionados con Plant PWR"""
-    search_terms = [
-        # Términos principales
-        "Plant PWR aceite mascotas",
-        "Plant PWR gotas perros",
-        "Plant PWR cannabis veterinario",
-        "Plant PWR Colombia precio",
-        
-        # Términos alternativos
-        "Zelvatic Pets aceite",
-        "Zelvatic Pets cannabis",
-        "Zelvatic Pets mascotas",
-        
-        # Términos genéricos (para detectar nuevos competidores)
-        "aceite cannabis perros comprar",
-        "cannabis veterinario Colombia",
-        "gotas CBD mascotas Medellín",
-        
-        # Búsquedas específicas por ciudad
-        "Plant PWR Medellín",
-        "Plant PWR Bogotá",
-        "Plant PWR Cali",
-        
-        # Búsquedas en plataformas específicas
-        "site:facebook.com Plant PWR",
-        "site:instagram.com Plant PWR",
-        "site:mercadolibre.com.co aceite cannabis mascotas"
-    ]
+    # Marca × productos × ciudades × plataformas desde config.json, sin duplicados
+    search_terms = plan_queries('max_queries')
+    if not search_terms:
+        print("⚠️  config.json no tiene tools.whoogle.query_plan ni search_terms")
+        return []
+    print(f"🧭 Plan de búsqueda: {len(search_terms)} consultas")
+    
+    # Una entrada por URL canónica con todas las consultas que la encontraron
+    deduplicator = ResultDeduplicator()
     
-    all_results = []
+    # Búsquedas en paralelo; whoogle_client limita la tasa por página pedida
+    searches = run_queries(search_terms, search_whoogle, rate=None)
     
-    for term in search_terms:
+    for term, results in searches:
         print(f"\n{'='*50}")
         print(f"🔎 TÉRMINO: {term}")
         print(f"{'='*50}")
         
-        results = search_whoogle(term, num_results=5)
-        
         for result in results:
             result['search_term'] = term
             result['found_at'] = datetime.now().isoformat()
-            all_results.append(result)
+            result = deduplicator.add(result, term)
+            if result is None:
+                continue
             
             print(f"   📝 {result.get('title', 'Sin título')[:60]}...")
             print(f"   🔗 {result.get('domain', 'Sin dominio')}")
             if result.get('snippet'):
                 print(f"   📋 {result.get('snippet')[:80]}...")
-        
-        # Pausa entre búsquedas para no sobrecargar
-        import time
-        time.sleep(2)
     
-    return all_results
+    print(f"\n🧹 {deduplicator.duplicates} resultados repetidos fusionados")
+    return deduplicator.results()
 
 def save_results(results, filename=None):
     """Guarda los resultados en un archivo JSON"""
@@ -202,19 +110,16 @@ def analyze_results(results):
     print(f"\n📊 ANÁLISIS DE {len(results)} RESULTADOS")
     print("=" * 50)
     
-    # Extraer dominios únicos
-    domains = set()
-    for result in results:
-        if 'domain' in result:
-            domains.add(result['domain'])
-    
-    print(f"🌐 Dominios únicos encontrados: {len(domains)}")
-    print("\n📋 TOP 10 DOMINIOS:")
+    # Contar por dominio registrable (www.x.com, m.x.com y x.com son el mismo)
     domain_count = {}
     for result in results:
-        domain = result.get('domain')
+        domain = result_domain(result)
         if domain:
             domain_count[domain] = domain_count.get(domain, 0) + 1
+    domains = set(domain_count)
+    
+    print(f"🌐 Dominios únicos encontrados: {len(domains)}")
+    print("\n📋 TOP 10 DOMINIOS:")
     
     # Ordenar por frecuencia
     sorted_domains = sorted(domain_count.items(), key=lambda x: x[1], reverse=True)
@@ -222,21 +127,34 @@ def analyze_results(results):
     for domain, count in sorted_domains[:10]:
         print(f"   • {domain}: {count} menciones")
     
-    # Buscar nuevos dominios potenciales de Plant PWR
+    # Buscar nuevos dominios potenciales de Plant PWR: un recorrido por
+    # resultado sobre dominio, título y snippet con el diccionario de config.json
     print(f"\n🔍 BUSCANDO NUEVOS DOMINIOS SOSPECHOSOS:")
-    suspicious_keywords = ['plantpwr', 'zelvatic', 'cannabis', 'mascota', 'veterinaria']
-    new_domains = []
+    matcher = get_matcher()
+    domain_hits = {}
+    brand_mentions = []
+    
+    for result in results:
+        domain = result_domain(result)
+        hits = matcher.scan_fields(domain=domain, title=result.get('title'), snippet=result.get('snippet'))
+        if 'domain' in hits:
+            domain_hits.setdefault(domain, set()).update(
+                word for words in hits['domain'].values() for word in words)
+        if any('marca' in hits.get(field, {}) for field in ('title', 'snippet')):
+            brand_mentions.append(result.get('url'))
+    
+    new_domains = sorted(domain_hits)
+    for domain in new_domains:
+        print(f"   ⚠️  SOSPECHOSO: {domain} ({', '.join(sorted(domain_hits[domain]))})")
     
-    for domain in domains:
-        domain_lower = domain.lower()
-        if any(keyword in domain_lower for keyword in suspicious_keywords):
-            print(f"   ⚠️  SOSPECHOSO: {domain}")
-            new_domains.append(domain)
+    if brand_mentions:
+        print(f"\n🏷️  {len(brand_mentions)} resultados mencionan la marca en título o snippet")
     
     return {
         'total_domains': len(domains),
         'top_domains': sorted_domains[:10],
-        'suspicious_domains': new_domains
+        'suspicious_domains': new_domains,
+        'brand_mentions': brand_mentions
     }
 
 def main():
@@ -246,7 +164,7 @@ def main():
     # Probar conexión a Whoogle
     print("🔗 Probando conexión a Whoogle...")
     try:
-        response = requests.get(WHOOGLE_URL, timeout=5)
+        response = get_session('whoogle').get(WHOOGLE_URL, timeout=5)
         if response.status_code == 200:
             print("✅ Whoogle conectado correctamente")
         else: